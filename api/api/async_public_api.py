@@ -0,0 +1,210 @@
+"""
+Asyncio API methods, same request/response contract as api.api.public_api
+
+Unlike PublicApi, the async client sends every request once, straight to the wire: there are no retries,
+no circuit breaker, no response cache, no cassette and no request metrics
+"""
+
+import asyncio
+import logging
+
+import httpx
+
+from tools.logger.logger import Logger
+from tools.url_utils import build_url
+from api.api.json_codec import JsonDecoder, get_decoder
+from api.api.public_api import ApiError, JsonResponseMixin, RequestContextMixin, page_query_params
+from api.api.session_pool import PoolConfig
+
+
+log = Logger(__name__)
+
+
+async def gather_requests(coroutines, concurrency: int = 10, return_exceptions: bool = False) -> list:
+    """
+    Running the request coroutines concurrently, at most `concurrency` of them are in flight at the same time
+
+    Args:
+        coroutines (iterable): e.g. [api.get_facts(page=1), api.get_facts(page=2)]
+        concurrency (int): max number of requests in flight
+        return_exceptions (bool): True - exceptions are returned in place of results instead of being raised
+
+    Returns:
+        list, results in the same order as the passed coroutines
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_bounded(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run_bounded(coroutine) for coroutine in coroutines),
+                                return_exceptions=return_exceptions)
+
+
+class AsyncApiBase(RequestContextMixin):
+    """
+    Async method for the derived classes, see RequestContextMixin
+    """
+    SUPPORTED_METHODS = ("GET", "POST", "PUT", "DELETE")
+
+    def __init__(self, protocol: str, host: str, port: str, pool_config: PoolConfig = None):
+        """
+        Args:
+            protocol (str): http or https
+            host (str): e.g. google.com
+            port (str): e.g. 443
+            pool_config (PoolConfig): pool_maxsize is the connection limit for the host
+        """
+        self.pool_config = pool_config or PoolConfig()
+        self._client = None
+        super().__init__(protocol, host, port)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Long-lived async client; one instance talks to one host, so its limits are the per-host connection limits
+
+        Returns:
+            httpx.AsyncClient
+        """
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.pool_config.pool_maxsize,
+                                  max_keepalive_connections=self.pool_config.pool_maxsize
+                                  if self.pool_config.keep_alive else 0)
+            transport = httpx.AsyncHTTPTransport(limits=limits, retries=self.pool_config.max_retries)
+            self._client = httpx.AsyncClient(transport=transport, timeout=30, verify=True)
+        return self._client
+
+    async def aclose(self):
+        """
+        Closing the client and all pooled connections
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def make_request(self,
+                           method: str,
+                           uri: str,
+                           payload: dict = None,
+                           query_params: dict = None,
+                           headers: dict = None) -> httpx.Response:
+        """
+        Getting the Response object.
+
+        Args:
+            method (str): one of ("get", "post", "put", "delete")
+            uri (str): e.g. /v1/someApiRequest
+            payload (dict): payload
+            query_params (dict): these params will be used in URL
+            headers (dict): headers to add to the default ones
+
+        Returns:
+            httpx.Response
+        """
+        method = method.upper()
+        if method not in self.SUPPORTED_METHODS:
+            raise ApiError(f"HTTP method is not implemented: {method}\n")
+        url = build_url(self.endpoint, uri)
+        request_headers = self.build_headers(headers)
+        request_config = {"method": method,
+                          "url": url,
+                          "headers": request_headers,
+                          "params": query_params or {},
+                          "data": (payload or {}) if method != "GET" else None,
+                          }
+        try:
+            resp = await self.client.request(**request_config)
+        except Exception as ex:
+            raise self.request_error(request_config, ex) from ex
+        if log.is_enabled_for(logging.DEBUG):
+            log.debug_fields(self.BEGIN_REQ,
+                             {"Request config": request_config,
+                              "Response URL": resp.url,
+                              "Response text": log.body(resp.content, resp.encoding),
+                              "Response headers": resp.headers,
+                              "Response status code": resp.status_code},
+                             self.END_REQ)
+        return resp
+
+
+class AsyncApiJsonRequest(JsonResponseMixin, AsyncApiBase):
+    """
+    Async API methods for the service that returs data in JSON format
+    """
+
+    def __init__(self,
+                 protocol: str,
+                 host: str,
+                 port: str,
+                 pool_config: PoolConfig = None,
+                 json_decoder: JsonDecoder = None):
+        """
+        Args:
+            protocol (str): http or https
+            host (str): e.g. google.com
+            port (str): e.g. 443
+            pool_config (PoolConfig): settings of the connection pool
+            json_decoder (JsonDecoder): defaults to the fastest installed backend
+        """
+        super().__init__(protocol, host, port, pool_config)
+        self.json_decoder = json_decoder or get_decoder()
+        self.append_headers(self.JSON_HEADERS)
+
+    async def make_request(self,
+                           method: str,
+                           uri: str,
+                           payload: dict = None,
+                           query_params: dict = None,
+                           headers: dict = None,
+                           is_return_resp_obj: bool = False,
+                           raise_error_if_failed: bool = None):
+        """
+        Args:
+            method (str): one of ("get", "post", "put", "delete")
+            uri (str): e.g. /v1/someApiRequest
+            payload (dict): payload
+            query_params (dict): these params will be used in URL
+            headers (dict): headers to add to the default ones
+            raise_error_if_failed (bool): If a test should fail when response validation failed;
+                                          see ApiJsonRequest.make_request
+            is_return_resp_obj (bool): True - returns the Response object, False - returns JSON
+
+        Returns:
+            json, (list/dict)
+        """
+        response_obj = await super().make_request(method, uri, payload, query_params, headers)
+        return self.process_json_response(method, uri, response_obj, is_return_resp_obj, raise_error_if_failed)
+
+
+class AsyncPublicApi(AsyncApiJsonRequest):
+    """
+    Async API methods
+    """
+
+    async def get_facts(self, page=None, limit=None):
+        """
+        /facts
+
+        Returns:
+            dict
+        """
+        resp = await self.make_request("get", "/facts", {}, page_query_params(page, limit), {})
+        return resp
+
+    async def get_breeds(self):
+        """
+        /breeds
+
+        Returns:
+            dict
+        """
+        resp = await self.make_request("get", "/breeds", {}, {}, {})
+        return resp
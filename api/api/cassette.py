@@ -0,0 +1,293 @@
+"""
+Record/replay of API traffic: request/response pairs in an indexed on-disk cassette, replayed without the network
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from api.api.transports import Transport
+
+
+# Headers describing the body on the wire; the recorded body is already decoded (e.g. gunzipped)
+_WIRE_BODY_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class CassetteMissError(LookupError):
+    """
+    Raised in the replay mode for a request that is not recorded in the cassette
+    """
+
+
+def make_request_key(method: str, url: str, params: dict = None, data=None) -> str:
+    """
+    Args:
+        method (str): e.g. GET
+        url (str): e.g. https://catfact.ninja:443/facts
+        params (dict): query params, order and None values don't matter
+        data (dict/str/bytes): request body
+
+    Returns:
+        str, 32 hex chars
+    """
+    if isinstance(data, bytes):
+        data = data.hex()
+    params = {key: value for key, value in (params or {}).items() if value is not None}
+    document = json.dumps([method.upper(), url, params, data or None], sort_keys=True, default=str)
+    return hashlib.blake2b(document.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Cassette:  # pylint: disable=too-many-instance-attributes
+    """
+    Append-only data file (<path>.cassette: a JSON header line and the raw body per record) and append-only
+    hash index (<path>.index: "<key> <offset>" lines). The index is loaded into a dict on open, so a lookup is
+    a dict get and one read at the offset; when a request is recorded again, the last record wins. Thread-safe.
+
+        record - every request goes to the wire and is recorded
+        replay - every request is answered from the cassette, CassetteMissError if it's not recorded
+        auto   - replayed if recorded, otherwise sent and recorded
+    """
+    MODES = ("record", "replay", "auto")
+
+    def __init__(self, path: str, mode: str = "replay"):
+        """
+        Args:
+            path (str): path without the extension, e.g. api/cassettes/catfacts
+            mode (str): record, replay or auto
+
+        Raises:
+            ValueError, if the mode is unknown
+            FileNotFoundError, in the replay mode if nothing is recorded yet
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}'; available: {self.MODES}")
+        self.path = path
+        self.mode = mode
+        self.data_path = f"{path}.cassette"
+        self.index_path = f"{path}.index"
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._index = {}
+        self._index_file = None
+        if mode == "replay":
+            if not os.path.exists(self.data_path):
+                raise FileNotFoundError(f"Cassette {self.data_path} is not recorded yet, run with the record mode first")
+            self._file = open(self.data_path, "rb")  # pylint: disable=consider-using-with
+        else:
+            os.makedirs(os.path.dirname(self.data_path) or ".", exist_ok=True)
+            self._file = open(self.data_path, "a+b")  # pylint: disable=consider-using-with
+        self._load_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict, replayed/missed/recorded counters
+        """
+        return {"hits": self.hits, "misses": self.misses, "recorded": self.recorded, "entries": len(self._index)}
+
+    @property
+    def is_writable(self) -> bool:
+        """
+        True if new records are appended
+        """
+        return self.mode != "replay"
+
+    def _load_index(self):
+        """
+        Loading the index file; records appended after the last indexed one (e.g. the index file was removed)
+        are indexed by scanning the data file
+        """
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="ascii") as index_file:
+                for line in index_file:
+                    key, _, offset = line.strip().partition(" ")
+                    if offset.isdigit():
+                        self._index[key] = int(offset)
+        scan_from = self._record_end(max(self._index.values())) if self._index else 0
+        if self.is_writable:
+            self._index_file = open(self.index_path, "a", encoding="ascii")  # pylint: disable=consider-using-with
+        self._scan(scan_from)
+
+    def _record_end(self, offset: int) -> int:
+        """
+        Returns:
+            int, offset right after the record at the offset, 0 if it's not a valid record (the whole file is scanned)
+        """
+        self._file.seek(offset)
+        try:
+            header = json.loads(self._file.readline())
+            return self._file.tell() + header["length"] + 1
+        except (ValueError, KeyError):
+            return 0
+
+    def _scan(self, offset: int):
+        """
+        Indexing the records from the offset to the end of the data file; an incomplete record at the end
+        (an interrupted run) is cut off in the writable modes
+        """
+        size = os.fstat(self._file.fileno()).st_size
+        self._file.seek(offset)
+        while offset < size:
+            try:
+                header = json.loads(self._file.readline())
+                end = self._file.tell() + header["length"] + 1
+            except (ValueError, KeyError):
+                break
+            if end > size:
+                break
+            self._index[header["key"]] = offset
+            if self._index_file is not None:
+                self._index_file.write(f"{header['key']} {offset}\n")
+            offset = end
+            self._file.seek(end)
+        if self._index_file is not None:
+            self._index_file.flush()
+            if offset < size:
+                self._file.truncate(offset)
+
+    def get(self, key: str) -> tuple:
+        """
+        Args:
+            key (str): see make_request_key()
+
+        Returns:
+            tuple, (header dict, body bytes), or None if the key is not recorded
+        """
+        offset = self._index.get(key)
+        if offset is None:
+            return None
+        with self._lock:
+            self._file.seek(offset)
+            header = json.loads(self._file.readline())
+            body = self._file.read(header["length"])
+        return header, body
+
+    def put(self, key: str, header: dict, body: bytes):
+        """
+        Appending the record and its index entry
+
+        Args:
+            key (str): see make_request_key()
+            header (dict): JSON serializable response data
+            body (bytes): response body
+        """
+        line = json.dumps({**header, "key": key, "length": len(body)}, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(line + b"\n" + body + b"\n")
+            self._file.flush()
+            self._index_file.write(f"{key} {offset}\n")
+            self._index_file.flush()
+            self._index[key] = offset
+            self.recorded += 1
+
+    def count(self, counter: str):
+        """
+        Args:
+            counter (str): hits or misses
+        """
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def close(self):
+        """
+        Closing the data and index files
+        """
+        with self._lock:
+            self._file.close()
+            if self._index_file is not None:
+                self._index_file.close()
+
+
+class CassetteTransport(Transport):
+    """
+    Transport that records the responses of the wrapped transport to the cassette or replays them from it;
+    streamed responses are read whole when they are recorded
+    """
+
+    def __init__(self, transport: Transport, cassette: Cassette):
+        """
+        Args:
+            transport (Transport): used for the requests that are not replayed
+            cassette (Cassette): record/replay storage, its mode is used
+        """
+        self.transport = transport
+        self.cassette = cassette
+        self.name = f"{transport.name}+cassette"
+
+    def request(self, **request_config) -> requests.Response:
+        """
+        Replaying the response from the cassette or sending the request through the wrapped transport and
+        recording it, see Cassette modes
+
+        Raises:
+            CassetteMissError, in the replay mode if the request is not recorded
+        """
+        cassette = self.cassette
+        method, url = request_config["method"], request_config["url"]
+        key = make_request_key(method, url, request_config.get("params"), request_config.get("data"))
+        if cassette.mode != "record":
+            record = cassette.get(key)
+            if record is not None:
+                cassette.count("hits")
+                return self._to_response(request_config, *record)
+            cassette.count("misses")
+            if cassette.mode == "replay":
+                raise CassetteMissError(f"{method} {url} params={request_config.get('params')} is not recorded "
+                                        f"in {cassette.data_path}")
+        resp = self.transport.request(**request_config)
+        headers = {name: value for name, value in resp.headers.items() if name.lower() not in _WIRE_BODY_HEADERS}
+        headers["Content-Length"] = str(len(resp.content))
+        header = {"method": method, "url": resp.url, "status_code": resp.status_code, "reason": resp.reason,
+                  "headers": headers, "encoding": resp.encoding}
+        cassette.put(key, header, resp.content)
+        if request_config.get("stream"):
+            return self._to_response(request_config, header, resp.content)
+        return resp
+
+    @staticmethod
+    def _to_response(request_config: dict, header: dict, body: bytes) -> requests.Response:
+        """
+        Returns:
+            Response built from the record; with stream=True the body is read from memory chunk by chunk
+        """
+        resp = requests.Response()
+        resp.url = header["url"]
+        resp.status_code = header["status_code"]
+        resp.reason = header["reason"]
+        resp.headers = CaseInsensitiveDict(header["headers"])
+        resp.encoding = header["encoding"]
+        resp.request = requests.Request(request_config["method"], request_config["url"],
+                                        headers=request_config.get("headers"),
+                                        params=request_config.get("params"),
+                                        data=request_config.get("data")).prepare()
+        if request_config.get("stream"):
+            resp.raw = io.BytesIO(body)
+        else:
+            resp._content = body  # pylint: disable=protected-access
+            resp._content_consumed = True  # pylint: disable=protected-access
+        return resp
+
+    def close(self):
+        """
+        Closing the wrapped transport, the cassette is closed by its owner
+        """
+        self.transport.close()
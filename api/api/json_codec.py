@@ -0,0 +1,138 @@
+"""
+Pluggable JSON decoding: orjson/ujson when installed, stdlib json otherwise
+"""
+
+import json
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover - optional dependency
+    ujson = None
+
+
+class JsonDecoder:
+    """
+    Decoder that parses straight from bytes with the fastest available backend
+    """
+    BACKENDS = ("orjson", "ujson", "json")
+
+    def __init__(self, backend: str = "auto"):
+        """
+        Args:
+            backend (str): auto (the fastest installed one), orjson, ujson or json
+        """
+        available = self.available_backends()
+        if backend == "auto":
+            backend = available[0]
+        elif backend not in available:
+            raise ValueError(f"JSON backend '{backend}' is not installed; available: {available}")
+        self.name = backend
+        if backend == "orjson":
+            self._loads = orjson.loads  # pylint: disable=no-member
+        elif backend == "ujson":
+            self._loads = ujson.loads
+        else:
+            self._loads = json.loads
+
+    @classmethod
+    def available_backends(cls) -> tuple:
+        """
+        Returns:
+            tuple, installed backends, the fastest first
+        """
+        installed = {"orjson": orjson is not None, "ujson": ujson is not None, "json": True}
+        return tuple(name for name in cls.BACKENDS if installed[name])
+
+    def loads(self, data):
+        """
+        Args:
+            data (bytes/str): JSON document
+
+        Returns:
+            json, (list/dict)
+        """
+        return self._loads(data)
+
+    def loads_body(self, resp):
+        """
+        Args:
+            resp (Response): requests or httpx response
+
+        Returns:
+            json, (list/dict), a new object parsed from resp.content bytes
+        """
+        try:
+            return self._loads(resp.content)
+        except ValueError:
+            # e.g. non-UTF-8 body; the stdlib decoder over the decoded text is the reference behaviour
+            return json.loads(resp.text)
+
+    def decode_response(self, resp):
+        """
+        Parsing the response body once per response for the client itself (validation and the returned body):
+        repeated calls return the same object. resp.json() is switched to this decoder too, see attach().
+
+        Args:
+            resp (Response): requests or httpx response
+
+        Returns:
+            json, (list/dict)
+        """
+        parsed = getattr(resp, "_parsed_json", _NOT_PARSED)
+        if parsed is not _NOT_PARSED:
+            return parsed
+        parsed = self.loads_body(resp)
+        resp._parsed_json = parsed  # pylint: disable=protected-access
+        self.attach(resp)
+        return parsed
+
+    def attach(self, resp):
+        """
+        Making resp.json() use this decoder; every call returns a new object, so a caller's changes don't leak
+        to other callers. resp.json(**kwargs) (e.g. parse_float) falls back to the stdlib json.loads with the kwargs.
+
+        Args:
+            resp (Response): requests or httpx response
+
+        Returns:
+            Response, the same object
+        """
+        resp.json = _DecoderJson(self, resp)
+        return resp
+
+
+class _DecoderJson:  # pylint: disable=too-few-public-methods
+    """
+    Replacement of the response json() method that parses the body with the decoder on every call
+    """
+    __slots__ = ("decoder", "resp")
+
+    def __init__(self, decoder: JsonDecoder, resp):
+        self.decoder = decoder
+        self.resp = resp
+
+    def __call__(self, **kwargs):
+        if kwargs:
+            return json.loads(self.resp.text, **kwargs)
+        return self.decoder.loads_body(self.resp)
+
+
+_NOT_PARSED = object()
+
+
+@lru_cache(maxsize=None)
+def get_decoder(backend: str = "auto") -> JsonDecoder:
+    """
+    Args:
+        backend (str): auto, orjson, ujson or json
+
+    Returns:
+        JsonDecoder, shared instance per backend
+    """
+    return JsonDecoder(backend)
@@ -2,19 +2,42 @@
 API methods
 """
 
-import json
+import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import partial
 from pprint import pformat
+from types import MappingProxyType
+from urllib.parse import parse_qs, urlparse
 
 import requests
-from requests import Response
 
 from tools.logger.logger import Logger
+from tools.metrics import RequestTiming, get_registry
+from tools.url_utils import ParsedEndpoint, build_url, get_endpoint
+from api.api.json_codec import JsonDecoder, get_decoder
+from api.api.request_ids import get_request_id_generator
+from api.api.resilience import CircuitBreaker, CircuitBreakerConfig, RetryBudget, RetryPolicy, get_circuit_breaker
+from api.api.response_cache import ResponseCache
+from api.api.schemas import validate_response, validate_status
+from api.api.streaming import StreamedResponse
+from api.api.cassette import Cassette, CassetteTransport
+from api.api.session_pool import PoolConfig
+from api.api.transports import Transport, build_transport
 
 
 log = Logger(__name__)
 
 
+def _headers_size(headers) -> int:
+    """
+    Approximate size of the header block: "Name: value\r\n" per header
+    """
+    return sum(len(str(name)) + len(str(value)) + 4 for name, value in headers.items())
+
+
 class ApiError(Exception):
     """
     Class for raising API errors
@@ -28,9 +51,99 @@ class ApiError(Exception):
         super().__init__(msg)
 
 
-class ApiBase:
+class CircuitOpenError(ApiError):
+    """
+    Raised without sending the request while the circuit breaker of the host is open
+    """
+    def __init__(self, breaker: CircuitBreaker):
+        """
+        Args:
+            breaker (CircuitBreaker): open breaker of the host
+        """
+        super().__init__(f"circuit of {breaker.name} is open after {breaker.failures} failure(s), "
+                         f"the next attempt in {breaker.retry_in():.1f} s")
+        self.breaker = breaker
+
+
+@dataclass(slots=True)
+class RequestSpec:
     """
-    Method for the derived classes
+    One request of ApiJsonRequest.map_requests(); a (method, uri) or (method, uri, query_params) tuple is accepted too
+    """
+    method: str
+    uri: str
+    query_params: dict = None
+    payload: dict = None
+    headers: dict = None
+    timeout: float = None  # None - the timeout passed to map_requests()
+
+    @classmethod
+    def from_value(cls, value) -> "RequestSpec":
+        """
+        Args:
+            value (RequestSpec|tuple): e.g. ("get", "/facts", {"page": 2})
+
+        Returns:
+            RequestSpec
+        """
+        if isinstance(value, cls):
+            return value
+        return cls(*value)
+
+
+@dataclass(slots=True)
+class RequestResult:
+    """
+    Result of one request of ApiJsonRequest.map_requests(): the value or the captured error
+    """
+    index: int  # position of the spec in the passed list
+    spec: RequestSpec
+    value: object = None  # JSON or Response, see make_request(is_return_resp_obj)
+    error: Exception = None
+    elapsed: float = 0  # seconds
+
+    @property
+    def ok(self) -> bool:
+        """
+        True if the request didn't raise
+        """
+        return self.error is None
+
+    def result(self):
+        """
+        Returns:
+            the value, the captured error is raised
+        """
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def page_query_params(page: int = None, limit: int = None) -> dict:
+    """
+    Query params of a paginated request, the ones that are not passed are omitted
+
+    Args:
+        page (int): page number
+        limit (int): page size
+
+    Returns:
+        dict
+    """
+    query_params = {}
+    if page is not None:
+        query_params["page"] = page
+    if limit is not None:
+        query_params["limit"] = limit
+    return query_params
+
+
+class RequestContextMixin:
+    """
+    Request context shared by the sync and the async clients: the endpoint, the default headers
+    and the logging of the failed requests.
+    One instance can be shared by many threads/tasks: the default headers are read-only and every request gets
+    its own merged copy with a new Unique-RequestId
     """
     BEGIN_REQ = "========== BEGIN =========="
     END_REQ = "========== END =========="
@@ -42,29 +155,185 @@ class ApiBase:
             host (str): e.g. google.com
             port (str): e.g. 443
         """
-        self._unique_request_id_increment = 0
+        self.request_ids = get_request_id_generator()
+        self._headers_lock = threading.Lock()
         self.protocol = protocol
         self.host = host
         self.port = str(port)
-        self.headers = {"User-Agent": "automation-framework",
-                        "Unique-RequestId": str(self._unique_request_id_increment) + "_" + hex(int(time.time()))}
+        self.headers = MappingProxyType({"User-Agent": "automation-framework"})
+
+    @property
+    def endpoint(self) -> ParsedEndpoint:
+        """
+        Memoized protocol/host/port of the API, base of every request URL
+        """
+        return get_endpoint(self.protocol, self.host, self.port)
 
     def append_headers(self, new_headers: dict):
         """
+        Replacing the default headers with a new read-only mapping (copy-on-write), so requests in flight
+        keep the headers they started with
+
         Args:
             new_headers (dict): new headers to append
         """
-        self.headers.update(new_headers)
+        with self._headers_lock:
+            self.headers = MappingProxyType({**self.headers, **new_headers})
+
+    def build_headers(self, headers: dict = None) -> dict:
+        """
+        Args:
+            headers (dict): per-request headers, they override the default ones
+
+        Returns:
+            dict, a new dict: default headers, a new Unique-RequestId and the per-request headers
+        """
+        return {**self.headers, self.request_ids.HEADER: self.request_ids.next_id(), **(headers or {})}
+
+    def request_error(self, request_config: dict, ex: Exception) -> ApiError:
+        """
+        Logging the failed request
+
+        Args:
+            request_config (dict): arguments of the request
+            ex (Exception): error of the request
+
+        Returns:
+            ApiError, to be raised by the caller
+        """
+        message = f"\n{self.BEGIN_REQ}"
+        message += f"\nRequest config: {request_config}"
+        message += f"\nError: {ex}"
+        message += f"\n{self.END_REQ}"
+        log.error(message)
+        return ApiError(message)
+
+
+class JsonResponseMixin:  # pylint: disable=too-few-public-methods
+    """
+    Validation and decoding of the JSON responses, shared by the sync and the async clients
+    """
+    JSON_HEADERS = MappingProxyType({"Content-Type": "application/json",
+                                     "Accept": "application/json"})
+    json_decoder: JsonDecoder
+
+    def process_json_response(self, method: str, uri: str, response_obj, is_return_resp_obj: bool,
+                              raise_error_if_failed: bool):
+        """
+        Args:
+            method (str): one of ("get", "post", "put", "delete")
+            uri (str): e.g. /v1/someApiRequest
+            response_obj (Response|httpx.Response): response of the request
+            is_return_resp_obj (bool): True - returns the Response object, False - returns JSON
+            raise_error_if_failed (bool): the status code must be 2xx and the body must match the endpoint schema,
+                                          SchemaValidationError (AssertionError) is raised otherwise
+
+        Returns:
+            json, (list/dict), or the Response object
+        """
+        if raise_error_if_failed:
+            validate_status(response_obj.status_code)
+            validate_response(method, uri, response_obj.status_code, self.json_decoder.decode_response(response_obj))
+        if is_return_resp_obj:
+            return self.json_decoder.attach(response_obj)
+        return self.json_decoder.decode_response(response_obj)
+
+
+class ApiBase(RequestContextMixin):  # pylint: disable=too-many-instance-attributes
+    """
+    Method for the derived classes, see RequestContextMixin
+    """
+    DEFAULT_TIMEOUT = 30  # seconds, connect and read timeouts of a request
+
+    def __init__(self,
+                 protocol: str,
+                 host: str,
+                 port: str,
+                 pool_config: PoolConfig = None,
+                 retry_policy: RetryPolicy = None,
+                 retry_budget: RetryBudget = None,
+                 circuit_breaker_config: CircuitBreakerConfig = None,
+                 cassette: Cassette = None):
+        """
+        Args:
+            protocol (str): http or https
+            host (str): e.g. google.com
+            port (str): e.g. 443
+            pool_config (PoolConfig): settings of the keep-alive connection pool and the transport,
+                                      defaults are used if not passed
+            retry_policy (RetryPolicy): retries of failed requests, defaults are used if not passed;
+                                        RetryPolicy(max_attempts=1) - no retries
+            retry_budget (RetryBudget): retries allowed in proportion to requests, defaults are used if not passed
+            circuit_breaker_config (CircuitBreakerConfig): per-host circuit breaker, it's shared by all clients
+                                                           of the host, the first client's config is used
+            cassette (Cassette): requests are recorded to / replayed from it, None - every request goes to the wire
+        """
+        self.pool_config = pool_config or PoolConfig()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budget = retry_budget or RetryBudget()
+        self.circuit_breaker_config = circuit_breaker_config or CircuitBreakerConfig()
+        self.cassette = cassette
+        self.metrics = get_registry()
+        self._session = None
+        self._session_lock = threading.Lock()
+        super().__init__(protocol, host, port)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def session(self) -> Transport:
+        """
+        Long-lived transport (pool_config.transport), created on first use, so connections stay warm between requests;
+        it's wrapped by CassetteTransport if the cassette is set
+
+        Returns:
+            Transport
+        """
+        session = self._session
+        if session is None:
+            with self._session_lock:
+                if self._session is None:
+                    transport = build_transport(self.pool_config)
+                    if self.cassette is not None:
+                        transport = CassetteTransport(transport, self.cassette)
+                    self._session = transport
+                session = self._session
+        return session
+
+    def close(self):
+        """
+        Closing the transport and all pooled connections; the next request opens a new one
+        """
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """
+        Circuit breaker of the host, shared by all clients of the host in the process
+        """
+        return get_circuit_breaker(self.endpoint.base_url, self.circuit_breaker_config)
 
     def make_request(self,
                      method: str,
                      uri: str,
                      payload: dict = None,
                      query_params: dict = None,
-                     headers: dict = None):
+                     headers: dict = None,
+                     *,
+                     timeout: float = None,
+                     stream: bool = False,
+                     tee_path: str = None):
         """
         Getting the Response object.
-        Log lines are consolidated into single variable to support concurrent requests, if any are added.
+        Each request is logged as a single record to support concurrent requests;
+        the record is formatted lazily, so it costs almost nothing when DEBUG is disabled.
 
         Args:
             method (str): one of ("get", "post", "put", "delete")
@@ -72,107 +341,243 @@ class ApiBase:
             payload (dict): payload
             query_params (dict): these params will be used in URL
             headers (dict): headers to add to the default ones
+            timeout (float): seconds, connect and read timeouts; DEFAULT_TIMEOUT if not passed
+            stream (bool): True - the body is not read, a StreamedResponse is returned (it must be closed)
+            tee_path (str): with stream=True, the body is also written to this file as it's read
 
         Returns:
-            Response
+            Response, or StreamedResponse if stream=True
+        """
+        method = method.upper()
+        request_config = self._build_request_config(method, uri, payload, query_params, headers, timeout, stream)
+        started = time.perf_counter()
+        try:
+            resp = self._send_with_retries(self.session, request_config)
+        except CircuitOpenError as ex:
+            log.error(f"{method} {request_config['url']}: {ex}")
+            raise
+        except Exception as ex:
+            self.metrics.record_request(RequestTiming(method=method, endpoint=uri,
+                                                      total=time.perf_counter() - started))
+            raise self.request_error(request_config, ex) from ex
+        resp = self._finish_response(method, uri, resp, started, stream, tee_path)
+        if log.is_enabled_for(logging.DEBUG):
+            log.debug_fields(self.BEGIN_REQ,
+                             {"Request config": request_config,
+                              "Response URL": resp.url,
+                              "Response text": "<streamed>" if stream else log.body(resp.content, resp.encoding),
+                              "Response headers": resp.headers,
+                              "Response status code": resp.status_code},
+                             self.END_REQ)
+        return resp
+
+    def _build_request_config(self, method: str, uri: str, payload: dict, query_params: dict, headers: dict,
+                              timeout: float, stream: bool) -> dict:
         """
+        Args:
+            method (str): upper case, e.g. GET
+
+        Returns:
+            dict, arguments of Transport.request()
+
+        Raises:
+            ApiError, if the method is not supported
+        """
+        if timeout is None:
+            timeout = self.DEFAULT_TIMEOUT
         if not payload:
             payload = {}
         if not query_params:
             query_params = {}
-        if not headers:
-            headers = {}
-        client = requests.session()
-        url = f"{self.protocol}://{self.host}:{self.port}{uri}"
-        if headers:
-            self.headers.update(headers)
-        self._unique_request_id_increment += 1
-        method = method.upper()
+        url = build_url(self.endpoint, uri)
+        request_headers = self.build_headers(headers)
         methods_config = {}
-        resp = Response()
         try:
             methods_config = {"GET": {"method": method,
                                       "url": url,
-                                      "headers": self.headers,
+                                      "headers": request_headers,
                                       "params": query_params,
                                       "data": {},
-                                      "timeout": 30,
+                                      "timeout": timeout,
                                       "verify": True,
+                                      "stream": stream,
                                       },
                               "POST": {"method": method,
                                        "url": url,
-                                       "headers": self.headers,
+                                       "headers": request_headers,
                                        "params": query_params,
                                        "data": payload,
-                                       "timeout": 30,
+                                       "timeout": timeout,
                                        "verify": True,
+                                       "stream": stream,
                                        },
                               "DELETE": {"method": method,
                                          "url": url,
-                                         "headers": self.headers,
+                                         "headers": request_headers,
                                          "params": query_params,
                                          "data": payload,
-                                         "timeout": 30,
+                                         "timeout": timeout,
                                          "verify": True,
+                                         "stream": stream,
                                          },
                               "PUT": {"method": method,
                                       "url": url,
-                                      "headers": self.headers,
+                                      "headers": request_headers,
                                       "params": query_params,
                                       "data": payload,
-                                      "timeout": 30,
+                                      "timeout": timeout,
                                       "verify": True,
+                                      "stream": stream,
                                       },
                               }
         except Exception as ex:
             message = f"\n{self.BEGIN_REQ}"
-            message += f"\nURL: {url} \nMethod: {method} \nheaders: {pformat(self.headers)} " \
+            message += f"\nURL: {url} \nMethod: {method} \nheaders: {pformat(request_headers)} " \
                 f"\nparams: {query_params} \npayload: {payload}"
             message += f"\nError: {ex}"
             message += f"\n{self.END_REQ}"
             log.error(message)
             raise ApiError(message) from ex
-        if method in methods_config:
-            message = f"\n{self.BEGIN_REQ}"
-            message += f"\nRequest config: {methods_config[method]}"
-            try:
-                resp = client.request(**methods_config[method])
-                message += f"\nResponse URL: {resp.url}"
-                message += f"\nResponse text: {resp.text}"
-                message += f"\nResponse headers: {resp.headers}"
-                message += f"\nResponse status code: {resp.status_code}"
-                message += f"\n{self.END_REQ}"
-                log.debug(message)
-            except Exception as ex:
-                message += f"\nResponse URL: {resp.url}"
-                message += f"\nResponse text: {resp.text}"
-                message += f"\nResponse headers: {resp.headers}"
-                message += f"\nResponse status code: {resp.status_code}"
-                message += f"\n{self.END_REQ}"
-                log.error(message)
-                raise ApiError(message) from ex
-            client.close()
-        else:
+        if method not in methods_config:
             raise ApiError(f"HTTP method is not implemented: {method}\n")
+        return methods_config[method]
+
+    def _finish_response(self, method: str, uri: str, resp: requests.Response, started: float, stream: bool,
+                         tee_path: str = None):
+        """
+        Recording the request timing; with stream=True it's recorded when the stream is closed
+
+        Returns:
+            Response, or StreamedResponse if stream=True
+        """
+        if stream:
+            return StreamedResponse(resp, tee_path=tee_path,
+                                    on_close=partial(self._record_streamed_request, method, uri, started))
+        self.metrics.record_request(self.get_request_timing(method, uri, resp, started, time.perf_counter()))
         return resp
 
+    def _send_with_retries(self, client: Transport, request_config: dict) -> requests.Response:
+        """
+        Sending the request through the circuit breaker of the host; connection errors, timeouts and
+        the retry_on_status responses are retried by the retry policy while the retry budget allows.
+        The breaker gets the outcome of the whole request once its retries are over, so a request that
+        succeeds after retries doesn't count as a failure
+
+        Returns:
+            Response, the last one if all attempts failed with a status code
+
+        Raises:
+            CircuitOpenError, if the circuit of the host is open
+            Exception, what the last attempt raised, e.g. requests.RequestException
+        """
+        method = request_config["method"]
+        policy = self.retry_policy
+        breaker = self.circuit_breaker
+        if not breaker.allow():
+            raise CircuitOpenError(breaker)
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                resp = client.request(**request_config)
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                delay = policy.get_delay(method, attempt)
+                if delay is None or not self.retry_budget.try_spend():
+                    breaker.record_failure()
+                    raise
+                reason = f"{type(ex).__name__}: {ex}"
+            except BaseException:
+                # Not retried (e.g. ChunkedEncodingError, CassetteMissError); the outcome is still recorded,
+                # so a failed half-open trial re-opens the circuit instead of leaving the trial in flight
+                breaker.record_failure()
+                raise
+            else:
+                delay = policy.get_delay(method, attempt, resp.status_code, resp.headers.get("Retry-After"))
+                if delay is None or not self.retry_budget.try_spend():
+                    if resp.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    return resp
+                resp.close()
+                reason = f"status code {resp.status_code}"
+            log.warning(f"Retrying {method} {request_config['url']} in {delay:.2f} s "
+                        f"(attempt {attempt + 1}/{policy.max_attempts}): {reason}")
+            time.sleep(delay)
+
+    @staticmethod
+    def get_request_timing(method: str, uri: str, resp: requests.Response, started: float,
+                           finished: float, body_size: int = None) -> RequestTiming:
+        """
+        Args:
+            method (str): e.g. GET
+            uri (str): endpoint, e.g. /facts
+            resp (Response): response with the body already read
+            started (float): time.perf_counter() before the request
+            finished (float): time.perf_counter() after the body was read
+            body_size (int): bytes of the body read, len(resp.content) if not passed
+
+        Returns:
+            RequestTiming; sizes are approximate: headers plus the body as read by requests (decompressed)
+        """
+        timing = RequestTiming(method=method, endpoint=uri, status=resp.status_code, total=finished - started)
+        phases = getattr(resp, "connection_phases", None)
+        if phases is not None and phases.headers_received_at is not None:
+            timing.dns, timing.connect, timing.tls = phases.dns, phases.connect, phases.tls
+            timing.ttfb = max(0.0, phases.headers_received_at - started - phases.dns - phases.connect - phases.tls)
+            timing.download = max(0.0, finished - phases.headers_received_at)
+        request = resp.request
+        body = request.body or b""
+        timing.bytes_out = (len(body) + _headers_size(request.headers) + len(request.method or "")
+                            + len(request.url or ""))
+        if body_size is None:
+            body_size = len(resp.content or b"")
+        timing.bytes_in = body_size + _headers_size(resp.headers)
+        return timing
+
+    def _record_streamed_request(self, method: str, uri: str, started: float, streamed: StreamedResponse):
+        """
+        on_close callback of StreamedResponse: the download phase ends when the stream is closed
+        """
+        self.metrics.record_request(self.get_request_timing(method, uri, streamed.response, started,
+                                                            time.perf_counter(), streamed.bytes_read))
+
 
-class ApiJsonRequest(ApiBase):
+class ApiJsonRequest(JsonResponseMixin, ApiBase):
     """
     API methods for the service that returs data in JSON format
     """
 
-    def __init__(self, protocol: str, host: str, port: str):
+    def __init__(self,
+                 protocol: str,
+                 host: str,
+                 port: str,
+                 pool_config: PoolConfig = None,
+                 response_cache: ResponseCache = None,
+                 json_decoder: JsonDecoder = None,
+                 retry_policy: RetryPolicy = None,
+                 retry_budget: RetryBudget = None,
+                 circuit_breaker_config: CircuitBreakerConfig = None,
+                 cassette: Cassette = None):
         """
         Args:
             protocol (str): http or https
             host (str): e.g. google.com
             port (str): e.g. 443
+            pool_config (PoolConfig): settings of the keep-alive connection pool
+            response_cache (ResponseCache): cache of GET responses, None - every request goes to the wire
+            json_decoder (JsonDecoder): defaults to the fastest installed backend
+            retry_policy (RetryPolicy): retries of failed requests
+            retry_budget (RetryBudget): retries allowed in proportion to requests
+            circuit_breaker_config (CircuitBreakerConfig): per-host circuit breaker
+            cassette (Cassette): record/replay of the requests
         """
-        super().__init__(protocol, host, port)
-        headers = {"Content-Type": "application/json",
-                   "Accept": "application/json"}
-        self.append_headers(headers)
+        super().__init__(protocol, host, port, pool_config, retry_policy, retry_budget, circuit_breaker_config,
+                         cassette)
+        self.response_cache = response_cache
+        self.json_decoder = json_decoder or get_decoder()
+        self.append_headers(self.JSON_HEADERS)
 
     def make_request(self,
                      method: str,
@@ -181,7 +586,12 @@ class ApiJsonRequest(ApiBase):
                      query_params: dict = None,
                      headers: dict = None,
                      is_return_resp_obj: bool = False,
-                     raise_error_if_failed: bool = None):
+                     raise_error_if_failed: bool = None,
+                     use_cache: bool = True,
+                     *,
+                     timeout: float = None,
+                     stream: bool = False,
+                     tee_path: str = None):
         """
         Args:
             method (str): one of ("get", "post", "put", "delete")
@@ -190,12 +600,18 @@ class ApiJsonRequest(ApiBase):
             query_params (dict): these params will be used in URL
             headers (dict): headers to add to the default ones
             raise_error_if_failed (bool): If a test should fail when response validation failed;
-                                          TODO: needs to be implemented
+                                          the status code must be 2xx and the body must match the endpoint schema
+                                          (see api.api.schemas), SchemaValidationError (AssertionError) is raised
             is_return_resp_obj (bool): True - returns the Response object, False - returns JSON;
                                        Note: it's needed for API testing
+            use_cache (bool): False - the request goes to the wire even if there is a fresh cached response
+            timeout (float): seconds, connect and read timeouts; DEFAULT_TIMEOUT if not passed
+            stream (bool): True - StreamedResponse is returned (the cache, decoding and validation are skipped),
+                           e.g. streamed.iter_items("data.item") parses the body item by item
+            tee_path (str): with stream=True, the body is also written to this file as it's read
 
         Returns:
-            json, (list/dict)
+            json, (list/dict), or StreamedResponse if stream=True
         """
         if not payload:
             payload = {}
@@ -203,16 +619,107 @@ class ApiJsonRequest(ApiBase):
             query_params = {}
         if not headers:
             headers = {}
-        response_obj = super().make_request(method, uri, payload, query_params, headers)
-        if is_return_resp_obj:
-            return response_obj
-        resp_text = response_obj.text
-        response_json = json.loads(resp_text)
-        # Response validation can be added here.
-        # Use raise_error_if_failed and raise AssertionError if validation failed and raise_error_if_failed is True
-        if raise_error_if_failed:
-            pass
-        return response_json
+        if stream:
+            return super().make_request(method, uri, payload, query_params, headers, timeout=timeout, stream=True,
+                                        tee_path=tee_path)
+        cache = self.response_cache
+        if cache is not None and use_cache and method.upper() == "GET":
+            response_obj = self._make_cached_request(cache, method, uri, query_params, headers, timeout)
+        else:
+            response_obj = super().make_request(method, uri, payload, query_params, headers, timeout=timeout)
+        return self.process_json_response(method, uri, response_obj, is_return_resp_obj, raise_error_if_failed)
+
+    def _make_cached_request(self, cache: ResponseCache, method: str, uri: str, query_params: dict, headers: dict,
+                             timeout: float = None):
+        """
+        GET through the response cache: a fresh entry is returned without a request,
+        an expired one is revalidated with a conditional request
+
+        Returns:
+            Response
+        """
+        url = build_url(self.endpoint, uri)
+        key = cache.make_key(method, url, query_params)
+        entry, is_fresh = (None, False) if cache.is_bypassed else cache.lookup(key)
+        if entry is not None and is_fresh:
+            cache.count("hits")
+            request = requests.Request(method.upper(), url, headers=self.build_headers(headers), params=query_params)
+            return entry.to_response(request.prepare())
+        request_headers = {**headers, **cache.conditional_headers(entry)}
+        response_obj = super().make_request(method, uri, {}, query_params, request_headers, timeout=timeout)
+        if response_obj.status_code == 304 and entry is not None:
+            cache.count("revalidations")
+            cache.refresh(key, entry)
+            return entry.to_response(response_obj.request)
+        cache.count("misses")
+        cache.store(key, response_obj)
+        return response_obj
+
+    def map_requests(self,
+                     specs: list,
+                     max_workers: int = None,
+                     timeout: float = None,
+                     ordered: bool = True,
+                     capture_errors: bool = True,
+                     **request_kwargs):
+        """
+        Fan-out of independent requests over a thread pool; all threads share the pooled session,
+        so max_workers defaults to pool_maxsize (no connection is opened beyond the pool)
+
+            for result in api.map_requests([("get", "/facts", {"page": page}) for page in range(1, 5)]):
+                body = result.result()
+
+        Args:
+            specs (list): RequestSpec or (method, uri[, query_params]) tuples
+            max_workers (int): number of threads, pool_maxsize if not passed
+            timeout (float): seconds, timeout of every request that doesn't have its own one
+            ordered (bool): True - results are yielded in the order of specs, False - as they complete
+            capture_errors (bool): True - errors are kept in RequestResult.error, False - the first error is raised
+            request_kwargs: passed to make_request(), e.g. is_return_resp_obj=True, raise_error_if_failed=True
+
+        Yields:
+            RequestResult
+        """
+        specs = [RequestSpec.from_value(spec) for spec in specs]
+        if not specs:
+            return
+        if self.response_cache is not None and self.response_cache.is_bypassed:
+            # The bypass is thread-local, the worker threads wouldn't see it
+            request_kwargs["use_cache"] = False
+        max_workers = min(len(specs), max_workers or self.pool_config.pool_maxsize)
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api-fan-out")
+        try:
+            futures = [executor.submit(self._run_spec, index, spec, timeout, request_kwargs)
+                       for index, spec in enumerate(specs)]
+            for future in futures if ordered else as_completed(futures):
+                result = future.result()
+                if not capture_errors and result.error is not None:
+                    raise result.error
+                yield result
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def fetch_many(self, specs: list, max_workers: int = None, timeout: float = None, capture_errors: bool = True,
+                   **request_kwargs) -> list:
+        """
+        map_requests() collected into a list in the order of specs
+
+        Returns:
+            list, RequestResult
+        """
+        return list(self.map_requests(specs, max_workers, timeout, True, capture_errors, **request_kwargs))
+
+    def _run_spec(self, index: int, spec: RequestSpec, timeout: float, request_kwargs: dict) -> RequestResult:
+        result = RequestResult(index=index, spec=spec)
+        started = time.perf_counter()
+        try:
+            result.value = self.make_request(spec.method, spec.uri, spec.payload, spec.query_params, spec.headers,
+                                             timeout=spec.timeout if spec.timeout is not None else timeout,
+                                             **request_kwargs)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            result.error = ex
+        result.elapsed = time.perf_counter() - started
+        return result
 
 
 class PublicApi(ApiJsonRequest):
@@ -227,12 +734,7 @@ class PublicApi(ApiJsonRequest):
         Returns:
             dict
         """
-        query_params = {}
-        if page is not None:
-            query_params["page"] = page
-        if limit is not None:
-            query_params["limit"] = limit
-        resp = self.make_request("get", "/facts", {}, query_params, {})
+        resp = self.make_request("get", "/facts", {}, page_query_params(page, limit), {})
         return resp
 
     def get_breeds(self):
@@ -244,3 +746,66 @@ class PublicApi(ApiJsonRequest):
         """
         resp = self.make_request("get", "/breeds", {}, {}, {})
         return resp
+
+    def iter_pages(self, limit=None, start_page: int = 1, prefetch: bool = True):
+        """
+        Generator over the /facts pages, it follows current_page/last_page/next_page_url.
+        While the current page is being consumed, the next one is fetched in the background,
+        so only two pages are kept in memory at most.
+
+        Args:
+            limit (int): page size
+            start_page (int): the 1st page to fetch
+            prefetch (bool): False - pages are fetched one after another in the caller thread
+
+        Yields:
+            dict, page body
+        """
+        if not prefetch:
+            page = start_page
+            while page is not None:
+                body = self.get_facts(page, limit)
+                page = self.get_next_page(body)
+                yield body
+            return
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="facts-prefetch")
+        try:
+            future = executor.submit(self.get_facts, start_page, limit)
+            while future is not None:
+                body = future.result()
+                page = self.get_next_page(body)
+                future = executor.submit(self.get_facts, page, limit) if page is not None else None
+                yield body
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def iter_facts(self, limit=None, start_page: int = 1, prefetch: bool = True):
+        """
+        Generator over all facts of all /facts pages, see iter_pages()
+
+        Yields:
+            dict, e.g. {"fact": "...", "length": 10}
+        """
+        for body in self.iter_pages(limit, start_page, prefetch):
+            yield from body.get("data", [])
+
+    @staticmethod
+    def get_next_page(body: dict):
+        """
+        Args:
+            body (dict): /facts page body
+
+        Returns:
+            int, the next page number or None if it's the last page
+        """
+        current_page = body.get("current_page")
+        last_page = body.get("last_page")
+        next_page_url = body.get("next_page_url")
+        if not next_page_url:
+            return None
+        if current_page is not None and last_page is not None and current_page >= last_page:
+            return None
+        page = parse_qs(urlparse(next_page_url).query).get("page")
+        if page:
+            return int(page[0])
+        return current_page + 1 if current_page is not None else None
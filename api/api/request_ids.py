@@ -0,0 +1,44 @@
+"""
+Request IDs unique per request across threads, tasks and processes
+"""
+
+import itertools
+import threading
+import uuid
+
+
+class RequestIdGenerator:  # pylint: disable=too-few-public-methods
+    """
+    Atomic, monotonic ID generator: "<counter>_<prefix>", the counter grows by 1 with every ID,
+    the random prefix makes the IDs unique across generators and processes (e.g. pytest-xdist workers)
+    """
+    HEADER = "Unique-RequestId"
+
+    def __init__(self, prefix: str = None):
+        """
+        Args:
+            prefix (str): fixed part of the IDs, a random 16-char hex string if not passed
+        """
+        self.prefix = prefix or uuid.uuid4().hex[:16]
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> str:
+        """
+        Returns:
+            str, e.g. 42_3f2a9c0d1e4b5a6f
+        """
+        with self._lock:
+            value = next(self._counter)
+        return f"{value}_{self.prefix}"
+
+
+_default_generator = RequestIdGenerator()
+
+
+def get_request_id_generator() -> RequestIdGenerator:
+    """
+    Returns:
+        RequestIdGenerator, shared by all API clients of the process, so the IDs never repeat between clients
+    """
+    return _default_generator
@@ -0,0 +1,223 @@
+"""
+Transport-level resilience of the API client: retry policy with backoff and jitter, retry budget, circuit breaker
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+
+@dataclass(slots=True)
+class RetryPolicy:  # pylint: disable=too-many-instance-attributes
+    """
+    When and how long to wait before a request is retried; the wait is exponential backoff with full jitter,
+    uniform(0, min(backoff_max, backoff_base * 2 ** retry_number)), or the Retry-After of the response
+    """
+    max_attempts: int = 3  # the first attempt included, 1 - no retries
+    backoff_base: float = 0.2  # seconds
+    backoff_max: float = 10  # seconds
+    retry_on_status: tuple = (429, 502, 503, 504)
+    retry_methods: tuple = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")  # idempotent ones, POST is not retried
+    respect_retry_after: bool = True
+    retry_after_max: float = 30  # seconds, a longer Retry-After is not waited for, the response is returned
+
+    def backoff(self, retry_number: int) -> float:
+        """
+        Args:
+            retry_number (int): 0 for the first retry
+
+        Returns:
+            float, seconds
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry_number))  # nosec
+
+    def get_delay(self, method: str, attempt: int, status_code: int = None, retry_after: str = None):
+        """
+        Args:
+            method (str): e.g. GET
+            attempt (int): number of the failed attempt, 1 - the first one
+            status_code (int): response status code, None - the request raised a connection error or timeout
+            retry_after (str): Retry-After header of the response
+
+        Returns:
+            float, seconds to wait before the next attempt, or None if the request must not be retried
+        """
+        if attempt >= self.max_attempts or method.upper() not in self.retry_methods:
+            return None
+        if status_code is not None and status_code not in self.retry_on_status:
+            return None
+        if self.respect_retry_after and retry_after:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                return delay if delay <= self.retry_after_max else None
+        return self.backoff(attempt - 1)
+
+
+def parse_retry_after(value: str):
+    """
+    Args:
+        value (str): Retry-After header, seconds or an HTTP date
+
+    Returns:
+        float, seconds (0 if the date is in the past), or None if the value is malformed
+    """
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryBudget:
+    """
+    Retries allowed in proportion to requests: every request deposits `ratio` tokens, every retry spends one;
+    when an endpoint fails for everyone, retries stop instead of multiplying the load. Thread-safe.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10, max_tokens: float = 100):
+        """
+        Args:
+            ratio (float): retries per request on average, e.g. 0.2 - at most 1 retry per 5 requests
+            min_tokens (float): initial tokens, so the first requests of a session can be retried too
+            max_tokens (float): cap of the saved tokens
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min(min_tokens, max_tokens)
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        """
+        Tokens left
+        """
+        return self._tokens
+
+    def deposit(self):
+        """
+        Called for every request (not for the retries)
+        """
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """
+        Returns:
+            bool, True if a retry is allowed (a token is spent)
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+@dataclass(slots=True)
+class CircuitBreakerConfig:
+    """
+    Settings of the per-host circuit breaker
+    """
+    # consecutive failed requests (connection error, timeout or 5xx after the retries) that open the circuit, 0 - off
+    failure_threshold: int = 5
+    reset_timeout: float = 30  # seconds the circuit stays open before a trial request is let through
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker: closed -> open after failure_threshold consecutive failures; while open, requests
+    fail fast; after reset_timeout one trial request is let through (half-open), its result closes or re-opens
+    the circuit. Thread-safe.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, config: CircuitBreakerConfig = None):
+        """
+        Args:
+            name (str): e.g. https://catfact.ninja:443
+            config (CircuitBreakerConfig): defaults are used if not passed
+        """
+        self.name = name
+        self.config = config or CircuitBreakerConfig()
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Returns:
+            bool, False if the request must fail fast
+        """
+        if self.config.failure_threshold <= 0:
+            return True
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.config.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        """
+        Returns:
+            float, seconds until a trial request is let through, 0 if the circuit is not open
+        """
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.config.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        """
+        Closing the circuit
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """
+        Counting the failure; the circuit opens at the threshold or if the trial request failed
+        """
+        if self.config.failure_threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.config.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, config: CircuitBreakerConfig = None) -> CircuitBreaker:
+    """
+    Args:
+        name (str): host key, e.g. https://catfact.ninja:443
+        config (CircuitBreakerConfig): used when the breaker of the host is created
+
+    Returns:
+        CircuitBreaker, shared by all clients of the host in the process
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, config)
+        return breaker
@@ -0,0 +1,334 @@
+"""
+Response cache for idempotent GET requests: in-memory LRU with TTL, optional on-disk store, conditional requests
+"""
+
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from tools.logger.logger import Logger
+
+
+log = Logger(__name__)
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    """
+    Response data kept in the cache
+    """
+    url: str
+    status_code: int
+    headers: dict
+    content: bytes
+    encoding: str = None
+    reason: str = "OK"
+    stored_at: float = field(default_factory=time.time)
+
+    @property
+    def etag(self) -> str:
+        """
+        ETag header of the cached response, if any
+        """
+        return CaseInsensitiveDict(self.headers).get("ETag")
+
+    @property
+    def last_modified(self) -> str:
+        """
+        Last-Modified header of the cached response, if any
+        """
+        return CaseInsensitiveDict(self.headers).get("Last-Modified")
+
+    @classmethod
+    def from_response(cls, resp: requests.Response) -> "CachedResponse":
+        """
+        Args:
+            resp (Response): response to cache
+
+        Returns:
+            CachedResponse
+        """
+        return cls(url=resp.url, status_code=resp.status_code, headers=dict(resp.headers),
+                   content=resp.content, encoding=resp.encoding, reason=resp.reason)
+
+    def to_response(self, request: requests.PreparedRequest = None) -> requests.Response:
+        """
+        Building a new Response object from the cached data, so callers can't change the cached one
+
+        Args:
+            request (PreparedRequest): request the response is returned for, set as resp.request
+
+        Returns:
+            Response
+        """
+        resp = requests.Response()
+        resp.url = self.url
+        resp.status_code = self.status_code
+        resp.headers = CaseInsensitiveDict(self.headers)
+        resp.encoding = self.encoding
+        resp.reason = self.reason
+        resp.request = request
+        resp._content = self.content  # pylint: disable=protected-access
+        resp._content_consumed = True  # pylint: disable=protected-access
+        return resp
+
+    def to_dict(self) -> dict:
+        """
+        JSON serializable representation for the on-disk store
+        """
+        result = asdict(self)
+        result["content"] = base64.b64encode(self.content).decode("ascii")
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CachedResponse":
+        """
+        Args:
+            data (dict): data returned by to_dict()
+
+        Returns:
+            CachedResponse
+        """
+        data = dict(data)
+        data["content"] = base64.b64decode(data["content"])
+        return cls(**data)
+
+
+class MemoryCacheStore:
+    """
+    Thread-safe LRU store
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Args:
+            max_entries (int): the least recently used entries are evicted above this number
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedResponse:
+        """
+        Returns:
+            CachedResponse or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse):
+        """
+        Storing the entry and evicting the least recently used ones
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removing all entries
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCacheStore:
+    """
+    On-disk store, one JSON file per entry; e.g. under HOST_ARTIFACTS to survive test reruns
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): where entries are stored, created if it does not exist
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key: str) -> CachedResponse:
+        """
+        Returns:
+            CachedResponse or None if there is no entry or it can't be read
+        """
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as cache_file:
+                return CachedResponse.from_dict(json.load(cache_file))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as ex:
+            log.warning(f"Failed to read the cached response for '{key}': {ex}")
+            return None
+
+    def set(self, key: str, entry: CachedResponse):
+        """
+        Storing the entry; the file is replaced atomically, so concurrent readers never see a partial one
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(entry.to_dict(), cache_file)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        """
+        Removing all entries
+        """
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(".json"):
+                os.remove(os.path.join(self.directory, file_name))
+
+
+class ResponseCache:  # pylint: disable=too-many-instance-attributes
+    """
+    Cache of GET responses with TTL; expired entries that have ETag/Last-Modified are revalidated
+    with If-None-Match/If-Modified-Since instead of being downloaded again
+    """
+    CACHEABLE_STATUS_CODES = (200, 203)
+    CACHEABLE_ERROR_STATUS_CODES = (404, 410)  # cached only with cache_errors=True
+
+    def __init__(self, ttl: float = 300, max_entries: int = 256, disk_dir: str = None, cache_errors: bool = False):
+        """
+        Args:
+            ttl (float): seconds an entry is fresh and returned without going to the wire
+            max_entries (int): size of the in-memory LRU
+            disk_dir (str): directory of the on-disk store, None - in-memory only
+            cache_errors (bool): True - 404/410 responses are cached too, so a test of a missing resource
+                                 may get the cached error after the resource is created
+        """
+        self.ttl = ttl
+        self.cacheable_status_codes = self.CACHEABLE_STATUS_CODES
+        if cache_errors:
+            self.cacheable_status_codes += self.CACHEABLE_ERROR_STATUS_CODES
+        self.memory_store = MemoryCacheStore(max_entries)
+        self.disk_store = DiskCacheStore(disk_dir) if disk_dir else None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._bypass = threading.local()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict, hit/miss counters
+        """
+        return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations}
+
+    @property
+    def is_bypassed(self) -> bool:
+        """
+        True if the cache is bypassed in the current thread, see bypass()
+        """
+        return getattr(self._bypass, "active", False)
+
+    @contextlib.contextmanager
+    def bypass(self):
+        """
+        Context manager for the code that must hit the wire; the fresh responses are still stored
+        """
+        previous = self.is_bypassed
+        self._bypass.active = True
+        try:
+            yield self
+        finally:
+            self._bypass.active = previous
+
+    @staticmethod
+    def make_key(method: str, url: str, query_params: dict = None) -> str:
+        """
+        Args:
+            method (str): e.g. GET
+            url (str): full URL with the scheme, host and port, e.g. https://catfact.ninja:443/facts,
+                       so clients of different hosts sharing a store don't get each other's entries
+            query_params (dict): query params
+
+        Returns:
+            str, cache key, query params order doesn't matter
+        """
+        params = json.dumps(query_params or {}, sort_keys=True, default=str)
+        return f"{method.upper()} {url} {params}"
+
+    def lookup(self, key: str) -> tuple:
+        """
+        Returns:
+            tuple, (CachedResponse or None, is_fresh)
+        """
+        entry = self.memory_store.get(key)
+        if entry is None and self.disk_store:
+            entry = self.disk_store.get(key)
+            if entry is not None:
+                self.memory_store.set(key, entry)
+        if entry is None:
+            return None, False
+        return entry, time.time() - entry.stored_at < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: CachedResponse) -> dict:
+        """
+        Returns:
+            dict, If-None-Match/If-Modified-Since headers for revalidating the entry
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, key: str, resp: requests.Response):
+        """
+        Storing the response if it's cacheable
+        """
+        if resp.status_code not in self.cacheable_status_codes:
+            return
+        if "no-store" in resp.headers.get("Cache-Control", ""):
+            return
+        entry = CachedResponse.from_response(resp)
+        self.memory_store.set(key, entry)
+        if self.disk_store:
+            self.disk_store.set(key, entry)
+
+    def refresh(self, key: str, entry: CachedResponse):
+        """
+        The entry is confirmed by 304 Not Modified, so it's fresh again
+        """
+        entry.stored_at = time.time()
+        self.memory_store.set(key, entry)
+        if self.disk_store:
+            self.disk_store.set(key, entry)
+
+    def count(self, counter: str):
+        """
+        Args:
+            counter (str): one of hits, misses, revalidations
+        """
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def clear(self):
+        """
+        Removing all entries from all stores
+        """
+        self.memory_store.clear()
+        if self.disk_store:
+            self.disk_store.clear()
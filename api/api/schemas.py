@@ -0,0 +1,240 @@
+"""
+Declarative response schemas compiled once into validator callables
+
+Schema format:
+    {"type": dict, "required": {"key": <schema>, ...}, "optional": {"key": <schema>, ...}}
+    {"type": list, "items": <schema>}
+    {"type": str}  # any type or tuple of types accepted by isinstance
+"""
+
+from functools import lru_cache
+
+
+class SchemaValidationError(AssertionError):
+    """
+    Raised when a response doesn't match its schema; AssertionError, so pytest reports it as a test failure
+    """
+    def __init__(self, path: str, error_msg: str):
+        """
+        Args:
+            path (str): path to the invalid value, e.g. $.data[3].breed
+            error_msg (str): error message
+        """
+        self.path = path
+        self.error_msg = error_msg
+        super().__init__(f"Response validation failed at {path}: {error_msg}")
+
+    def with_parent(self, parent_path: str) -> "SchemaValidationError":
+        """
+        Returns:
+            SchemaValidationError, the same error with the path prefixed by the parent one
+        """
+        return SchemaValidationError(f"{parent_path}{self.path}", self.error_msg)
+
+
+def _type_name(types) -> str:
+    if isinstance(types, tuple):
+        return "/".join(item.__name__ for item in types)
+    return types.__name__
+
+
+def compile_schema(schema: dict):
+    """
+    Compiling the schema into a validator; nested schemas are compiled once here,
+    so validating a value is only isinstance checks and subset checks of key sets
+
+    Args:
+        schema (dict): see the module docstring
+
+    Returns:
+        callable, validator(value) raising SchemaValidationError
+    """
+    validator = _compile(schema)
+
+    def validate(value):
+        try:
+            validator(value)
+        except SchemaValidationError as ex:
+            raise ex.with_parent("$") from None
+    return validate
+
+
+def _compile(schema: dict):
+    """
+    Nested validators raise SchemaValidationError with the path relative to the validated value;
+    the path is only built when validation fails, so the happy path doesn't format strings
+    """
+    expected_type = schema.get("type", object)
+    type_name = _type_name(expected_type)
+    if expected_type is dict or "required" in schema or "optional" in schema:
+        return _compile_dict(schema, type_name)
+    if expected_type is list or "items" in schema:
+        return _compile_list(schema, type_name)
+
+    def validate_type(value):
+        if not isinstance(value, expected_type):
+            raise SchemaValidationError("", f"expected {type_name}, got {type(value).__name__}")
+    return validate_type
+
+
+def _compile_dict(schema: dict, type_name: str):
+    required = schema.get("required", {})
+    optional = schema.get("optional", {})
+    required_keys = frozenset(required)
+    # Scalar fields are checked inline with isinstance, only nested containers get their own validator call
+    scalar_checks = []
+    nested_checks = []
+    for fields, is_required in ((required, True), (optional, False)):
+        for key, field_schema in fields.items():
+            if set(field_schema) <= {"type"} and field_schema.get("type") not in (dict, list):
+                field_type = field_schema.get("type", object)
+                scalar_checks.append((key, field_type, _type_name(field_type), is_required))
+            else:
+                nested_checks.append((key, _compile(field_schema), is_required))
+
+    def validate_dict(value):
+        if not isinstance(value, dict):
+            raise SchemaValidationError("", f"expected {type_name}, got {type(value).__name__}")
+        if not required_keys <= value.keys():
+            missing = sorted(required_keys - value.keys())
+            raise SchemaValidationError("", f"missing required keys {missing}")
+        for key, field_type, field_type_name, is_required in scalar_checks:
+            if not is_required and key not in value:
+                continue
+            field_value = value[key]
+            if not isinstance(field_value, field_type):
+                raise SchemaValidationError(f".{key}",
+                                            f"expected {field_type_name}, got {type(field_value).__name__}")
+        for key, validator, is_required in nested_checks:
+            if not is_required and key not in value:
+                continue
+            try:
+                validator(value[key])
+            except SchemaValidationError as ex:
+                raise ex.with_parent(f".{key}") from None
+    return validate_dict
+
+
+def _compile_list(schema: dict, type_name: str):
+    item_schema = schema.get("items")
+    item_validator = _compile(item_schema) if item_schema else None
+
+    def validate_list(value):
+        if not isinstance(value, list):
+            raise SchemaValidationError("", f"expected {type_name}, got {type(value).__name__}")
+        if item_validator is None:
+            return
+        index = 0
+        try:
+            for index, item in enumerate(value):
+                item_validator(item)
+        except SchemaValidationError as ex:
+            raise ex.with_parent(f"[{index}]") from None
+    return validate_list
+
+
+def _page_schema(item_schema: dict) -> dict:
+    """
+    Laravel-style paginated response of catfact.ninja
+    """
+    return {"type": dict,
+            "required": {"current_page": {"type": int},
+                         "data": {"type": list, "items": item_schema},
+                         "per_page": {"type": (int, str)},
+                         "last_page": {"type": int},
+                         "total": {"type": int}},
+            "optional": {"next_page_url": {"type": (str, type(None))},
+                         "prev_page_url": {"type": (str, type(None))}}}
+
+
+FACT_SCHEMA = {"type": dict,
+               "required": {"fact": {"type": str},
+                            "length": {"type": int}}}
+
+BREED_SCHEMA = {"type": dict,
+                "required": {"breed": {"type": str},
+                             "country": {"type": str},
+                             "origin": {"type": str},
+                             "coat": {"type": str},
+                             "pattern": {"type": str}}}
+
+# (HTTP method, uri) -> schema of one item of the "data" list of a paginated response
+ITEM_SCHEMAS = {
+    ("GET", "/facts"): FACT_SCHEMA,
+    ("GET", "/breeds"): BREED_SCHEMA,
+}
+
+# (HTTP method, uri) -> schema of the response body
+RESPONSE_SCHEMAS = {
+    ("GET", "/facts"): _page_schema(FACT_SCHEMA),
+    ("GET", "/fact"): FACT_SCHEMA,
+    ("GET", "/breeds"): _page_schema(BREED_SCHEMA),
+}
+
+
+@lru_cache(maxsize=None)
+def get_validator(method: str, uri: str):
+    """
+    Args:
+        method (str): e.g. get
+        uri (str): e.g. /facts
+
+    Returns:
+        callable, compiled validator of the endpoint (compiled on the first call, then cached),
+        or None if the endpoint has no schema
+    """
+    schema = RESPONSE_SCHEMAS.get((method.upper(), uri))
+    if schema is None:
+        return None
+    return compile_schema(schema)
+
+
+@lru_cache(maxsize=None)
+def get_item_validator(method: str, uri: str):
+    """
+    Validator of a single "data" item, e.g. for items parsed from a streamed body
+
+    Args:
+        method (str): e.g. get
+        uri (str): e.g. /facts
+
+    Returns:
+        callable, compiled validator, or None if the endpoint has no item schema
+    """
+    schema = ITEM_SCHEMAS.get((method.upper(), uri))
+    if schema is None:
+        return None
+    return compile_schema(schema)
+
+
+def validate_status(status_code: int):
+    """
+    Checking the status code before the body is decoded, an error page is often not JSON
+
+    Args:
+        status_code (int): response status code
+
+    Raises:
+        SchemaValidationError, if the status code is not 2xx
+    """
+    if not 200 <= status_code < 300:
+        raise SchemaValidationError("status_code", f"expected 2xx, got {status_code}")
+
+
+def validate_response(method: str, uri: str, status_code: int, body):
+    """
+    Checking the status code and the body against the compiled schema of the endpoint, if it has one
+
+    Args:
+        method (str): e.g. get
+        uri (str): e.g. /facts
+        status_code (int): response status code
+        body (list/dict): parsed response body
+
+    Raises:
+        SchemaValidationError
+    """
+    validate_status(status_code)
+    validator = get_validator(method, uri)
+    if validator is not None:
+        validator(body)
@@ -0,0 +1,199 @@
+"""
+Pooled keep-alive HTTP sessions
+"""
+
+import socket
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, LocationParseError, NameResolutionError, NewConnectionError
+from urllib3.util import connection
+from urllib3.util.retry import Retry
+
+
+@dataclass(slots=True)
+class PoolConfig:  # pylint: disable=too-many-instance-attributes
+    """
+    Connection pool settings of the long-lived session used by ApiBase
+    """
+    pool_connections: int = 10  # number of per-host pools to cache
+    pool_maxsize: int = 10  # max number of connections kept alive per host
+    max_retries: int = 0  # connection-level retries done by the adapter
+    backoff_factor: float = 0.3
+    keep_alive: bool = True
+    pool_block: bool = False  # True - wait for a free connection instead of opening a new one
+    transport: str = "requests"  # requests (HTTP/1.1) or httpx-h2 (HTTP/2), see api.api.transports
+    http2_prior_knowledge: bool = False  # httpx-h2 only: HTTP/2 without negotiation, for http:// (h2c) servers
+
+
+class ConnectionPhases:  # pylint: disable=too-few-public-methods
+    """
+    Connection phases of the request in flight, seconds; all zeros if a pooled connection was reused
+    """
+    __slots__ = ("dns", "connect", "tls", "headers_received_at")
+
+    def __init__(self):
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.headers_received_at = None  # time.perf_counter() when the adapter got the response headers
+
+
+_current_phases = threading.local()
+
+
+def _connect_any(addresses: list, timeout, source_address, socket_options) -> socket.socket:
+    """
+    Connecting to the resolved addresses in order until one accepts, like urllib3 does (e.g. IPv6 first, then IPv4)
+
+    Args:
+        addresses (list): socket.getaddrinfo() results
+        timeout: connect timeout of every attempt
+        source_address (tuple): (host, port) to bind to, None - any
+        socket_options (list): urllib3 socket options
+
+    Returns:
+        socket.socket, connected
+
+    Raises:
+        OSError, the error of the last attempt
+    """
+    error = None
+    for *_, sockaddr in addresses:
+        try:
+            return connection.create_connection(sockaddr[:2], timeout, source_address=source_address,
+                                                socket_options=socket_options)
+        except OSError as ex:
+            error = ex
+    if error is not None:
+        raise error
+    raise OSError("getaddrinfo returns an empty list")
+
+
+class _TimedConnectionMixin:  # pylint: disable=too-few-public-methods
+    """
+    Measures DNS resolution and TCP connect separately: the host is resolved here and the resolved addresses
+    are passed to urllib3's create_connection(); urllib3's errors and the fallback over the addresses are kept
+    """
+
+    def _new_conn(self):
+        phases = getattr(_current_phases, "value", None)
+        if phases is None:
+            return super()._new_conn()
+        host = self._dns_host.strip("[]")
+        try:
+            host.encode("idna")
+        except UnicodeError:
+            raise LocationParseError(f"'{host}', label empty or too long") from None
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, connection.allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as ex:
+            raise NameResolutionError(self.host, self, ex) from ex
+        finally:
+            resolved = time.perf_counter()
+            phases.dns += resolved - started
+        try:
+            sock = _connect_any(addresses, self.timeout, self.source_address, self.socket_options)
+        except TimeoutError as ex:
+            raise ConnectTimeoutError(self, f"Connection to {self.host} timed out. "
+                                            f"(connect timeout={self.timeout})") from ex
+        except OSError as ex:
+            raise NewConnectionError(self, f"Failed to establish a new connection: {ex}") from ex
+        finally:
+            phases.connect += time.perf_counter() - resolved
+        sys.audit("http.client.connect", self, self.host, self.port)
+        return sock
+
+
+class _TimedTlsMixin:  # pylint: disable=too-few-public-methods
+    """
+    Measures the TLS handshake: connect() = DNS + TCP connect (measured by _new_conn) + TLS handshake
+    """
+
+    def connect(self):
+        """
+        Connecting and adding the handshake time to the phases of the request in flight
+        """
+        phases = getattr(_current_phases, "value", None)
+        if phases is None:
+            super().connect()
+            return
+        before = phases.dns + phases.connect
+        started = time.perf_counter()
+        super().connect()
+        phases.tls += max(0.0, time.perf_counter() - started - (phases.dns + phases.connect - before))
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedTlsMixin, _TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that attaches ConnectionPhases to every response as response.connection_phases
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                                   "https": _TimedHTTPSConnectionPool}
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        phases = ConnectionPhases()
+        _current_phases.value = phases
+        try:
+            response = super().send(request, *args, **kwargs)
+        finally:
+            _current_phases.value = None
+        phases.headers_received_at = time.perf_counter()
+        response.connection_phases = phases
+        return response
+
+
+def build_session(pool_config: PoolConfig = None) -> requests.Session:
+    """
+    Creating the session with the pooled adapter mounted for both http and https
+
+    Args:
+        pool_config (PoolConfig): pool settings, defaults are used if not passed
+
+    Returns:
+        requests.Session
+    """
+    if pool_config is None:
+        pool_config = PoolConfig()
+    retry = Retry(total=pool_config.max_retries,
+                  connect=pool_config.max_retries,
+                  read=pool_config.max_retries,
+                  status=0,
+                  backoff_factor=pool_config.backoff_factor,
+                  raise_on_status=False)
+    adapter = TimingAdapter(pool_connections=pool_config.pool_connections,
+                          pool_maxsize=pool_config.pool_maxsize,
+                          max_retries=retry,
+                          pool_block=pool_config.pool_block)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not pool_config.keep_alive:
+        session.headers["Connection"] = "close"
+    return session
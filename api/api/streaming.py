@@ -0,0 +1,328 @@
+"""
+Streaming of large response bodies: chunks with bounded memory, tee to a file, incremental JSON items
+"""
+
+import codecs
+import json
+import os
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_VALUE_SIZE = 16 * 1024 * 1024  # chars of one undecoded JSON value held by the built-in parser
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class _ChunkReader:  # pylint: disable=too-few-public-methods
+    """
+    File-like object over an iterator of byte chunks, it's what ijson reads from
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Args:
+            size (int): max number of bytes, -1 - everything that is left
+
+        Returns:
+            bytes, b"" at the end
+        """
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class _JsonTextStream:
+    """
+    Text of a JSON document decoded chunk by chunk; only the unread part of the last chunks is kept
+    """
+
+    def __init__(self, chunks, encoding: str = "utf-8", max_value_size: int = DEFAULT_MAX_VALUE_SIZE):
+        self.max_value_size = max_value_size
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._json = json.JSONDecoder()
+        self._text = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """
+        Returns:
+            bool, False if the body is over
+        """
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            decoded = self._decoder.decode(b"", final=True)
+        else:
+            decoded = self._decoder.decode(chunk)
+        self._text = self._text[self._pos:] + decoded
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Returns:
+            str, the next non-whitespace char (not consumed), "" at the end of the body
+        """
+        while True:
+            text, pos = self._text, self._pos
+            while pos < len(text) and text[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(text):
+                return text[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        """
+        Consuming the next non-whitespace char
+
+        Raises:
+            ValueError, if it's not the expected one
+        """
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed JSON: expected '{char}', got '{found or 'end of body'}'")
+        self._pos += 1
+
+    def value(self):
+        """
+        Returns:
+            the next JSON value (string, number, literal, object or array), decoded and consumed
+
+        Raises:
+            ValueError, if the value is malformed or longer than max_value_size
+                        (a malformed body isn't buffered to its end)
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._text, self._pos)
+            except json.JSONDecodeError:
+                if len(self._text) - self._pos > self.max_value_size:
+                    raise ValueError(f"Malformed JSON or a value longer than {self.max_value_size} chars "
+                                     f"at: {self._text[self._pos:self._pos + 80]!r}") from None
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the text may continue in the next chunk, e.g. "1" + ".5"
+            if (end >= len(self._text) or self._text[end] in _NUMBER_CHARS) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def _seek_key(stream: _JsonTextStream, key: str):
+    """
+    Moving the stream to the value of the key of the object that starts at the current position;
+    values of the other keys are skipped one by one
+
+    Raises:
+        ValueError, if the value is not an object or has no such key
+    """
+    found = stream.peek()
+    if found != "{":
+        raise ValueError(f"Key '{key}' not found: expected an object, got '{found or 'end of body'}'")
+    stream.expect("{")
+    if stream.peek() == "}":
+        raise ValueError(f"Key '{key}' not found")
+    while True:
+        name = stream.value()
+        stream.expect(":")
+        if name == key:
+            return
+        stream.value()
+        if stream.peek() != ",":
+            stream.expect("}")
+            raise ValueError(f"Key '{key}' not found")
+        stream.expect(",")
+
+
+def iter_json_items(chunks, prefix: str = "item", encoding: str = "utf-8",
+                    max_item_size: int = DEFAULT_MAX_VALUE_SIZE):
+    """
+    Built-in incremental parser with the ijson prefix syntax: "item" - items of the top-level array,
+    "data.item" - items of the array under the "data" key. One item is held in memory at a time.
+    Nested arrays in the prefix (e.g. "item.tags.item") need ijson.
+
+    Args:
+        chunks (iterable): bytes chunks of the body
+        prefix (str): path of the array
+        encoding (str): body encoding
+        max_item_size (int): chars of one item (or of a skipped value) held undecoded at most
+
+    Yields:
+        decoded items
+
+    Raises:
+        ValueError, if a key of the prefix is missing, the value at the prefix is not an array,
+                    or the body is malformed
+    """
+    keys = prefix.split(".")
+    if keys[-1] != "item" or "item" in keys[:-1]:
+        raise ValueError(f"Unsupported prefix '{prefix}', expected '[<key>.]*item' (install ijson for other prefixes)")
+    stream = _JsonTextStream(chunks, encoding, max_item_size)
+    for key in keys[:-1]:
+        _seek_key(stream, key)
+    stream.expect("[")
+    if stream.peek() == "]":
+        return
+    while True:
+        yield stream.value()
+        if stream.peek() != ",":
+            stream.expect("]")
+            return
+        stream.expect(",")
+
+
+class StreamedResponse:
+    """
+    Response requested with stream=True; the body is read once, chunk by chunk, and every chunk is written
+    to the tee file (if set) as it arrives, so memory use depends on the chunk size, not on the body size:
+
+        with api.make_request("get", "/facts", query_params={"limit": 1000}, stream=True, tee_path=path) as streamed:
+            for fact in streamed.iter_items("data.item"):
+                validate(fact)
+    """
+
+    def __init__(self, response, chunk_size: int = DEFAULT_CHUNK_SIZE, tee_path: str = None, on_close=None):
+        """
+        Args:
+            response (Response): response with the body not read yet
+            chunk_size (int): bytes per chunk
+            tee_path (str): the body is also written to this file, e.g. under HOST_ARTIFACTS
+            on_close (callable): on_close(streamed_response), called once when the response is closed
+        """
+        self.response = response
+        self.chunk_size = chunk_size
+        self.tee_path = tee_path
+        self.bytes_read = 0
+        self._on_close = on_close
+        self._chunks = None
+        self._closed = False
+
+    @property
+    def status_code(self) -> int:
+        """
+        Response status code
+        """
+        return self.response.status_code
+
+    @property
+    def url(self) -> str:
+        """
+        Response URL
+        """
+        return self.response.url
+
+    @property
+    def headers(self):
+        """
+        Response headers
+        """
+        return self.response.headers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def iter_chunks(self):
+        """
+        Returns:
+            iterator of bytes chunks (content-encoding already decoded)
+
+        Raises:
+            RuntimeError, if the body was already read
+        """
+        if self._chunks is not None:
+            raise RuntimeError("The streamed body can be read only once")
+        self._chunks = self._read_chunks()
+        return self._chunks
+
+    def _read_chunks(self):
+        tee_file = None
+        if self.tee_path:
+            os.makedirs(os.path.dirname(self.tee_path) or ".", exist_ok=True)
+            tee_file = open(self.tee_path, "wb")  # pylint: disable=consider-using-with
+        try:
+            for chunk in self.response.iter_content(self.chunk_size):
+                if not chunk:
+                    continue
+                self.bytes_read += len(chunk)
+                if tee_file is not None:
+                    tee_file.write(chunk)
+                yield chunk
+        finally:
+            if tee_file is not None:
+                tee_file.close()
+
+    def iter_items(self, prefix: str = "item", drain: bool = True):
+        """
+        Incremental JSON parsing of the body, ijson is used if installed (floats are returned as float)
+
+        Args:
+            prefix (str): ijson prefix of the items, e.g. "data.item" for the items of a paginated response
+            drain (bool): True - the rest of the body is read after the last item (it completes the tee file
+                          and returns the connection to the pool)
+
+        Yields:
+            decoded items
+
+        Raises:
+            ValueError, if the body is malformed; without ijson also if the body has no array at the prefix
+            (ijson yields nothing then)
+        """
+        chunks = self.iter_chunks()
+        if ijson is not None:
+            yield from ijson.items(_ChunkReader(chunks), prefix, use_float=True)
+        else:
+            yield from iter_json_items(chunks, prefix)
+        if drain:
+            for _ in chunks:
+                pass
+
+    def consume(self) -> int:
+        """
+        Reading the whole body without keeping it, e.g. to only write it to the tee file
+
+        Returns:
+            int, number of bytes read
+        """
+        for _ in self.iter_chunks():
+            pass
+        return self.bytes_read
+
+    def close(self):
+        """
+        Closing the response; a partly read body is discarded
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._chunks is not None:
+            self._chunks.close()
+        self.response.close()
+        if self._on_close is not None:
+            self._on_close(self)
@@ -0,0 +1,282 @@
+"""
+Pluggable transports of ApiBase: requests over HTTP/1.1 (the default) or httpx over HTTP/2, where concurrent
+requests to the same host are multiplexed as streams of one connection instead of taking a connection each
+"""
+
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from api.api.session_pool import ConnectionPhases, PoolConfig, build_session
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+
+class Transport(ABC):
+    """
+    Sends the request config of ApiBase.make_request() (the arguments of requests.Session.request())
+    and returns a requests.Response, so the code above the transport doesn't depend on the HTTP library
+    """
+    name = None
+
+    @abstractmethod
+    def request(self, **request_config) -> requests.Response:
+        """
+        Args:
+            request_config: method, url, headers, params, data, timeout, verify, stream
+
+        Returns:
+            Response; with stream=True the body is not read yet
+
+        Raises:
+            requests.RequestException, e.g. requests.ConnectionError, requests.Timeout
+        """
+
+    @abstractmethod
+    def close(self):
+        """
+        Closing all pooled connections
+        """
+
+
+class RequestsTransport(Transport):
+    """
+    requests session with the pooled keep-alive adapter; HTTP/1.1, one connection per request in flight
+    """
+    name = "requests"
+
+    def __init__(self, pool_config: PoolConfig = None):
+        """
+        Args:
+            pool_config (PoolConfig): pool settings, defaults are used if not passed
+        """
+        self.session = build_session(pool_config)
+
+    def request(self, **request_config) -> requests.Response:
+        return self.session.request(**request_config)
+
+    def close(self):
+        self.session.close()
+
+
+class HttpxH2Transport(Transport):
+    """
+    httpx client with HTTP/2 (requires httpx[http2]): over https HTTP/2 is negotiated with ALPN and falls back
+    to HTTP/1.1; over http it's used only with PoolConfig.http2_prior_knowledge (h2c servers).
+    pool_maxsize is the max number of connections per host, requests in flight are multiplexed over them.
+    The HTTP/2 connection state of httpcore is not thread-safe, so the async client runs on an event loop
+    in a background thread and the calling threads wait for their requests; certificate verification is
+    a setting of the httpx connection pool, so there is a client per verify value.
+    Connection phases are not measured separately: dns/connect/tls of the timings are 0.
+    """
+    name = "httpx-h2"
+
+    def __init__(self, pool_config: PoolConfig = None):
+        """
+        Args:
+            pool_config (PoolConfig): pool settings, defaults are used if not passed
+
+        Raises:
+            ImportError, if httpx or h2 is not installed
+        """
+        if httpx is None:
+            raise ImportError("The httpx-h2 transport requires httpx with HTTP/2 support: pip install 'httpx[http2]'")
+        self.pool_config = pool_config or PoolConfig()
+        self._clients = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="httpx-h2-transport", daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine):
+        """
+        Running the coroutine on the event loop of the transport and waiting for it in the calling thread
+
+        Returns:
+            result of the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _get_client(self, verify: bool):
+        """
+        Called on the event loop only
+
+        Returns:
+            httpx.AsyncClient, created on the first request with this verify value
+        """
+        client = self._clients.get(verify)
+        if client is None:
+            pool_config = self.pool_config
+            keep_alive = pool_config.pool_maxsize if pool_config.keep_alive else 0
+            limits = httpx.Limits(max_connections=pool_config.pool_maxsize, max_keepalive_connections=keep_alive)
+            # verify of the client is not used when the transport is passed, so it's set on the transport
+            transport = httpx.AsyncHTTPTransport(verify=verify, http1=not pool_config.http2_prior_knowledge,
+                                                 http2=True, limits=limits, retries=pool_config.max_retries)
+            client = self._clients[verify] = httpx.AsyncClient(transport=transport, verify=verify,
+                                                               follow_redirects=True)
+        return client
+
+    def request(self,  # pylint: disable=arguments-differ
+                method: str,
+                url: str,
+                headers: dict = None,
+                params: dict = None,
+                data=None,
+                timeout: float = None,
+                verify: bool = True,
+                stream: bool = False) -> requests.Response:
+        """
+        The same arguments as requests.Session.request()
+        """
+        content = None
+        if isinstance(data, (str, bytes)):
+            content, data = data, None
+        # requests skips the None params, httpx would send them as empty values
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        phases = ConnectionPhases()
+        try:
+            response = self.run(self._send(method, url, headers, params, content, data or None, timeout, verify,
+                                           stream, phases))
+        except httpx.RequestError as ex:
+            raise _translate_error(ex) from ex
+        return _to_requests_response(response, phases, _StreamedBody(self, response) if stream else None)
+
+    async def _send(self, method: str, url: str, headers: dict, params: dict, content, data, timeout: float,
+                    verify: bool, stream: bool, phases: ConnectionPhases):
+        client = self._get_client(verify)
+        request = client.build_request(method, url, headers=headers, params=params, content=content, data=data,
+                                       timeout=timeout)
+        response = await client.send(request, stream=True)
+        phases.headers_received_at = time.perf_counter()
+        if not stream:
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+        return response
+
+    async def _close_clients(self):
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self.run(self._close_clients())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+class _StreamedBody:
+    """
+    Response.raw of a streamed httpx response; requests reads it with stream(), the chunks are already decoded
+    and every one is read on the event loop of the transport
+    """
+
+    def __init__(self, transport: HttpxH2Transport, response):
+        self._transport = transport
+        self._response = response
+
+    def stream(self, chunk_size: int, decode_content: bool = True):  # pylint: disable=unused-argument
+        """
+        Yields:
+            bytes chunks of the body
+        """
+        chunks = self._response.aiter_bytes(chunk_size)
+        try:
+            while True:
+                try:
+                    yield self._transport.run(anext(chunks))
+                except StopAsyncIteration:
+                    return
+        except httpx.RequestError as ex:
+            raise _translate_error(ex) from ex
+
+    def close(self):
+        """
+        Closing the httpx response, the connection (or the HTTP/2 stream) is released
+        """
+        self._transport.run(self._response.aclose())
+
+
+def _translate_error(ex) -> requests.RequestException:
+    """
+    Args:
+        ex (httpx.RequestError): error of httpx
+
+    Returns:
+        requests.RequestException, the matching error of requests, so retries and error handling work the same way
+    """
+    if isinstance(ex, httpx.ConnectTimeout):
+        return requests.ConnectTimeout(str(ex))
+    if isinstance(ex, httpx.TimeoutException):
+        return requests.ReadTimeout(str(ex))
+    if isinstance(ex, (httpx.NetworkError, httpx.RemoteProtocolError, httpx.ProxyError)):
+        return requests.ConnectionError(str(ex))
+    if isinstance(ex, httpx.TooManyRedirects):
+        return requests.TooManyRedirects(str(ex))
+    return requests.RequestException(str(ex))
+
+
+def _to_requests_response(response, phases: ConnectionPhases, raw: _StreamedBody = None) -> requests.Response:
+    """
+    Args:
+        response (httpx.Response): received response, with the body read unless it's streamed
+        phases (ConnectionPhases): only headers_received_at is set
+        raw (_StreamedBody): body of a streamed response, None - the body is read already
+
+    Returns:
+        Response, with http_version (e.g. "HTTP/2") and connection_phases attributes
+    """
+    resp = requests.Response()
+    resp.status_code = response.status_code
+    resp.headers = CaseInsensitiveDict(response.headers.items())
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp.reason = response.reason_phrase
+    resp.url = str(response.url)
+    resp.http_version = response.http_version
+    resp.connection_phases = phases
+    prepared = requests.PreparedRequest()
+    prepared.method = response.request.method
+    prepared.url = str(response.request.url)
+    prepared.headers = CaseInsensitiveDict(response.request.headers.items())
+    prepared.body = response.request.content or None
+    resp.request = prepared
+    if raw is not None:
+        resp.raw = raw
+    else:
+        resp.elapsed = response.elapsed
+        resp._content = response.content  # pylint: disable=protected-access
+        resp._content_consumed = True  # pylint: disable=protected-access
+    return resp
+
+
+_TRANSPORTS = {transport.name: transport for transport in (RequestsTransport, HttpxH2Transport)}
+TRANSPORTS = tuple(_TRANSPORTS)
+
+
+def build_transport(pool_config: PoolConfig = None) -> Transport:
+    """
+    Args:
+        pool_config (PoolConfig): pool_config.transport is the name of the transport, see TRANSPORTS
+
+    Returns:
+        Transport
+
+    Raises:
+        ValueError, if the transport is unknown
+    """
+    pool_config = pool_config or PoolConfig()
+    transport_cls = _TRANSPORTS.get(pool_config.transport)
+    if transport_cls is None:
+        raise ValueError(f"Unknown transport '{pool_config.transport}'; available: {TRANSPORTS}")
+    return transport_cls(pool_config)
@@ -0,0 +1,68 @@
+"""
+Benchmark: many small concurrent GETs through the requests transport (HTTP/1.1) vs the httpx-h2 transport (HTTP/2)
+
+Both transports hit the same local stub server, which speaks HTTP/1.1 keep-alive and HTTP/2 with prior knowledge (h2c)
+on one port and answers every request with a small JSON body after --latency-ms. Requests are fanned out with
+PublicApi.fetch_many(); the report shows throughput, latency and how many connections each transport opened.
+
+Requires httpx[http2] (the stub server uses h2, the HTTP/2 library of httpx).
+
+Usage:
+    python3 -m api.benchmarks.bench_http2_transport --requests 2000 --concurrency 100 --latency-ms 20
+"""
+
+import argparse
+import statistics
+import time
+
+from api.api.public_api import PublicApi
+from api.api.session_pool import PoolConfig
+from api.core.http2_stub_server import Http2StubServer
+
+
+def run_transport(server: Http2StubServer, transport: str, requests_count: int, concurrency: int,
+                  pool_maxsize: int) -> str:
+    """
+    Args:
+        server (Http2StubServer): running stub server
+        transport (str): requests or httpx-h2
+        requests_count (int): number of GETs
+        concurrency (int): requests in flight (threads of fetch_many)
+        pool_maxsize (int): PoolConfig.pool_maxsize
+
+    Returns:
+        str, one line of the report
+    """
+    pool_config = PoolConfig(pool_maxsize=pool_maxsize, transport=transport, http2_prior_knowledge=True)
+    with PublicApi("http", server.host, str(server.port), pool_config) as public_api:
+        warm_up = public_api.make_request("get", "/facts", is_return_resp_obj=True)
+        connections = server.connections
+        started = time.perf_counter()
+        results = public_api.fetch_many([("get", "/facts", {"page": page}) for page in range(requests_count)],
+                                        max_workers=concurrency, is_return_resp_obj=True)
+        duration = time.perf_counter() - started
+    latencies = [result.elapsed * 1000 for result in results if result.error is None]
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+    return (f"{transport:<9} {getattr(warm_up, 'http_version', 'HTTP/1.1'):<9} {len(latencies) / duration:9.1f} req/s  "
+            f"p50 {quantiles[49]:7.2f} ms  p95 {quantiles[94]:7.2f} ms  "
+            f"new connections {server.connections - connections:4d}  errors {requests_count - len(latencies)}")
+
+
+def main():
+    """
+    Running both transports against the same stub server and printing the results
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--pool-maxsize", type=int, default=10)
+    args = parser.parse_args()
+
+    with Http2StubServer(args.latency_ms) as server:
+        for transport in ("requests", "httpx-h2"):
+            print(run_transport(server, transport, args.requests, args.concurrency, args.pool_maxsize))
+
+
+if __name__ == "__main__":
+    main()
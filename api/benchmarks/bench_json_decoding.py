@@ -0,0 +1,71 @@
+"""
+Micro-benchmark: JSON decoding of large /breeds and /facts payloads with every installed backend
+
+The old path is json.loads(resp.text) in make_request plus resp.json() in the test (two str decodes, two parses);
+the new path parses resp.content bytes with the backend in make_request and again in resp.json() (no str decode).
+
+Usage:
+    python3 -m api.benchmarks.bench_json_decoding --base-url https://catfact.ninja --rounds 200
+"""
+
+import argparse
+import json
+import timeit
+
+from tools.url_utils import get_http_prot_url_port_separately
+from api.api.json_codec import JsonDecoder
+from api.api.public_api import PublicApi
+
+
+def bench_old_path(resp, rounds: int) -> float:
+    """
+    Returns:
+        float, microseconds per response
+    """
+    def old_path():
+        json.loads(resp.text)
+        json.loads(resp.text)
+
+    return timeit.timeit(old_path, number=rounds) / rounds * 1e6
+
+
+def bench_decoder(decoder: JsonDecoder, resp, rounds: int) -> float:
+    """
+    Returns:
+        float, microseconds per response
+    """
+    def new_path():
+        resp.__dict__.pop("_parsed_json", None)
+        decoder.decode_response(resp)
+        resp.json()
+
+    return timeit.timeit(new_path, number=rounds) / rounds * 1e6
+
+
+def main():
+    """
+    Fetching the payloads once and decoding them with every backend
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="https://catfact.ninja")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    protocol, host, port = get_http_prot_url_port_separately(args.base_url)[0:3]
+    with PublicApi(protocol, host, port) as public_api:
+        payloads = {
+            "/breeds?limit=1000": public_api.make_request("get", "/breeds", query_params={"limit": 1000},
+                                                          is_return_resp_obj=True),
+            "/facts?limit=1000": public_api.make_request("get", "/facts", query_params={"limit": 1000},
+                                                         is_return_resp_obj=True),
+        }
+    for name, resp in payloads.items():
+        print(f"{name} ({len(resp.content)} bytes)")
+        print(f"  {'json.loads(text) x2':22} {bench_old_path(resp, args.rounds):10.1f} us")
+        for backend in JsonDecoder.available_backends():
+            elapsed = bench_decoder(JsonDecoder(backend), resp, args.rounds)
+            print(f"  {backend + ' x2':22} {elapsed:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
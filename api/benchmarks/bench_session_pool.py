@@ -0,0 +1,64 @@
+"""
+Benchmark: requests/sec with a fresh session per request vs the pooled keep-alive session
+
+Usage:
+    python3 -m api.benchmarks.bench_session_pool --base-url https://catfact.ninja --requests 50
+"""
+
+import argparse
+import time
+
+from tools.url_utils import get_http_prot_url_port_separately
+from api.api.public_api import PublicApi
+
+
+def run_fresh_session(public_api: PublicApi, uri: str, requests_count: int) -> float:
+    """
+    Old behaviour: every request opens a new session (TCP connect + TLS handshake) and closes it afterwards
+
+    Returns:
+        float, requests per second
+    """
+    started = time.perf_counter()
+    for _ in range(requests_count):
+        public_api.make_request("get", uri, is_return_resp_obj=True)
+        public_api.close()
+    return requests_count / (time.perf_counter() - started)
+
+
+def run_pooled_session(public_api: PublicApi, uri: str, requests_count: int) -> float:
+    """
+    New behaviour: all requests go through one warm pooled session
+
+    Returns:
+        float, requests per second
+    """
+    public_api.make_request("get", uri, is_return_resp_obj=True)  # warming up the pool
+    started = time.perf_counter()
+    for _ in range(requests_count):
+        public_api.make_request("get", uri, is_return_resp_obj=True)
+    return requests_count / (time.perf_counter() - started)
+
+
+def main():
+    """
+    Running both modes against the same endpoint and printing the results
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="https://catfact.ninja")
+    parser.add_argument("--uri", default="/facts")
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    protocol, host, port = get_http_prot_url_port_separately(args.base_url)[0:3]
+    with PublicApi(protocol, host, port) as public_api:
+        fresh_rps = run_fresh_session(public_api, args.uri, args.requests)
+    with PublicApi(protocol, host, port) as public_api:
+        pooled_rps = run_pooled_session(public_api, args.uri, args.requests)
+    print(f"fresh session per request: {fresh_rps:8.2f} req/s")
+    print(f"pooled keep-alive session: {pooled_rps:8.2f} req/s")
+    print(f"speedup:                   {pooled_rps / fresh_rps:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Load generation: drives PublicApi at a target rate and reports latency percentiles and throughput
+
+Requests are scheduled open-loop (request N starts at N / rps seconds), so a slow client shows up as growing
+latency instead of a silently lower rate.
+
+Usage:
+    python3 -m api.benchmarks.load_harness --mock --latency-ms 20 --rps 200 --duration 10
+    python3 -m api.benchmarks.load_harness --base-url https://catfact.ninja --rps 5 --duration 10
+    python3 -m api.benchmarks.load_harness --cassette api/cassettes/catfacts --cassette-mode replay --rps 500
+"""
+
+import argparse
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from tools.url_utils import get_http_prot_url_port_separately
+from api.api.cassette import Cassette
+from api.api.public_api import PublicApi
+from api.api.session_pool import PoolConfig
+from api.core.mock_server import MockCatFactsServer, MockServerConfig
+
+
+@dataclass(slots=True)
+class LoadReport:
+    """
+    Result of a load run
+    """
+    target_rps: float
+    duration: float = 0
+    latencies: list = field(default_factory=list)  # seconds, successful requests only
+    errors: int = 0
+
+    @property
+    def completed(self) -> int:
+        """
+        Number of successful requests
+        """
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        """
+        Successful requests per second
+        """
+        return self.completed / self.duration if self.duration else 0
+
+    def percentile(self, percent: float) -> float:
+        """
+        Args:
+            percent (float): e.g. 95
+
+        Returns:
+            float, latency in milliseconds (nearest-rank), 0 if there are no results
+        """
+        if not self.latencies:
+            return 0
+        ordered = sorted(self.latencies)
+        rank = max(1, min(len(ordered), math.ceil(percent / 100 * len(ordered))))
+        return ordered[rank - 1] * 1000
+
+    def summary(self) -> str:
+        """
+        Human readable report
+        """
+        return (f"target: {self.target_rps:.1f} req/s, achieved: {self.throughput:.1f} req/s, "
+                f"completed: {self.completed}, errors: {self.errors}, duration: {self.duration:.2f} s\n"
+                f"latency ms: p50 {self.percentile(50):.2f}, p95 {self.percentile(95):.2f}, "
+                f"p99 {self.percentile(99):.2f}, max {self.percentile(100):.2f}")
+
+
+def run_load(public_api: PublicApi, request_fn, rps: float, duration: float, workers: int = 32) -> LoadReport:
+    """
+    Args:
+        public_api (PublicApi): client under test
+        request_fn (callable): request_fn(public_api), one request
+        rps (float): target requests per second
+        duration (float): seconds
+        workers (int): max requests in flight
+
+    Returns:
+        LoadReport
+    """
+    report = LoadReport(target_rps=rps)
+    lock = threading.Lock()
+
+    def one_request():
+        started = time.perf_counter()
+        try:
+            request_fn(public_api)
+        except Exception:  # pylint: disable=broad-exception-caught
+            with lock:
+                report.errors += 1
+            return
+        elapsed = time.perf_counter() - started
+        with lock:
+            report.latencies.append(elapsed)
+
+    total = int(rps * duration)
+    run_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="load") as executor:
+        for index in range(total):
+            delay = run_started + index / rps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(one_request)
+    report.duration = time.perf_counter() - run_started
+    return report
+
+
+def main():
+    """
+    Running the load against a live host or the in-process mock server
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="https://catfact.ninja")
+    parser.add_argument("--mock", action="store_true", help="Run against the in-process mock server")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Mock server latency")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Mock server latency jitter")
+    parser.add_argument("--fact-length", type=int, default=120, help="Mock server payload size per fact")
+    parser.add_argument("--error-rate", type=float, default=0, help="Mock server share of injected errors")
+    parser.add_argument("--endpoint", choices=("facts", "breeds"), default="facts")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--rps", type=float, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--cassette", help="Record/replay the requests with this cassette (path without extension)")
+    parser.add_argument("--cassette-mode", choices=Cassette.MODES, default="auto")
+    args = parser.parse_args()
+
+    def request_fn(public_api: PublicApi):
+        uri = f"/{args.endpoint}"
+        resp = public_api.make_request("get", uri, query_params={"limit": args.limit}, is_return_resp_obj=True)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Unexpected status code {resp.status_code}")
+
+    mock_server = None
+    cassette = None
+    base_url = args.base_url
+    if args.mock:
+        mock_config = MockServerConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                       fact_length=args.fact_length, error_rate=args.error_rate)
+        mock_server = MockCatFactsServer(mock_config).start()
+        base_url = mock_server.base_url
+    try:
+        protocol, host, port = get_http_prot_url_port_separately(base_url)[0:3]
+        pool_config = PoolConfig(pool_maxsize=args.workers)
+        if args.cassette:
+            cassette = Cassette(args.cassette, args.cassette_mode)
+        with PublicApi(protocol, host, port, pool_config, cassette=cassette) as public_api:
+            report = run_load(public_api, request_fn, args.rps, args.duration, args.workers)
+        print(report.summary())
+        if cassette is not None:
+            print(f"cassette: {cassette.stats}")
+    finally:
+        if cassette is not None:
+            cassette.close()
+        if mock_server is not None:
+            mock_server.stop()
+
+
+if __name__ == "__main__":
+    main()
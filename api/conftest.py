@@ -4,38 +4,27 @@ conftest.py file
 # pylint: disable=duplicate-code
 
 import os
-from datetime import datetime
 from configparser import ConfigParser, ExtendedInterpolation
 
 import pytest
+import pytest_asyncio
 
 from tools.logger.logger import Logger
 from tools.url_utils import get_http_prot_url_port_separately
 from api.api.public_api import PublicApi
+from api.api.async_public_api import AsyncPublicApi
+from api.api.cassette import Cassette
+from api.api.json_codec import get_decoder
+from api.api.resilience import CircuitBreakerConfig, RetryBudget, RetryPolicy
+from api.api.response_cache import ResponseCache
+from api.api.session_pool import PoolConfig
 from api.core.app_config import AppConfig
+from api.core.mock_server import MockCatFactsServer, MockServerConfig
 
 
 log = Logger(__name__)
 
-
-@pytest.fixture(autouse=True, scope="session")
-def add_loggers() -> None:
-    """
-    The fixture to configure loggers
-    It uses built-in pytest arguments to configure loggigng level and files
-
-    Parameters:
-        log_level or --log-level general log level for capturing
-        log_file_level or --log-file-level  level of log to be stored to a file. Usually lower than general log
-        log_file or --log-file  path where logs will be saved
-    """
-    artifacts_folder_default = os.getenv("HOST_ARTIFACTS")
-    log_level = "DEBUG"
-    log_file_level = "DEBUG"
-    log_file = os.path.join(timestamped_path("pytest", "log", artifacts_folder_default))
-    log.setup_cli_handler(level=log_level)
-    log.setup_filehandler(level=log_file_level, file_name=log_file)
-    log.info(f"General loglevel: '{log_level}', File: '{log_file_level}'")
+pytest_plugins = ["tools.pytest_plugin"]
 
 
 @pytest.fixture(scope="session")
@@ -49,6 +38,37 @@ def app_config(pytestconfig) -> AppConfig:
     cfg = ConfigParser(interpolation=ExtendedInterpolation())
     cfg.read(ini_config_file)
     result_dict["base_url"] = cfg.get("pytest", "base_url", fallback="https://catfact.ninja")
+    result_dict["pool_connections"] = cfg.getint("pytest", "pool_connections", fallback=10)
+    result_dict["pool_maxsize"] = cfg.getint("pytest", "pool_maxsize", fallback=10)
+    result_dict["pool_max_retries"] = cfg.getint("pytest", "pool_max_retries", fallback=0)
+    result_dict["keep_alive"] = cfg.getboolean("pytest", "keep_alive", fallback=True)
+    result_dict["transport"] = cfg.get("pytest", "transport", fallback="requests")
+    result_dict["http2_prior_knowledge"] = cfg.getboolean("pytest", "http2_prior_knowledge", fallback=False)
+    result_dict["log_body_max_len"] = cfg.getint("pytest", "log_body_max_len", fallback=2048)
+    result_dict["log_body_sample_every"] = cfg.getint("pytest", "log_body_sample_every", fallback=1)
+    result_dict["response_cache"] = cfg.getboolean("pytest", "response_cache", fallback=False)
+    result_dict["response_cache_ttl"] = cfg.getfloat("pytest", "response_cache_ttl", fallback=300)
+    result_dict["response_cache_max_entries"] = cfg.getint("pytest", "response_cache_max_entries", fallback=256)
+    result_dict["response_cache_disk"] = cfg.getboolean("pytest", "response_cache_disk", fallback=False)
+    result_dict["response_cache_errors"] = cfg.getboolean("pytest", "response_cache_errors", fallback=False)
+    result_dict["json_decoder"] = cfg.get("pytest", "json_decoder", fallback="auto")
+    result_dict["cassette_mode"] = cfg.get("pytest", "cassette_mode", fallback="off")
+    # A relative cassette path is relative to the ini config file
+    cassette_path = cfg.get("pytest", "cassette_path", fallback="cassettes/catfacts")
+    result_dict["cassette_path"] = os.path.join(os.path.dirname(os.path.abspath(ini_config_file)), cassette_path)
+    result_dict["retry_max_attempts"] = cfg.getint("pytest", "retry_max_attempts", fallback=3)
+    result_dict["retry_backoff_base"] = cfg.getfloat("pytest", "retry_backoff_base", fallback=0.2)
+    result_dict["retry_backoff_max"] = cfg.getfloat("pytest", "retry_backoff_max", fallback=10)
+    result_dict["retry_budget_ratio"] = cfg.getfloat("pytest", "retry_budget_ratio", fallback=0.2)
+    result_dict["circuit_failure_threshold"] = cfg.getint("pytest", "circuit_failure_threshold", fallback=5)
+    result_dict["circuit_reset_timeout"] = cfg.getfloat("pytest", "circuit_reset_timeout", fallback=30)
+    result_dict["use_mock_server"] = cfg.getboolean("pytest", "use_mock_server", fallback=False)
+    result_dict["mock_latency_ms"] = cfg.getfloat("pytest", "mock_latency_ms", fallback=0)
+    result_dict["mock_error_rate"] = cfg.getfloat("pytest", "mock_error_rate", fallback=0)
+    result_dict["log_queue_mode"] = cfg.getboolean("pytest", "log_queue_mode", fallback=True)
+    result_dict["log_queue_size"] = cfg.getint("pytest", "log_queue_size", fallback=10000)
+    result_dict["log_queue_policy"] = cfg.get("pytest", "log_queue_policy", fallback="drop")
+    result_dict["metrics_export"] = cfg.getboolean("pytest", "metrics_export", fallback=True)
     return AppConfig(**result_dict)
 
 
@@ -59,25 +79,102 @@ def pytest_addoption(parser):
     parser.addoption("--ini-config", action="store", default="pytest.ini", help="The path to the *.ini config file")
 
 
-def timestamped_path(file_name: str, file_ext: str, path_to_file: str = os.getenv("HOST_ARTIFACTS")) -> str:
+@pytest.fixture(scope="session")
+def api_base_url(request):
     """
-    Args:
-        file_name (str): e.g. screenshot
-        file_ext (str): file extention, e.g., png
-        path_to_file (str): e.g. /home/user/test_dir/artifacts/
+    Base URL of the API under test: base_url from the ini config or the in-process mock server
+    if use_mock_server is set
+    """
+    _app_config = request.getfixturevalue("app_config")
+    if not _app_config.use_mock_server:
+        yield _app_config.base_url
+        return
+    mock_config = MockServerConfig(latency_ms=_app_config.mock_latency_ms, error_rate=_app_config.mock_error_rate)
+    with MockCatFactsServer(mock_config) as mock_server:
+        yield mock_server.base_url
+
 
-    Returns:
-        str, timestamped path
+# pylint: disable=redefined-outer-name
+@pytest.fixture(scope="session")
+def public_api(request, api_base_url):
+    """
+    PublicApi instance shared by the whole session, so all tests reuse warm pooled connections
     """
-    ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S.%f")
-    return os.path.join(path_to_file, f"{file_name}-{ts}.{file_ext}")
+    _app_config = request.getfixturevalue("app_config")
+    Logger.set_body_limits(_app_config.log_body_max_len, _app_config.log_body_sample_every)
+    protocol, host, port = get_http_prot_url_port_separately(api_base_url)[0:3]
+    pool_config = PoolConfig(pool_connections=_app_config.pool_connections,
+                             pool_maxsize=_app_config.pool_maxsize,
+                             max_retries=_app_config.pool_max_retries,
+                             keep_alive=_app_config.keep_alive,
+                             transport=_app_config.transport,
+                             http2_prior_knowledge=_app_config.http2_prior_knowledge)
+    log.info(f"Transport: {pool_config.transport}")
+    response_cache = None
+    if _app_config.response_cache:
+        disk_dir = None
+        if _app_config.response_cache_disk:
+            disk_dir = os.path.join(os.getenv("HOST_ARTIFACTS") or os.getcwd(), "response_cache")
+        response_cache = ResponseCache(ttl=_app_config.response_cache_ttl,
+                                       max_entries=_app_config.response_cache_max_entries,
+                                       disk_dir=disk_dir,
+                                       cache_errors=_app_config.response_cache_errors)
+    json_decoder = get_decoder(_app_config.json_decoder)
+    log.info(f"JSON decoder: {json_decoder.name}")
+    retry_policy = RetryPolicy(max_attempts=_app_config.retry_max_attempts,
+                               backoff_base=_app_config.retry_backoff_base,
+                               backoff_max=_app_config.retry_backoff_max)
+    circuit_breaker_config = CircuitBreakerConfig(failure_threshold=_app_config.circuit_failure_threshold,
+                                                  reset_timeout=_app_config.circuit_reset_timeout)
+    cassette = None
+    if _app_config.cassette_mode != "off":
+        cassette = Cassette(_app_config.cassette_path, _app_config.cassette_mode)
+        log.info(f"Cassette: {cassette.data_path} ({cassette.mode}, {len(cassette)} recorded requests)")
+    with PublicApi(protocol, host, port, pool_config, response_cache, json_decoder,
+                   retry_policy=retry_policy,
+                   retry_budget=RetryBudget(ratio=_app_config.retry_budget_ratio),
+                   circuit_breaker_config=circuit_breaker_config,
+                   cassette=cassette) as _public_api:
+        yield _public_api
+    if cassette is not None:
+        log.info(f"Cassette stats: {cassette.stats}")
+        cassette.close()
+    if response_cache is not None:
+        log.info(f"Response cache stats: {response_cache.stats}")
+
+
+# pylint: disable=redefined-outer-name
+@pytest.fixture(autouse=True)
+def bypass_response_cache(request, public_api):
+    """
+    Tests marked with @pytest.mark.no_response_cache always hit the wire
+    """
+    response_cache = public_api.response_cache
+    if response_cache is None or request.node.get_closest_marker("no_response_cache") is None:
+        yield
+        return
+    with response_cache.bypass():
+        yield
+
+
+@pytest_asyncio.fixture
+async def async_public_api(request, api_base_url):
+    """
+    AsyncPublicApi instance for the async tests; the connection limit per host is pool_maxsize
+    """
+    _app_config = request.getfixturevalue("app_config")
+    protocol, host, port = get_http_prot_url_port_separately(api_base_url)[0:3]
+    pool_config = PoolConfig(pool_maxsize=_app_config.pool_maxsize,
+                             max_retries=_app_config.pool_max_retries,
+                             keep_alive=_app_config.keep_alive)
+    json_decoder = get_decoder(_app_config.json_decoder)
+    async with AsyncPublicApi(protocol, host, port, pool_config, json_decoder) as _async_public_api:
+        yield _async_public_api
 
 
 @pytest.fixture(autouse=True, scope="class")
-def setup_api_testing(request):
+def setup_api_testing(request, public_api):
     """
     Setting API instance for testing
     """
-    _app_config = request.getfixturevalue("app_config")
-    protocol, host, port = get_http_prot_url_port_separately(_app_config.base_url)[0:3]
-    request.cls.public_api = PublicApi(protocol, host, port)
+    request.cls.public_api = public_api
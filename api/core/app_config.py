@@ -11,3 +11,32 @@ class AppConfig:  # pylint: disable=too-many-instance-attributes
     App config from ini config file
     """
     base_url: str
+    pool_connections: int
+    pool_maxsize: int
+    pool_max_retries: int
+    keep_alive: bool
+    transport: str
+    http2_prior_knowledge: bool
+    log_body_max_len: int
+    log_body_sample_every: int
+    use_mock_server: bool
+    mock_latency_ms: float
+    mock_error_rate: float
+    log_queue_mode: bool
+    log_queue_size: int
+    log_queue_policy: str
+    metrics_export: bool
+    response_cache: bool
+    response_cache_ttl: float
+    response_cache_max_entries: int
+    response_cache_disk: bool
+    response_cache_errors: bool
+    json_decoder: str
+    cassette_mode: str
+    cassette_path: str
+    retry_max_attempts: int
+    retry_backoff_base: float
+    retry_backoff_max: float
+    retry_budget_ratio: float
+    circuit_failure_threshold: int
+    circuit_reset_timeout: float
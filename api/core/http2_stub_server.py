@@ -0,0 +1,151 @@
+"""
+Local stub server speaking HTTP/1.1 keep-alive and HTTP/2 with prior knowledge (h2c) on one port;
+GET of any path returns the same small JSON body. Used by the HTTP/2 transport tests and benchmark.
+Requires h2 (installed with httpx[http2]).
+"""
+
+import asyncio
+import json
+import threading
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+import h2.settings
+
+
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+
+class Http2StubServer:  # pylint: disable=too-many-instance-attributes
+    """
+    asyncio server in a background thread; connections counts the accepted connections
+
+        with Http2StubServer(latency_ms=0) as server:
+            api = PublicApi("http", server.host, str(server.port), PoolConfig(transport="httpx-h2",
+                                                                              http2_prior_knowledge=True))
+    """
+
+    def __init__(self, latency_ms: float = 20, host: str = "127.0.0.1"):
+        """
+        Args:
+            latency_ms (float): added to every response
+            host (str): interface to listen on, the port is any free one
+        """
+        self.latency = latency_ms / 1000
+        self.host = host
+        self.port = None
+        self.connections = 0
+        self.body = json.dumps({"current_page": 1, "per_page": 1, "total": 1,
+                                "data": [{"fact": "Cats sleep for around 13 to 16 hours a day.", "length": 43}]}
+                               ).encode("utf-8")
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Serving in a background thread
+        """
+        self._thread = threading.Thread(target=self._serve, name="http2-stub-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        """
+        Stopping the server and its event loop
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, 0))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            data = await reader.readexactly(len(H2_PREFACE))
+            if data == H2_PREFACE:
+                await self._serve_h2(reader, writer, data)
+            else:
+                await self._serve_http11(reader, writer, data)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_http11(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, data: bytes):
+        """
+        Keep-alive HTTP/1.1, one request at a time per connection (requests without a body only)
+        """
+        head = b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n" % len(self.body)
+        buffer = data
+        while True:
+            while b"\r\n\r\n" not in buffer:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    return
+                buffer += chunk
+            request_head, buffer = buffer.split(b"\r\n\r\n", 1)
+            await asyncio.sleep(self.latency)
+            writer.write(head + self.body)
+            await writer.drain()
+            if b"connection: close" in request_head.lower():
+                return
+
+    async def _serve_h2(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, data: bytes):
+        """
+        HTTP/2 with prior knowledge; every stream is answered by its own task, so the responses are concurrent
+        """
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        conn.update_settings({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: 1000})
+        window_updated = asyncio.Event()
+        tasks = set()
+        while data:
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    task = asyncio.ensure_future(self._respond_h2(conn, writer, event.stream_id, window_updated))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif isinstance(event, h2.events.WindowUpdated):
+                    window_updated.set()
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    data = b""
+            writer.write(conn.data_to_send())
+            await writer.drain()
+            if data:
+                data = await reader.read(65536)
+        for task in tasks:
+            task.cancel()
+
+    async def _respond_h2(self, conn, writer: asyncio.StreamWriter, stream_id: int, window_updated: asyncio.Event):
+        await asyncio.sleep(self.latency)
+        try:
+            conn.send_headers(stream_id, [(":status", "200"), ("content-type", "application/json"),
+                                          ("content-length", str(len(self.body)))])
+            while conn.local_flow_control_window(stream_id) < len(self.body):
+                window_updated.clear()
+                await window_updated.wait()
+            conn.send_data(stream_id, self.body, end_stream=True)
+        except h2.exceptions.StreamClosedError:
+            return
+        writer.write(conn.data_to_send())
@@ -0,0 +1,248 @@
+"""
+In-process stand-in for catfact.ninja: /facts, /fact and /breeds with configurable latency, payload size,
+pagination and error injection
+"""
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from tools.logger.logger import Logger
+
+
+log = Logger(__name__)
+
+
+@dataclass(slots=True)
+class MockServerConfig:  # pylint: disable=too-many-instance-attributes
+    """
+    Behaviour of the mock server
+    """
+    latency_ms: float = 0  # added to every response
+    jitter_ms: float = 0  # random extra latency, 0..jitter_ms
+    facts_total: int = 332
+    breeds_total: int = 98
+    fact_length: int = 120  # chars per fact, controls the payload size
+    default_limit: int = 10
+    max_limit: int = 1000
+    error_rate: float = 0  # share of requests answered with error_status, 0..1
+    error_every: int = 0  # every N-th request is answered with error_status, e.g. 2 - every other one; 0 - off
+    error_status: int = 503
+    retry_after: int = None  # Retry-After header of the injected errors, seconds
+    error_body: str = None  # raw text/html body of the injected errors, e.g. a proxy error page; None - JSON message
+    seed: int = 42
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """
+    Request handler, the data and config live in the server object
+    """
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients can be measured
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        log.debug("Mock server: " + format, *args)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Routing GET requests
+        """
+        server = self.server
+        config = server.config
+        request_number = server.count_request()
+        delay = config.latency_ms + (server.random_uniform(0, config.jitter_ms) if config.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+        if (config.error_every and request_number % config.error_every == 0
+                or config.error_rate and server.random_uniform(0, 1) < config.error_rate):
+            headers = {"Retry-After": str(config.retry_after)} if config.retry_after is not None else {}
+            if config.error_body is not None:
+                self._send_body(config.error_status, config.error_body.encode("utf-8"), "text/html", headers)
+            else:
+                self._send_json(config.error_status, {"message": "Injected error"}, headers)
+            return
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        routes = {"/facts": server.facts_page, "/breeds": server.breeds_page, "/fact": server.random_fact}
+        route = routes.get(parsed.path.rstrip("/") or "/")
+        if route is None:
+            self._send_json(404, {"message": "Not Found"})
+            return
+        try:
+            status, body = route(query)
+        except ValueError as ex:
+            status, body = 422, {"message": str(ex)}
+        self._send_json(status, body)
+
+    def _send_json(self, status: int, body, headers: dict = None):
+        content = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.md5(content).hexdigest() + '"'  # nosec - not a security feature
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if status == 200:
+            headers = {**(headers or {}), "ETag": etag}
+        self._send_body(status, content, "application/json", headers)
+
+    def _send_body(self, status: int, content: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class MockCatFactsServer(ThreadingHTTPServer):
+    """
+    Mock server running in a background thread:
+
+        with MockCatFactsServer(MockServerConfig(latency_ms=20)) as server:
+            api = PublicApi("http", server.host, server.port)
+    """
+    daemon_threads = True
+
+    def __init__(self, config: MockServerConfig = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            config (MockServerConfig): behaviour, defaults are used if not passed
+            host (str): interface to listen on
+            port (int): 0 - any free port
+        """
+        super().__init__((host, port), _MockHandler)
+        self.config = config or MockServerConfig()
+        self.requests_count = 0
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        filler = "Cats sleep for around 13 to 16 hours a day. "
+        fact_text = (filler * math.ceil(self.config.fact_length / len(filler)))[:self.config.fact_length]
+        self.facts = [{"fact": f"{index}: {fact_text}"[:max(self.config.fact_length, 1)],
+                       "length": self.config.fact_length}
+                      for index in range(self.config.facts_total)]
+        self.breeds = [{"breed": f"Breed {index}", "country": "Country", "origin": "Natural",
+                        "coat": "Short", "pattern": "Solid"}
+                       for index in range(self.config.breeds_total)]
+
+    @property
+    def host(self) -> str:
+        """
+        Host the server listens on
+        """
+        return self.server_address[0]
+
+    @property
+    def port(self) -> int:
+        """
+        Port the server listens on
+        """
+        return self.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        """
+        e.g. http://127.0.0.1:54321
+        """
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """
+        Serving in a background thread
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-catfacts-server", daemon=True)
+        self._thread.start()
+        log.info(f"Mock server started on {self.base_url}")
+        return self
+
+    def stop(self):
+        """
+        Stopping the server and closing the socket
+        """
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def count_request(self):
+        """
+        Counting served requests
+
+        Returns:
+            int, number of the request, from 1
+        """
+        with self._lock:
+            self.requests_count += 1
+            return self.requests_count
+
+    def random_uniform(self, low: float, high: float) -> float:
+        """
+        Seeded random number, shared by the handler threads
+        """
+        with self._lock:
+            return self._random.uniform(low, high)
+
+    def _page(self, path: str, items: list, query: dict) -> tuple:
+        """
+        Laravel-style paginated response like the one of catfact.ninja
+        """
+        try:
+            page = max(1, int(query.get("page", 1)))
+            limit = int(query.get("limit", self.config.default_limit))
+        except ValueError as ex:
+            raise ValueError("page and limit must be integers") from ex
+        if limit < 1:
+            limit = self.config.default_limit
+        limit = min(limit, self.config.max_limit)
+        total = len(items)
+        last_page = max(1, math.ceil(total / limit))
+        start = (page - 1) * limit
+        data = items[start:start + limit]
+        url = f"{self.base_url}{path}"
+        body = {"current_page": page,
+                "data": data,
+                "first_page_url": f"{url}?page=1",
+                "from": start + 1 if data else None,
+                "last_page": last_page,
+                "last_page_url": f"{url}?page={last_page}",
+                "next_page_url": f"{url}?page={page + 1}" if page < last_page else None,
+                "path": url,
+                "per_page": limit,
+                "prev_page_url": f"{url}?page={page - 1}" if page > 1 else None,
+                "to": start + len(data) if data else None,
+                "total": total}
+        return 200, body
+
+    def facts_page(self, query: dict) -> tuple:
+        """
+        /facts
+        """
+        return self._page("/facts", self.facts, query)
+
+    def breeds_page(self, query: dict) -> tuple:
+        """
+        /breeds
+        """
+        return self._page("/breeds", self.breeds, query)
+
+    def random_fact(self, query: dict) -> tuple:  # pylint: disable=unused-argument
+        """
+        /fact
+        """
+        with self._lock:
+            return 200, self._random.choice(self.facts)
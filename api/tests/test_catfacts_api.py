@@ -2,8 +2,25 @@
 API tests
 """
 
+import json
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
+from tools.pytest_plugin import timestamped_path
+from api.api.async_public_api import gather_requests
+from api.api.cassette import Cassette
+from api.api.public_api import ApiError, CircuitOpenError, PublicApi
+from api.api.resilience import CircuitBreakerConfig, RetryBudget, RetryPolicy
+from api.api.schemas import SchemaValidationError, get_item_validator, get_validator
+from api.api.session_pool import PoolConfig
+from api.core.http2_stub_server import Http2StubServer
+from api.core.mock_server import MockCatFactsServer, MockServerConfig
+
+
+PAGINATION_CASES = [(1, 5), (2, 10), (3, 3)]
+
 
 @pytest.mark.public_api
 class TestApi:
@@ -23,7 +40,7 @@ class TestApi:
         for key in ['current_page', 'per_page']:
             assert key in body
 
-    @pytest.mark.parametrize('page,limit', [(1,5),(2,10),(3,3)])
+    @pytest.mark.parametrize('page,limit', PAGINATION_CASES)
     def test_pagination(self, page, limit):
         """
         Get /facts, check if status code == 200, then check if page changes
@@ -35,6 +52,199 @@ class TestApi:
         assert body.get('current_page') == page
         assert len(body.get('data', [])) <= limit
 
+    def test_pagination_fan_out(self):
+        """
+        Get all /facts pages at once from a thread pool, check if status code == 200 and if every page is the requested one
+        """
+        results = self.public_api.fetch_many(
+            [("get", "/facts", {'page': page, 'limit': limit}) for page, limit in PAGINATION_CASES],
+            timeout=30, is_return_resp_obj=True)
+        for (page, limit), result in zip(PAGINATION_CASES, results):
+            resp = result.result()
+            assert resp.status_code == 200
+            body = resp.json()
+            assert body.get('current_page') == page
+            assert len(body.get('data', [])) <= limit
+
+    @pytest.mark.asyncio
+    async def test_pagination_concurrent(self, async_public_api):
+        """
+        Get all /facts pages at once, check if status code == 200 and if every page is the requested one
+        """
+        responses = await gather_requests(
+            (async_public_api.make_request("get", "/facts", query_params={'page': page, 'limit': limit},
+                                           is_return_resp_obj=True)
+             for page, limit in PAGINATION_CASES),
+            concurrency=len(PAGINATION_CASES))
+        for (page, limit), resp in zip(PAGINATION_CASES, responses):
+            assert resp.status_code == 200
+            body = resp.json()
+            assert body.get('current_page') == page
+            assert len(body.get('data', [])) <= limit
+
+    def test_facts_page_validated(self):
+        """
+        Get a full /facts page with raise_error_if_failed, every fact is validated against the schema
+        """
+        body = self.public_api.make_request("get", "/facts", query_params={'limit': 100}, raise_error_if_failed=True)
+        assert body['data']
+
+    def test_iter_facts_all_pages(self):
+        """
+        Stream all /facts pages, check if every fact has the expected keys and if all facts are received
+        """
+        first_page = self.public_api.get_facts(page=1, limit=100)
+        count = 0
+        for fact in self.public_api.iter_facts(limit=100):
+            assert {'fact', 'length'}.issubset(fact.keys())
+            count += 1
+        assert count == first_page.get('total')
+
+    def test_facts_streamed(self):
+        """
+        Stream a large /facts page item by item with the body teed to the artifacts, check every fact against
+        the schema and if the teed body has the same number of facts
+        """
+        tee_path = timestamped_path("facts_stream", "json")
+        validate_fact = get_item_validator("get", "/facts")
+        facts = 0
+        with self.public_api.make_request("get", "/facts", query_params={'limit': 500}, stream=True,
+                                          tee_path=tee_path) as streamed:
+            assert streamed.status_code == 200
+            for fact in streamed.iter_items("data.item"):
+                validate_fact(fact)
+                facts += 1
+        with open(tee_path, encoding="utf-8") as tee_file:
+            body = json.load(tee_file)
+        assert facts == len(body['data']) > 0
+
+    @pytest.mark.no_response_cache
+    def test_shared_client_threads(self):
+        """
+        Get /facts pages from many threads through one client, check if every request had its own headers
+        and a unique Unique-RequestId, and if the default headers stayed untouched
+        """
+        pages = list(range(1, 9))
+
+        def get_page(page):
+            return self.public_api.make_request("get", "/facts", query_params={'page': page, 'limit': 2},
+                                                headers={'X-Test-Page': str(page)}, is_return_resp_obj=True)
+
+        with ThreadPoolExecutor(max_workers=len(pages)) as executor:
+            responses = list(executor.map(get_page, pages))
+        request_ids = set()
+        for page, resp in zip(pages, responses):
+            assert resp.status_code == 200
+            assert resp.json().get('current_page') == page
+            assert resp.request.headers['X-Test-Page'] == str(page)
+            request_ids.add(resp.request.headers['Unique-RequestId'])
+        assert len(request_ids) == len(pages)
+        assert 'X-Test-Page' not in self.public_api.headers
+
+    def test_retries_and_circuit_breaker(self):
+        """
+        Get /facts from a mock server failing every other request with 503 + Retry-After, check if every request
+        succeeds after one retry and doesn't count as a failure of the circuit; then make the server fail every
+        request, check if the circuit opens after failure_threshold failed requests and then fails fast
+        """
+        mock_config = MockServerConfig(error_every=2, retry_after=0)
+        with MockCatFactsServer(mock_config) as server, \
+                PublicApi("http", server.host, str(server.port),
+                          retry_policy=RetryPolicy(max_attempts=3, backoff_base=0.01),
+                          circuit_breaker_config=CircuitBreakerConfig(failure_threshold=3, reset_timeout=60)) as api:
+            for page in range(1, 6):
+                resp = api.make_request("get", "/facts", query_params={'page': page}, is_return_resp_obj=True)
+                assert resp.status_code == 200
+                assert resp.json().get('current_page') == page
+            # The 1st request passes, every next one fails once and passes on the retry
+            assert server.requests_count == 9
+            assert api.circuit_breaker.failures == 0
+            mock_config.error_every = 1
+            api.retry_budget = RetryBudget(min_tokens=100)
+            for _ in range(3):
+                requests_count = server.requests_count
+                resp = api.make_request("get", "/facts", is_return_resp_obj=True)
+                assert resp.status_code == 503
+                assert server.requests_count - requests_count == 3
+            requests_count = server.requests_count
+            with pytest.raises(CircuitOpenError):
+                api.make_request("get", "/facts", is_return_resp_obj=True)
+            assert server.requests_count == requests_count
+
+    def test_circuit_breaker_trial_not_retried_error(self, tmp_path):
+        """
+        Open the circuit of a host with a connection error, then fail its half-open trial with an error that is
+        not retried (a request missing in a replay cassette), check if the circuit re-opens instead of rejecting
+        every next request of the host
+        """
+        with socket.socket() as closed_socket:
+            closed_socket.bind(("127.0.0.1", 0))
+            port = str(closed_socket.getsockname()[1])
+        path = str(tmp_path / "empty")
+        Cassette(path, "record").close()
+        breaker_config = CircuitBreakerConfig(failure_threshold=1, reset_timeout=0)
+        with PublicApi("http", "127.0.0.1", port, retry_policy=RetryPolicy(max_attempts=1),
+                       circuit_breaker_config=breaker_config) as api, \
+                Cassette(path, "replay") as cassette, \
+                PublicApi("http", "127.0.0.1", port, retry_policy=RetryPolicy(max_attempts=1),
+                          circuit_breaker_config=breaker_config, cassette=cassette) as replaying_api:
+            with pytest.raises(ApiError):
+                api.make_request("get", "/facts")
+            assert api.circuit_breaker.state == "open"
+            with pytest.raises(ApiError) as error:
+                replaying_api.make_request("get", "/facts")
+            assert not isinstance(error.value, CircuitOpenError)
+            assert api.circuit_breaker.state == "open"
+            with pytest.raises(ApiError) as error:
+                api.make_request("get", "/facts")
+            assert not isinstance(error.value, CircuitOpenError)
+
+    def test_error_page_not_json(self):
+        """
+        Get /facts from a mock server answering with a 502 HTML page, check if raise_error_if_failed reports
+        the status code instead of failing to decode the body
+        """
+        mock_config = MockServerConfig(error_rate=1, error_status=502, error_body="<html><h1>502 Bad Gateway</h1></html>")
+        with MockCatFactsServer(mock_config) as server, \
+                PublicApi("http", server.host, str(server.port), retry_policy=RetryPolicy(max_attempts=1)) as api:
+            with pytest.raises(SchemaValidationError, match="status_code"):
+                api.make_request("get", "/facts", raise_error_if_failed=True)
+
+    def test_http2_transport(self):
+        """
+        Get /facts through the httpx-h2 transport from a local h2c server, check if the responses come over HTTP/2
+        and if concurrent requests are multiplexed over one connection
+        """
+        pool_config = PoolConfig(transport="httpx-h2", http2_prior_knowledge=True)
+        with Http2StubServer(latency_ms=20) as server, \
+                PublicApi("http", server.host, str(server.port), pool_config) as api:
+            resp = api.make_request("get", "/facts", is_return_resp_obj=True)
+            assert resp.http_version == "HTTP/2"
+            assert resp.json().get('current_page') == 1
+            results = api.fetch_many([("get", "/facts", {'page': page}) for page in range(1, 21)], max_workers=10)
+            assert [result.error for result in results] == [None] * 20
+            assert all('data' in result.value for result in results)
+            assert server.connections == 1
+
+    def test_cassette_record_and_replay(self, tmp_path):
+        """
+        Get /facts pages from the mock server recording them to a cassette, then stop the server and replay them,
+        check if the replayed bodies are the recorded ones and if a request that isn't recorded fails
+        """
+        path = str(tmp_path / "catfacts")
+        with MockCatFactsServer() as server, Cassette(path, "record") as cassette, \
+                PublicApi("http", server.host, str(server.port), cassette=cassette) as api:
+            recorded = [api.make_request("get", "/facts", query_params={'page': page}, is_return_resp_obj=True).json()
+                        for page in (1, 2)]
+        with Cassette(path, "replay") as cassette, \
+                PublicApi("http", server.host, str(server.port), cassette=cassette) as api:
+            replayed = [api.make_request("get", "/facts", query_params={'page': page}, is_return_resp_obj=True).json()
+                        for page in (2, 1)]
+            assert replayed == recorded[::-1]
+            assert cassette.stats['hits'] == 2
+            with pytest.raises(ApiError):
+                api.make_request("get", "/facts", query_params={'page': 3}, is_return_resp_obj=True)
+
     def test_breeds_schema(self):
         """
         Get /breads, check if status code == 200, then check if response contains the list
@@ -43,11 +253,10 @@ class TestApi:
         assert resp.status_code == 200
         body = resp.json()
         assert 'data' in body and isinstance(body['data'], list)
-        required = {'breed','country','origin','coat','pattern'}
-        # Assert at least one item and all required keys exist on each item
-        for item in body['data'][:10]:  # sample first 10
-            assert required.issubset(item.keys())
+        # Every item of the page is checked against the compiled schema (breed, country, origin, coat, pattern)
+        get_validator("get", "/breeds")(body)
 
+    @pytest.mark.no_response_cache
     def test_invalid_limit_handled(self):
         """
         Get /facts, check if checking invalid limit
@@ -0,0 +1,19 @@
+"""
+Unit tests of the framework code; they don't need the API
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def bypass_response_cache():
+    """
+    Overriding the response cache bypass of the API tests, no client is created
+    """
+
+
+@pytest.fixture(autouse=True, scope="class")
+def setup_api_testing():
+    """
+    Overriding the API setup of the API tests, no client is created
+    """
@@ -0,0 +1,73 @@
+"""
+Built-in incremental JSON parser tests
+"""
+
+import json
+
+import pytest
+
+from api.api.streaming import iter_json_items
+
+
+BODY = {"current_page": 1, "data": [{"fact": "Cats sleep 16 hours", "length": 19}, {"fact": "Ünïcode", "length": 7.5}],
+        "total": 2}
+
+
+def split_chunks(data: bytes, size: int) -> list:
+    """
+    Returns:
+        list, data split into chunks of size bytes
+    """
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 1024])
+def test_items_across_chunk_boundaries(chunk_size):
+    """
+    Check if items are the same however the body is split, including multi-byte chars and numbers split by chunks
+    """
+    chunks = split_chunks(json.dumps(BODY, ensure_ascii=False).encode(), chunk_size)
+    assert list(iter_json_items(chunks, "data.item")) == BODY["data"]
+    assert list(iter_json_items(split_chunks(b"[1.25, 300, [], {}]", chunk_size))) == [1.25, 300, [], {}]
+
+
+@pytest.mark.parametrize('body,key', [
+    (b'{"current_page": 1, "total": 2}', "data"),
+    (b'{}', "data"),
+    (b'[1, 2]', "data"),
+    (b'{"meta": {"count": 1}}', "page"),
+])
+def test_missing_key_raises(body, key):
+    """
+    Check if a missing key of the prefix is reported instead of yielding nothing
+    """
+    prefix = "data.item" if key == "data" else "meta.page.item"
+    with pytest.raises(ValueError, match=f"Key '{key}' not found"):
+        list(iter_json_items([body], prefix))
+
+
+def test_malformed_body_not_buffered():
+    """
+    Check if a malformed item raises once max_item_size is exceeded, without reading the rest of the body
+    """
+    read = []
+
+    def chunks():
+        yield b'{"data": [{"fact": "ok"}, {"fact": oops'
+        for index in range(1000):
+            read.append(index)
+            yield b" " * 100
+
+    items = iter_json_items(chunks(), "data.item", max_item_size=1024)
+    assert next(items) == {"fact": "ok"}
+    with pytest.raises(ValueError, match="Malformed JSON"):
+        next(items)
+    assert len(read) < 20
+
+
+def test_malformed_body_end_raises():
+    """
+    Check if a truncated body raises
+    """
+    with pytest.raises(ValueError):
+        list(iter_json_items([b'{"data": [1, 2'], "data.item"))
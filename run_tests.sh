@@ -8,6 +8,10 @@
 #     pytest.ini config file
 #   - $2 - the path to the *.ini config file, defaults to pytest.ini
 #
+# Optional environment variables:
+#
+#   - PYTEST_WORKERS - number of pytest-xdist workers, e.g. 4 or auto (pytest-xdist must be in the module requirements)
+#
 # Exported variables in the setup.sh file: HOST_ARTIFACTS, ROOT_VENV, TEST_VENV, COPIED_PROJECT_PATH
 
 MODULE_NAME="${1:-''}"
@@ -46,7 +50,13 @@ else
   echo "Using $INI_CONFIG_FILE ini config file"
 fi
 
-python3 -m pytest "$MODULE_NAME" -v --tb=short -s --reruns 2 --reruns-delay 2 --ini-config "$INI_CONFIG_FILE" --html="$HOST_ARTIFACTS/test_report_$(date +%Y-%m-%d_%H-%M-%S).html"
+XDIST_ARGS=()
+if [[ -n "${PYTEST_WORKERS-}" ]]; then
+  echo "Running tests in $PYTEST_WORKERS pytest-xdist workers"
+  XDIST_ARGS=(-n "$PYTEST_WORKERS")
+fi
+
+python3 -m pytest "$MODULE_NAME" -v --tb=short -s --reruns 2 --reruns-delay 2 ${XDIST_ARGS[@]+"${XDIST_ARGS[@]}"} --ini-config "$INI_CONFIG_FILE" --html="$HOST_ARTIFACTS/test_report_$(date +%Y-%m-%d_%H-%M-%S).html"
 # Now, let's deactivate venv
 deactivate
 echo "Returning to the original project path to be able to run the test again with new changes, if there are any"
@@ -2,10 +2,135 @@
 Logger
 """
 
+import copy
+import itertools
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
 import sys
+from pprint import pformat
+
+
+def truncate_text(text: str, max_len: int = None) -> str:
+    """
+    Args:
+        text (str): text to truncate
+        max_len (int): max number of chars to keep, None - no limit
+
+    Returns:
+        str, text with the truncation marker if it was longer than max_len
+    """
+    if max_len is None or len(text) <= max_len:
+        return text
+    return f"{text[:max_len]}... [truncated {len(text) - max_len} chars]"
+
+
+class LazyText:  # pylint: disable=too-few-public-methods
+    """
+    Log argument that is converted to text only when a handler actually formats the record,
+    so nothing is built for disabled levels
+    """
+    __slots__ = ("_value", "_max_len", "_pretty", "_encoding", "_omitted")
+
+    def __init__(self, value, max_len: int = None, pretty: bool = False, encoding: str = None):
+        """
+        Args:
+            value (any): value to log; bytes are decoded, only the part that is kept after truncation
+            max_len (int): max number of chars to log, None - no limit
+            pretty (bool): True - pformat is used instead of str
+            encoding (str): encoding of bytes values, defaults to utf-8
+        """
+        self._value = value
+        self._max_len = max_len
+        self._pretty = pretty
+        self._encoding = encoding
+        self._omitted = 0  # length of the tail already cut off by detach()
+
+    def detach(self) -> "LazyText":
+        """
+        Returns:
+            LazyText that keeps a copy of the logged part of a str/bytes value only, not the whole value;
+            it's used for records that wait in the log queue. Other values are returned as is.
+        """
+        value = self._value
+        is_text = isinstance(value, (bytes, bytearray)) or (isinstance(value, str) and not self._pretty)
+        if not is_text or self._max_len is None or len(value) <= self._max_len:
+            return self
+        detached = LazyText(value[:self._max_len], None, self._pretty, self._encoding)
+        detached._omitted = self._omitted + len(value) - self._max_len  # pylint: disable=protected-access
+        return detached
+
+    def __str__(self) -> str:
+        value = self._value
+        if isinstance(value, (bytes, bytearray)):
+            head = value if self._max_len is None else value[:self._max_len]
+            text = bytes(head).decode(self._encoding or "utf-8", errors="replace")
+            omitted = len(value) - len(head) + self._omitted
+            if omitted:
+                text += f"... [truncated {omitted} bytes]"
+            return text
+        text = pformat(value) if self._pretty else str(value)
+        text = truncate_text(text, self._max_len)
+        if self._omitted:
+            text += f"... [truncated {self._omitted} chars]"
+        return text
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler with a bounded queue; a caller thread only puts the record to the queue,
+    all formatting and I/O is done by the QueueListener thread
+    """
+    POLICIES = ("drop", "block")
+
+    def __init__(self, max_size: int = 10000, on_full: str = "drop", block_timeout: float = 1.0):
+        """
+        Args:
+            max_size (int): max number of records waiting in the queue
+            on_full (str): drop - the new record is dropped when the queue is full,
+                           block - the caller waits up to block_timeout for a free slot (backpressure), then drops
+            block_timeout (float): seconds to wait for a free slot in the block mode
+        """
+        if on_full not in self.POLICIES:
+            raise ValueError(f"Unsupported queue policy '{on_full}', use one of {self.POLICIES}")
+        super().__init__(queue.Queue(max_size))
+        self.on_full = on_full
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record):
+        """
+        The listener runs in the same process, so the record is not pre-formatted here
+        and LazyText args are formatted in the listener thread; they are detached first,
+        so a queued record holds the logged part of a body only, not the whole body
+        """
+        record = copy.copy(record)
+        if isinstance(record.args, tuple):
+            record.args = tuple(arg.detach() if isinstance(arg, LazyText) else arg for arg in record.args)
+        return record
+
+    def enqueue(self, record):
+        """
+        Putting the record to the queue according to the on_full policy
+        """
+        try:
+            if self.on_full == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """
+    Queue listener that waits for a free slot for its stop sentinel, so stop() works on a full bounded queue
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
 
 
 class Logger:
@@ -14,8 +139,13 @@ class Logger:
     """
     __file_handler = None
     __cli_handler = None
+    __queue_handler = None
+    __queue_listener = None
     __loggers = []  # links to all created loggers
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    body_max_len = 2048  # max chars of a request/response body in a log record, None - no limit
+    body_sample_every = 1  # log every Nth body only, 1 - log all bodies
+    __body_counter = itertools.count()
 
     def __init__(self, logger_name: str):
         """
@@ -33,29 +163,102 @@ class Logger:
         if self.__logger not in Logger.__loggers:
             Logger.__loggers.append(self.__logger)
 
-    def info(self, message: str):
+    def info(self, message: str, *args):
         """
-        INFO log line
+        INFO log line; args are %-formatted into the message only if the record is emitted
         """
-        self.__logger.info(message)
+        self.__logger.info(message, *args)
 
-    def debug(self, message: str):
+    def debug(self, message: str, *args):
         """
-        DEBUG log line
+        DEBUG log line; args are %-formatted into the message only if the record is emitted
         """
-        self.__logger.debug(message)
+        self.__logger.debug(message, *args)
 
-    def error(self, message: str):
+    def error(self, message: str, *args):
         """
-        ERROR log line
+        ERROR log line; args are %-formatted into the message only if the record is emitted
         """
-        self.__logger.error(message)
+        self.__logger.error(message, *args)
 
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """
-        WARNING log line
+        WARNING log line; args are %-formatted into the message only if the record is emitted
         """
-        self.__logger.warning(message)
+        self.__logger.warning(message, *args)
+
+    def is_enabled_for(self, level) -> bool:
+        """
+        Args:
+            level (str/int): e.g. logging.DEBUG or "DEBUG"
+
+        Returns:
+            bool, True if a record of the level would be handled
+        """
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        return self.__logger.isEnabledFor(level)
+
+    def log_fields(self, level, header: str, fields: dict, footer: str = ""):
+        """
+        Structured multi-line record, one "name: value" line per field.
+        Nothing is formatted if the level is disabled; values are passed as deferred %-args,
+        so wrap big values into LazyText (see body()) to bound their size.
+
+        Args:
+            level (str/int): e.g. logging.DEBUG
+            header (str): first line of the record
+            fields (dict): {field name: value}
+            footer (str): last line of the record
+        """
+        if not self.is_enabled_for(level):
+            return
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        template = "\n%s" + "".join(f"\n{name.replace('%', '%%')}: %s" for name in fields)
+        args = [header, *fields.values()]
+        if footer:
+            template += "\n%s"
+            args.append(footer)
+        self.__logger.log(level, template, *args)
+
+    def debug_fields(self, header: str, fields: dict, footer: str = ""):
+        """
+        Structured DEBUG record, see log_fields()
+        """
+        self.log_fields(logging.DEBUG, header, fields, footer)
+
+    def error_fields(self, header: str, fields: dict, footer: str = ""):
+        """
+        Structured ERROR record, see log_fields()
+        """
+        self.log_fields(logging.ERROR, header, fields, footer)
+
+    @staticmethod
+    def set_body_limits(max_len: int = None, sample_every: int = 1):
+        """
+        Args:
+            max_len (int): max chars of a body in a log record, None - no limit
+            sample_every (int): log every Nth body only, 1 - log all bodies
+        """
+        Logger.body_max_len = max_len
+        Logger.body_sample_every = max(1, int(sample_every))
+
+    @staticmethod
+    def body(value, encoding: str = None):
+        """
+        Request/response body prepared for logging: truncated to body_max_len and sampled by body_sample_every
+
+        Args:
+            value (str/bytes): body
+            encoding (str): encoding of bytes body
+
+        Returns:
+            LazyText or str placeholder if the body is skipped by sampling
+        """
+        if Logger.body_sample_every > 1 and next(Logger.__body_counter) % Logger.body_sample_every:
+            return "<skipped by sampling>"
+        return LazyText(value, Logger.body_max_len, encoding=encoding)
 
     def __update_handler(self, logr, handlr):
         """
@@ -66,6 +269,16 @@ class Logger:
             logr (logger): logger to be updated
             handlr (handler): handler with required level and config
         """
+        listener = Logger.__queue_listener
+        if listener and logr is logging.getLogger():
+            # queue mode: root logger only has the queue handler, the real handlers belong to the listener
+            for hdlr in listener.handlers:
+                if hdlr.name == handlr.name:
+                    hdlr.level = handlr.level
+                    break
+            else:
+                listener.handlers = (*listener.handlers, handlr)
+            return
         for hdlr in logr.handlers:
             if hdlr.name == handlr.name:
                 hdlr.level = handlr.level
@@ -145,3 +358,46 @@ class Logger:
         for logger in loggers_list:
             self.__update_handler(logger, file_handler)
         root_logger.setLevel(min(file_handler.level, root_logger.level))
+
+    def setup_queue_mode(self, max_size: int = 10000, on_full: str = "drop"):
+        """
+        Moving the handlers of the root logger behind a QueueListener thread, so logging calls do not block
+        on disk or terminal I/O. Handlers set up later by setup_cli_handler/setup_filehandler go to the listener too.
+
+        Args:
+            max_size (int): max number of records waiting in the queue
+            on_full (str): drop or block, see BoundedQueueHandler
+        """
+        if Logger.__queue_listener:
+            return
+        root_logger = logging.getLogger()
+        handlers = [hdlr for hdlr in root_logger.handlers
+                    if hdlr in (Logger.__file_handler, Logger.__cli_handler)]
+        queue_handler = BoundedQueueHandler(max_size, on_full)
+        queue_handler.name = "queue"
+        listener = FlushingQueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        for hdlr in handlers:
+            root_logger.removeHandler(hdlr)
+        root_logger.addHandler(queue_handler)
+        Logger.__queue_handler = queue_handler
+        Logger.__queue_listener = listener
+        listener.start()
+
+    def stop_queue_mode(self):
+        """
+        Flushing all queued records and moving the handlers back to the root logger; e.g. on session teardown
+        """
+        listener = Logger.__queue_listener
+        if not listener:
+            return
+        listener.stop()  # processes all records left in the queue
+        root_logger = logging.getLogger()
+        root_logger.removeHandler(Logger.__queue_handler)
+        for hdlr in listener.handlers:
+            hdlr.flush()
+            root_logger.addHandler(hdlr)
+        dropped = Logger.__queue_handler.dropped
+        Logger.__queue_handler = None
+        Logger.__queue_listener = None
+        if dropped:
+            self.warning("%s log records were dropped because the log queue was full", dropped)
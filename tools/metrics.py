@@ -0,0 +1,290 @@
+"""
+Timing metrics of HTTP requests and page actions: events, hooks, histograms and JSON/Prometheus export
+"""
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+
+# Upper bounds of the histogram buckets, +Inf is implied
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+@dataclass(slots=True)
+class RequestTiming:  # pylint: disable=too-many-instance-attributes
+    """
+    Phases of a single HTTP request, seconds; dns/connect/tls are 0 when a pooled connection was reused
+    """
+    method: str
+    endpoint: str
+    status: int = None  # None - the request failed before a response was received
+    dns: float = 0
+    connect: float = 0
+    tls: float = 0
+    ttfb: float = 0  # request sent -> response headers received
+    download: float = 0  # response headers received -> body read
+    total: float = 0
+    bytes_out: int = 0
+    bytes_in: int = 0
+
+
+@dataclass(slots=True)
+class ActionTiming:
+    """
+    Duration of a single page action, seconds
+    """
+    page: str
+    action: str
+    duration: float
+    ok: bool = True
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed buckets, the same model as the Prometheus histogram
+    """
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds: tuple = SECONDS_BUCKETS):
+        """
+        Args:
+            bounds (tuple): sorted upper bounds of the buckets, +Inf is added
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        """
+        Args:
+            value (float): observed value
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def cumulative(self) -> list:
+        """
+        Returns:
+            list, [(upper bound, cumulative count), ...], the last bound is "+Inf"
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.bounds + ("+Inf",), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self) -> dict:
+        """
+        JSON-serializable summary
+        """
+        return {"count": self.count,
+                "sum": self.sum,
+                "min": self.min,
+                "max": self.max,
+                "mean": self.sum / self.count if self.count else None,
+                "buckets": {str(bound): count for bound, count in self.cumulative()}}
+
+
+class MetricsRegistry:
+    """
+    Collects request and page action events: every event is passed to the registered hooks and aggregated
+    into histograms per endpoint and per page method. Thread-safe.
+    """
+    HELP = {"http_request_phase_seconds": "HTTP request duration by phase",
+            "http_request_bytes": "HTTP request and response size",
+            "http_requests_total": "HTTP requests by status, status 0 - no response",
+            "page_action_seconds": "Page action duration",
+            "page_actions_total": "Page actions by outcome"}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hooks = []
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._counters = {}  # (name, labels) -> int
+
+    def add_hook(self, hook):
+        """
+        Args:
+            hook (callable): hook(event), called with every RequestTiming/ActionTiming in the thread that recorded it
+        """
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook):
+        """
+        Args:
+            hook (callable): hook registered with add_hook
+        """
+        with self._lock:
+            self._hooks = [_hook for _hook in self._hooks if _hook is not hook]
+
+    def record_request(self, timing: RequestTiming):
+        """
+        Args:
+            timing (RequestTiming): finished request
+        """
+        base = (("endpoint", timing.endpoint), ("method", timing.method))
+        with self._lock:
+            for phase in ("dns", "connect", "tls", "ttfb", "download", "total"):
+                self._observe("http_request_phase_seconds", base + (("phase", phase),),
+                              getattr(timing, phase), SECONDS_BUCKETS)
+            self._observe("http_request_bytes", base + (("direction", "out"),), timing.bytes_out, BYTES_BUCKETS)
+            self._observe("http_request_bytes", base + (("direction", "in"),), timing.bytes_in, BYTES_BUCKETS)
+            self._increment("http_requests_total", base + (("status", str(timing.status or 0)),))
+            hooks = self._hooks
+        self._call_hooks(hooks, timing)
+
+    def record_action(self, timing: ActionTiming):
+        """
+        Args:
+            timing (ActionTiming): finished page action
+        """
+        labels = (("page", timing.page), ("action", timing.action))
+        with self._lock:
+            self._observe("page_action_seconds", labels, timing.duration, SECONDS_BUCKETS)
+            self._increment("page_actions_total", labels + (("outcome", "ok" if timing.ok else "error"),))
+            hooks = self._hooks
+        self._call_hooks(hooks, timing)
+
+    def _observe(self, name: str, labels: tuple, value: float, bounds: tuple):
+        histogram = self._histograms.get((name, labels))
+        if histogram is None:
+            histogram = self._histograms[(name, labels)] = Histogram(bounds)
+        histogram.observe(value)
+
+    def _increment(self, name: str, labels: tuple):
+        self._counters[(name, labels)] = self._counters.get((name, labels), 0) + 1
+
+    @staticmethod
+    def _call_hooks(hooks: list, event):
+        for hook in hooks:
+            hook(event)
+
+    def reset(self):
+        """
+        Dropping all collected values, hooks are kept
+        """
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            dict, {"histograms": {name: [{"labels": {...}, ...}]}, "counters": {name: [{"labels": {...}, "value": N}]}}
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        result = {"histograms": {}, "counters": {}}
+        for (name, labels), histogram in histograms:
+            result["histograms"].setdefault(name, []).append({"labels": dict(labels), **histogram.to_dict()})
+        for (name, labels), value in counters:
+            result["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+        return result
+
+    def to_json(self) -> str:
+        """
+        Returns:
+            str, see to_dict()
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Returns:
+            str, Prometheus text exposition format
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        described = set()
+        for (name, labels), histogram in histograms:
+            self._describe(lines, described, name, "histogram")
+            for bound, count in histogram.cumulative():
+                lines.append(f"{name}_bucket{self._format_labels(labels + (('le', str(bound)),))} {count}")
+            lines.append(f"{name}_sum{self._format_labels(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+        for (name, labels), value in counters:
+            self._describe(lines, described, name, "counter")
+            lines.append(f"{name}{self._format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _describe(self, lines: list, described: set, name: str, metric_type: str):
+        if name in described:
+            return
+        described.add(name)
+        lines.append(f"# HELP {name} {self.HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    @staticmethod
+    def _format_labels(labels: tuple) -> str:
+        if not labels:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+                   for _, value in labels)
+        return "{" + ",".join(f"{key}=\"{value}\"" for (key, _), value in zip(labels, escaped)) + "}"
+
+    def export(self, path_prefix: str) -> tuple:
+        """
+        Writing <path_prefix>.json and <path_prefix>.prom
+
+        Args:
+            path_prefix (str): e.g. /artifacts/metrics-20240101-120000.000000
+
+        Returns:
+            tuple, (json path, prometheus path)
+        """
+        directory = os.path.dirname(path_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        json_path, prom_path = f"{path_prefix}.json", f"{path_prefix}.prom"
+        with open(json_path, "w", encoding="utf-8") as json_file:
+            json_file.write(self.to_json())
+        with open(prom_path, "w", encoding="utf-8") as prom_file:
+            prom_file.write(self.to_prometheus())
+        return json_path, prom_path
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    Returns:
+        MetricsRegistry, the process-wide registry used by ApiBase and BasePage
+    """
+    return _registry
+
+
+def timed_action(method):
+    """
+    Decorator of page object methods: the call is recorded as an ActionTiming with page=<class name>,
+    action=<method name>
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = method(self, *args, **kwargs)
+            ok = True
+            return result
+        finally:
+            _registry.record_action(ActionTiming(page=type(self).__name__, action=method.__name__,
+                                                 duration=time.perf_counter() - started, ok=ok))
+    return wrapper
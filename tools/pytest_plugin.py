@@ -0,0 +1,524 @@
+"""
+Shared pytest plugin of the API and web suites: logging setup, metrics export, per-test and per-fixture
+wall/CPU timing and profiling of the slowest tests
+
+Enabled in a conftest.py with pytest_plugins = ["tools.pytest_plugin"]; the suite must provide the app_config fixture
+(log_queue_mode, log_queue_size, log_queue_policy, metrics_export) and the --ini-config option. The timing options
+(timing_report, profile_slowest, profile_backend) are needed before any fixture runs, so they are read from
+the --ini-config file when pytest is configured.
+
+At the end of the run the plugin writes to HOST_ARTIFACTS:
+    timing-<worker>-<ts>.txt - ranked report: slowest tests, slowest fixtures, hot spots of the profiled tests
+    profile-<worker>-<ts>.folded - collapsed stacks of the profiled tests for flamegraph.pl / speedscope
+"""
+
+import cProfile
+import heapq
+import io
+import itertools
+import os
+import pstats
+import time
+from configparser import ConfigParser, ExtendedInterpolation
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import pytest
+
+from tools.logger.logger import Logger
+from tools.metrics import get_registry
+
+try:
+    import pyinstrument
+except ImportError:  # pragma: no cover - optional dependency
+    pyinstrument = None
+
+
+log = Logger(__name__)
+
+
+def timestamped_path(file_name: str, file_ext: str, path_to_file: str = os.getenv("HOST_ARTIFACTS")) -> str:
+    """
+    Args:
+        file_name (str): e.g. screenshot
+        file_ext (str): file extention, e.g., png
+        path_to_file (str): e.g. /home/user/test_dir/artifacts/
+
+    Returns:
+        str, timestamped path
+    """
+    ts = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S.%f")
+    return os.path.join(path_to_file, f"{file_name}-{ts}.{file_ext}")
+
+
+def _worker_id() -> str:
+    """
+    pytest-xdist worker id, e.g. gw0, or main
+    """
+    return os.getenv("PYTEST_XDIST_WORKER", "main")
+
+
+@pytest.fixture(autouse=True, scope="session")
+def add_loggers(request) -> None:
+    """
+    The fixture to configure loggers
+    It uses built-in pytest arguments to configure loggigng level and files
+    In the queue mode, handlers are run by a listener thread and the queue is flushed on session teardown
+
+    Parameters:
+        log_level or --log-level general log level for capturing
+        log_file_level or --log-file-level  level of log to be stored to a file. Usually lower than general log
+        log_file or --log-file  path where logs will be saved
+    """
+    _app_config = request.getfixturevalue("app_config")
+    artifacts_folder_default = os.getenv("HOST_ARTIFACTS")
+    log_level = "DEBUG"
+    log_file_level = "DEBUG"
+    log_file = os.path.join(timestamped_path("pytest", "log", artifacts_folder_default))
+    log.setup_cli_handler(level=log_level)
+    log.setup_filehandler(level=log_file_level, file_name=log_file)
+    if _app_config.log_queue_mode:
+        log.setup_queue_mode(max_size=_app_config.log_queue_size, on_full=_app_config.log_queue_policy)
+    log.info(f"General loglevel: '{log_level}', File: '{log_file_level}'")
+    yield
+    log.stop_queue_mode()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def export_metrics(request) -> None:
+    """
+    Request and page action timings collected by tools.metrics are exported at the end of the session
+    as JSON and Prometheus text; every pytest-xdist worker writes its own files
+    """
+    _app_config = request.getfixturevalue("app_config")
+    yield
+    if not _app_config.metrics_export:
+        return
+    path_prefix = os.path.splitext(timestamped_path(f"metrics-{_worker_id()}", "json", os.getenv("HOST_ARTIFACTS")))[0]
+    json_path, prom_path = get_registry().export(path_prefix)
+    log.info(f"Metrics exported to '{json_path}' and '{prom_path}'")
+
+
+@dataclass(slots=True)
+class ItemTiming:
+    """
+    Wall and process CPU time of a test, seconds; phases: {"setup": (wall, cpu), "call": ..., "teardown": ...}
+    """
+    nodeid: str
+    wall: float = 0
+    cpu: float = 0
+    outcome: str = "passed"
+    phases: dict = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class FixtureTiming:
+    """
+    Setup time of a fixture summed over all its setups, seconds; nested fixtures requested with
+    request.getfixturevalue() are excluded (self time)
+    """
+    name: str
+    scope: str
+    count: int = 0
+    wall: float = 0
+    cpu: float = 0
+    max_wall: float = 0
+
+
+def _frame_label(function: str, file_path: str, line_no: int) -> str:
+    """
+    Frame name of the reports and the collapsed stacks, e.g. click (base_page.py:405)
+    """
+    if not file_path or file_path == "~":
+        label = function
+    else:
+        label = f"{function} ({os.path.basename(file_path)}:{line_no})"
+    return label.replace(";", ":")
+
+
+class _CProfileCapture:
+    """
+    Deterministic profile of the test thread (cProfile); other threads (e.g. the driver pool resets) are not seen
+    """
+    name = "cProfile"
+    MAX_DEPTH = 96
+    MIN_SECONDS = 1e-5  # branches cheaper than this are not expanded in the collapsed stacks
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self.stats = None
+
+    def start(self):
+        """
+        Starting the profiler
+        """
+        self._profile.enable()
+
+    def stop(self):
+        """
+        Stopping the profiler and keeping the aggregated stats only
+        """
+        self._profile.disable()
+        self.stats = pstats.Stats(self._profile).stats
+        self._profile = None
+
+    def hot_spots(self) -> dict:
+        """
+        Returns:
+            dict, {label: (self seconds, cumulative seconds)}
+        """
+        result = {}
+        for (file_path, line_no, function), (_, _, self_time, cum_time, _) in self.stats.items():
+            label = _frame_label(function, file_path, line_no)
+            prev_self, prev_cum = result.get(label, (0, 0))
+            result[label] = (prev_self + self_time, prev_cum + cum_time)
+        return result
+
+    def folded(self) -> dict:
+        """
+        Collapsed stacks rebuilt from the caller graph: the time of a function is split between its callees
+        in proportion to the time spent in each of them
+
+        Returns:
+            dict, {(frame label, ...): self seconds}
+        """
+        callees = {}
+        for func, (_, _, _, _, callers) in self.stats.items():
+            for caller, edge in callers.items():
+                callees.setdefault(caller, {})[func] = edge[3]
+        result = {}
+
+        def walk(func, path, seen, budget):
+            cum_time = self.stats[func][3]
+            scale = budget / cum_time if cum_time else 0
+            children_time = 0
+            if len(path) < self.MAX_DEPTH:
+                for callee, edge_time in callees.get(func, {}).items():
+                    child_budget = edge_time * scale
+                    if callee in seen or child_budget < self.MIN_SECONDS:
+                        continue
+                    children_time += child_budget
+                    walk(callee, path + (self._label(callee),), seen | {callee}, child_budget)
+            self_time = budget - children_time
+            if self_time > 0:
+                result[path] = result.get(path, 0) + self_time
+
+        for func, (_, _, _, cum_time, callers) in self.stats.items():
+            if not callers:
+                walk(func, (self._label(func),), {func}, cum_time)
+        return result
+
+    @staticmethod
+    def _label(func: tuple) -> str:
+        file_path, line_no, function = func
+        return _frame_label(function, file_path, line_no)
+
+
+class _PyinstrumentCapture:
+    """
+    Sampling profile of the test thread (pyinstrument), lower overhead than cProfile
+    """
+    name = "pyinstrument"
+
+    def __init__(self):
+        self._profiler = pyinstrument.Profiler(interval=0.001)
+        self.root = None
+
+    def start(self):
+        """
+        Starting the profiler
+        """
+        self._profiler.start()
+
+    def stop(self):
+        """
+        Stopping the profiler and keeping the frame tree only
+        """
+        self._profiler.stop()
+        self.root = self._profiler.last_session.root_frame() if self._profiler.last_session else None
+        self._profiler = None
+
+    def _walk(self):
+        """
+        Yields:
+            tuple, (frame, path of labels)
+        """
+        if self.root is None:
+            return
+        stack = [(self.root, (self._label(self.root),))]
+        while stack:
+            frame, path = stack.pop()
+            yield frame, path
+            stack.extend((child, path + (self._label(child),)) for child in frame.children)
+
+    def hot_spots(self) -> dict:
+        """
+        Returns:
+            dict, {label: (self seconds, cumulative seconds)}; recursive calls are counted once in the cumulative time
+        """
+        result = {}
+        for frame, path in self._walk():
+            label = path[-1]
+            prev_self, prev_cum = result.get(label, (0, 0))
+            cum_time = frame.time if label not in path[:-1] else 0
+            result[label] = (prev_self + frame.total_self_time, prev_cum + cum_time)
+        return result
+
+    def folded(self) -> dict:
+        """
+        Returns:
+            dict, {(frame label, ...): self seconds}
+        """
+        result = {}
+        for frame, path in self._walk():
+            if frame.total_self_time > 0:
+                result[path] = result.get(path, 0) + frame.total_self_time
+        return result
+
+    @staticmethod
+    def _label(frame) -> str:
+        return _frame_label(frame.function, frame.file_path_short, frame.line_no)
+
+
+class TimingReport:
+    """
+    Per-test and per-fixture wall/CPU timing and profiles of the N slowest tests; registered by pytest_configure
+    """
+    CAPTURES = {"cprofile": _CProfileCapture, "pyinstrument": _PyinstrumentCapture}
+    TOP_TESTS = 20
+    TOP_FIXTURES = 15
+    TOP_HOT_SPOTS = 30
+
+    def __init__(self, profile_slowest: int = 0, backend: str = "cprofile"):
+        """
+        Args:
+            profile_slowest (int): number of the slowest tests to keep profiles of, 0 - no profiling
+            backend (str): cprofile or pyinstrument
+        """
+        if backend not in self.CAPTURES:
+            raise ValueError(f"Unknown profile backend '{backend}', use one of {sorted(self.CAPTURES)}")
+        if backend == "pyinstrument" and pyinstrument is None:
+            log.warning("pyinstrument is not installed, profiling with cProfile")
+            backend = "cprofile"
+        self.profile_slowest = max(0, profile_slowest)
+        self.capture_cls = self.CAPTURES[backend]
+        self.tests = {}  # nodeid -> ItemTiming
+        self.fixtures = {}  # (name, scope) -> FixtureTiming
+        self._fixture_stack = []  # [child wall, child cpu] of the fixtures being set up
+        self._profiles = []  # min-heap of (wall, order, nodeid, capture), the N slowest tests
+        self._order = itertools.count()
+
+    @staticmethod
+    def _now() -> tuple:
+        return time.perf_counter(), time.process_time()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):  # pylint: disable=unused-argument
+        """
+        Profiling the whole test: setup, call and teardown
+        """
+        capture = None
+        if self.profile_slowest:
+            capture = self.capture_cls()
+            try:
+                capture.start()
+            except (RuntimeError, ValueError) as ex:  # another profiler is active
+                log.warning(f"Profiling of {item.nodeid} is skipped: {ex}")
+                capture = None
+        yield
+        if capture is None:
+            return
+        capture.stop()
+        timing = self.tests.get(item.nodeid)
+        wall = timing.wall if timing else 0
+        entry = (wall, next(self._order), item.nodeid, capture)
+        if len(self._profiles) < self.profile_slowest:
+            heapq.heappush(self._profiles, entry)
+        elif wall > self._profiles[0][0]:
+            heapq.heapreplace(self._profiles, entry)
+
+    def _time_phase(self, item, phase: str):
+        wall_started, cpu_started = self._now()
+        yield
+        wall_finished, cpu_finished = self._now()
+        timing = self.tests.setdefault(item.nodeid, ItemTiming(item.nodeid))
+        wall, cpu = wall_finished - wall_started, cpu_finished - cpu_started
+        timing.phases[phase] = (wall, cpu)
+        timing.wall += wall
+        timing.cpu += cpu
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        """
+        Timing the setup phase
+        """
+        yield from self._time_phase(item, "setup")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        """
+        Timing the call phase
+        """
+        yield from self._time_phase(item, "call")
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):  # pylint: disable=unused-argument
+        """
+        Timing the teardown phase
+        """
+        yield from self._time_phase(item, "teardown")
+
+    def pytest_runtest_logreport(self, report):
+        """
+        Keeping the outcome of the test (the first failed phase wins)
+        """
+        timing = self.tests.get(report.nodeid)
+        if timing is not None and timing.outcome == "passed" and not report.passed:
+            timing.outcome = f"{report.outcome} ({report.when})" if report.when != "call" else report.outcome
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):  # pylint: disable=unused-argument
+        """
+        Timing fixture setups; time of the nested fixtures is subtracted from the parent one
+        """
+        wall_started, cpu_started = self._now()
+        children = [0.0, 0.0]
+        self._fixture_stack.append(children)
+        try:
+            yield
+        finally:
+            self._fixture_stack.pop()
+            wall_finished, cpu_finished = self._now()
+            wall, cpu = wall_finished - wall_started, cpu_finished - cpu_started
+            if self._fixture_stack:
+                self._fixture_stack[-1][0] += wall
+                self._fixture_stack[-1][1] += cpu
+            key = (fixturedef.argname, fixturedef.scope)
+            timing = self.fixtures.get(key)
+            if timing is None:
+                timing = self.fixtures[key] = FixtureTiming(*key)
+            timing.count += 1
+            timing.wall += wall - children[0]
+            timing.cpu += cpu - children[1]
+            timing.max_wall = max(timing.max_wall, wall - children[0])
+
+    def slowest_tests(self) -> list:
+        """
+        Returns:
+            list, ItemTiming, the slowest first
+        """
+        return sorted(self.tests.values(), key=lambda timing: timing.wall, reverse=True)
+
+    def hot_spots(self) -> list:
+        """
+        Returns:
+            list, [(label, self seconds, cumulative seconds), ...] over all profiled tests, the most self time first
+        """
+        merged = {}
+        for _, _, _, capture in self._profiles:
+            for label, (self_time, cum_time) in capture.hot_spots().items():
+                prev_self, prev_cum = merged.get(label, (0, 0))
+                merged[label] = (prev_self + self_time, prev_cum + cum_time)
+        return sorted(((label, *times) for label, times in merged.items()), key=lambda row: row[1], reverse=True)
+
+    def render(self) -> str:
+        """
+        Returns:
+            str, the ranked report
+        """
+        tests = self.slowest_tests()
+        out = io.StringIO()
+        out.write(f"Timing report of {len(tests)} test(s): wall {sum(t.wall for t in tests):.3f} s, "
+                  f"CPU {sum(t.cpu for t in tests):.3f} s (process CPU, background threads included)\n")
+        out.write(f"\nSlowest tests (wall s, CPU s, outcome, setup/call/teardown wall s), top {self.TOP_TESTS}:\n")
+        for rank, timing in enumerate(tests[:self.TOP_TESTS], 1):
+            phases = "/".join(f"{timing.phases.get(phase, (0, 0))[0]:.3f}" for phase in ("setup", "call", "teardown"))
+            out.write(f"{rank:>4}. {timing.wall:9.3f} {timing.cpu:9.3f}  {timing.outcome:<8} {phases:<22} "
+                      f"{timing.nodeid}\n")
+        fixtures = sorted(self.fixtures.values(), key=lambda timing: timing.wall, reverse=True)
+        out.write(f"\nSlowest fixture setups (total wall s, CPU s, max wall s, setups, scope), top {self.TOP_FIXTURES}:\n")
+        for rank, timing in enumerate(fixtures[:self.TOP_FIXTURES], 1):
+            out.write(f"{rank:>4}. {timing.wall:9.3f} {timing.cpu:9.3f} {timing.max_wall:9.3f} {timing.count:>6}  "
+                      f"{timing.scope:<8} {timing.name}\n")
+        if self._profiles:
+            profiled = sorted(self._profiles, reverse=True, key=lambda entry: entry[0])
+            out.write(f"\nHot spots of the {len(profiled)} slowest test(s), {self.capture_cls.name} "
+                      f"(self s, cumulative s), top {self.TOP_HOT_SPOTS}:\n")
+            for rank, (label, self_time, cum_time) in enumerate(self.hot_spots()[:self.TOP_HOT_SPOTS], 1):
+                out.write(f"{rank:>4}. {self_time:9.3f} {cum_time:9.3f}  {label}\n")
+            out.write("\nProfiled tests:\n")
+            for wall, _, nodeid, _ in profiled:
+                out.write(f"      {wall:9.3f}  {nodeid}\n")
+        return out.getvalue()
+
+    def write_folded(self, path: str) -> int:
+        """
+        Writing collapsed stacks ("frame;frame;frame microseconds" per line), the test id is the root frame
+
+        Returns:
+            int, number of stacks written
+        """
+        lines = 0
+        with open(path, "w", encoding="utf-8") as folded_file:
+            for _, _, nodeid, capture in sorted(self._profiles, reverse=True, key=lambda entry: entry[0]):
+                root = nodeid.replace(";", ":")
+                for stack, seconds in capture.folded().items():
+                    microseconds = int(seconds * 1_000_000)
+                    if microseconds:
+                        folded_file.write(f"{root};{';'.join(stack)} {microseconds}\n")
+                        lines += 1
+        return lines
+
+    def pytest_sessionfinish(self, session):  # pylint: disable=unused-argument
+        """
+        Writing the report and the collapsed stacks to HOST_ARTIFACTS
+        """
+        if not self.tests:  # e.g. the pytest-xdist controller
+            return
+        artifacts = os.getenv("HOST_ARTIFACTS") or os.getcwd()
+        os.makedirs(artifacts, exist_ok=True)
+        report_path = timestamped_path(f"timing-{_worker_id()}", "txt", artifacts)
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            report_file.write(self.render())
+        log.info(f"Timing report: '{report_path}'")
+        if self._profiles:
+            folded_path = timestamped_path(f"profile-{_worker_id()}", "folded", artifacts)
+            self.write_folded(folded_path)
+            log.info(f"Collapsed stacks of the slowest tests: '{folded_path}' (flamegraph.pl or speedscope.app)")
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """
+        Short summary in the terminal, the full report is in the artifacts
+        """
+        tests = self.slowest_tests()[:5]
+        if not tests:
+            return
+        terminalreporter.write_sep("=", "slowest tests (wall / CPU)")
+        for timing in tests:
+            terminalreporter.write_line(f"{timing.wall:9.3f} s {timing.cpu:9.3f} s  {timing.nodeid}")
+
+
+def pytest_addoption(parser):
+    """
+    Options of the timing report
+    """
+    group = parser.getgroup("timing", "per-test timing and profiling (tools.pytest_plugin)")
+    group.addoption("--profile-slowest", action="store", type=int, default=None,
+                    help="Keep profiles of the N slowest tests, 0 - no profiling (ini config: profile_slowest)")
+    group.addoption("--profile-backend", action="store", choices=sorted(TimingReport.CAPTURES), default=None,
+                    help="Profiler of the slowest tests (ini config: profile_backend)")
+
+
+def pytest_configure(config):
+    """
+    Registering the timing report; its options are read from the --ini-config file, like the app config
+    """
+    cfg = ConfigParser(interpolation=ExtendedInterpolation())
+    cfg.read(config.getoption("--ini-config", default="pytest.ini"))
+    if not cfg.getboolean("pytest", "timing_report", fallback=True):
+        return
+    profile_slowest = config.getoption("--profile-slowest")
+    if profile_slowest is None:
+        profile_slowest = cfg.getint("pytest", "profile_slowest", fallback=0)
+    backend = config.getoption("--profile-backend") or cfg.get("pytest", "profile_backend", fallback="cprofile")
+    config.pluginmanager.register(TimingReport(profile_slowest, backend), "timing-report")
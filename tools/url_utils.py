@@ -3,7 +3,13 @@ URL utils
 """
 
 import re
-from urllib.parse import urlparse
+from dataclasses import dataclass, field
+from functools import lru_cache
+from urllib.parse import urlencode, urlparse
+
+
+PORT_REGEX = re.compile(r"(^.*:(\d+).*$)")
+HOST_PORT_REGEX = re.compile(r"(^(.*):(\d+).*$)")
 
 
 def get_base_url_and_port(url_string, is_port_pointed):
@@ -13,38 +19,40 @@ def get_base_url_and_port(url_string, is_port_pointed):
     Args:
         url_string (str): Either parsed.netloc or parsed.path (if parsed.netloc param is not set),
                           basically it should be URL
-        is_port_pointed (bool): Use condition e.g. port_regex.search(parsed.netloc) is None
+        is_port_pointed (bool): Use condition e.g. PORT_REGEX.search(parsed.netloc) is None
 
     Returns:
         tuple, (b_url, p_port)
     """
-    b_url = ""
-    p_port = ""
     url_string_u = url_string.replace("https://", "").replace("http://", "")
     if is_port_pointed:
-        b_url, p_port = re.compile(r"(^(.*):(\d+).*$)").search(url_string_u).groups()[1:]
+        b_url, p_port = HOST_PORT_REGEX.search(url_string_u).groups()[1:]
     else:
-        b_url = url_string_u[0:url_string_u.find("/")] if url_string_u.find("/") > 0 else url_string_u
+        slash = url_string_u.find("/")
+        b_url = url_string_u[0:slash] if slash > 0 else url_string_u
         p_port = ""
     return (b_url, p_port)
 
 
+@lru_cache(maxsize=256)
 def get_http_prot_url_port_separately(url: str) -> tuple:
     """
+    Memoized, the same URL is parsed once
+
     Args:
         url (str): e.g. http://some-host:80
 
     Returns:
         tuple, (http_protocol, base_url, port, path_uri, query_params)
     """
-    port_regex = re.compile(r"(^.*:(\d+).*$)")
     parsed = urlparse(url)
     # When HTTP protocol is not provided, URL is placed to urlparse.path param
-    if not parsed.scheme and port_regex.search(parsed.path) is None:
+    is_port_in_path = PORT_REGEX.search(parsed.path) is not None
+    if not parsed.scheme and not is_port_in_path:
         raise ValueError(f"URL should contain at least HTTP protcol (http/https); current value: {url}")
     base_url, port = get_base_url_and_port(
         parsed.netloc or parsed.path,
-        port_regex.search(parsed.netloc) is not None or port_regex.search(parsed.path) is not None)
+        PORT_REGEX.search(parsed.netloc) is not None or is_port_in_path)
     if parsed.scheme:
         http_protocol = parsed.scheme
     else:
@@ -53,7 +61,67 @@ def get_http_prot_url_port_separately(url: str) -> tuple:
     if parsed.netloc:
         path_uri = parsed.path
     else:
-        path_uri = parsed.path[parsed.path.find("/"):len(parsed.path)] if parsed.path.find("/") > 0 else ""
+        slash = parsed.path.find("/")
+        path_uri = parsed.path[slash:len(parsed.path)] if slash > 0 else ""
     if not port:
         port = "443" if http_protocol == "https" else "80"
     return (http_protocol, base_url, port, path_uri, query_params)
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedEndpoint:
+    """
+    Immutable, hashable protocol/host/port of an API; base_url is formatted once
+    """
+    protocol: str
+    host: str
+    port: str
+    base_url: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "base_url", f"{self.protocol}://{self.host}:{self.port}")
+
+
+@lru_cache(maxsize=256)
+def get_endpoint(protocol: str, host: str, port: str) -> ParsedEndpoint:
+    """
+    Memoized ParsedEndpoint, the same instance is returned for the same parts
+
+    Args:
+        protocol (str): http or https
+        host (str): e.g. google.com
+        port (str): e.g. 443
+
+    Returns:
+        ParsedEndpoint
+    """
+    return ParsedEndpoint(protocol, host, str(port))
+
+
+def parse_endpoint(url: str) -> ParsedEndpoint:
+    """
+    Args:
+        url (str): e.g. https://catfact.ninja
+
+    Returns:
+        ParsedEndpoint, memoized
+    """
+    return get_endpoint(*get_http_prot_url_port_separately(url)[0:3])
+
+
+def build_url(endpoint: ParsedEndpoint, uri: str, params: dict = None) -> str:
+    """
+    Args:
+        endpoint (ParsedEndpoint): e.g. get_endpoint("https", "catfact.ninja", "443")
+        uri (str): e.g. /facts
+        params (dict): query params, None values are skipped (like requests does), lists become repeated keys
+
+    Returns:
+        str, e.g. https://catfact.ninja:443/facts?page=2
+    """
+    if not params:
+        return endpoint.base_url + uri
+    query = urlencode([(key, value) for key, value in params.items() if value is not None], doseq=True)
+    if not query:
+        return endpoint.base_url + uri
+    return f"{endpoint.base_url}{uri}{'&' if '?' in uri else '?'}{query}"
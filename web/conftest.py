@@ -4,7 +4,7 @@ conftest.py file
 # pylint: disable=duplicate-code
 
 import os
-from datetime import datetime
+from functools import partial
 from configparser import ConfigParser, ExtendedInterpolation
 
 import pytest
@@ -17,29 +17,14 @@ from web.src.pages.home_page import HomePage
 from web.src.pages.search_page import SearchPage
 from web.src.pages.streamer_page import StreamerPage
 from web.src.core.app_config import AppConfig
+from web.src.core.driver_pool import DriverPool
+from web.src.core.network_control import NetworkControl, resolve_url_patterns
+from web.src.core.session_state import SessionStateCache
 
 
 log = Logger(__name__)
 
-
-@pytest.fixture(autouse=True, scope="session")
-def add_loggers() -> None:
-    """
-    The fixture to configure loggers
-    It uses built-in pytest arguments to configure loggigng level and files
-
-    Parameters:
-        log_level or --log-level general log level for capturing
-        log_file_level or --log-file-level  level of log to be stored to a file. Usually lower than general log
-        log_file or --log-file  path where logs will be saved
-    """
-    artifacts_folder_default = os.getenv("HOST_ARTIFACTS")
-    log_level = "DEBUG"
-    log_file_level = "DEBUG"
-    log_file = os.path.join(timestamped_path("pytest", "log", artifacts_folder_default))
-    log.setup_cli_handler(level=log_level)
-    log.setup_filehandler(level=log_file_level, file_name=log_file)
-    log.info(f"General loglevel: '{log_level}', File: '{log_file_level}'")
+pytest_plugins = ["tools.pytest_plugin"]
 
 
 @pytest.fixture(scope="session")
@@ -58,9 +43,31 @@ def app_config(pytestconfig) -> AppConfig:
     result_dict["is_headless"] = cfg.getboolean("pytest", "is_headless", fallback=False)
     result_dict["width"] = cfg.getint("pytest", "width", fallback=400)
     result_dict["height"] = cfg.getint("pytest", "height", fallback=1000)
+    result_dict["driver_pool_size"] = cfg.getint("pytest", "driver_pool_size", fallback=1)
+    result_dict["page_load_strategy"] = cfg.get("pytest", "page_load_strategy", fallback="normal")
+    result_dict["blocked_url_groups"] = get_list_option(cfg, "blocked_url_groups")
+    result_dict["blocked_url_patterns"] = get_list_option(cfg, "blocked_url_patterns")
+    result_dict["disable_browser_cache"] = cfg.getboolean("pytest", "disable_browser_cache", fallback=False)
+    result_dict["session_state_cache"] = cfg.getboolean("pytest", "session_state_cache", fallback=True)
+    result_dict["log_queue_mode"] = cfg.getboolean("pytest", "log_queue_mode", fallback=True)
+    result_dict["log_queue_size"] = cfg.getint("pytest", "log_queue_size", fallback=10000)
+    result_dict["log_queue_policy"] = cfg.get("pytest", "log_queue_policy", fallback="drop")
+    result_dict["metrics_export"] = cfg.getboolean("pytest", "metrics_export", fallback=True)
     return AppConfig(**result_dict)
 
 
+def get_list_option(cfg: ConfigParser, option: str) -> list:
+    """
+    Args:
+        cfg (ConfigParser): parsed ini config
+        option (str): comma separated option of the pytest section, e.g. "ads, analytics"
+
+    Returns:
+        list, stripped non-empty items
+    """
+    return [item.strip() for item in cfg.get("pytest", option, fallback="").split(",") if item.strip()]
+
+
 def pytest_addoption(parser):
     """
     Supported options
@@ -79,25 +86,11 @@ def screenshot_dir() -> str:
     return artifacts_folder_default
 
 
-def timestamped_path(file_name: str, file_ext: str, path_to_file: str = os.getenv("HOST_ARTIFACTS")) -> str:
-    """
-    Args:
-        file_name (str): e.g. screenshot
-        file_ext (str): file extention, e.g., png
-        path_to_file (str): e.g. /home/user/test_dir/artifacts/
-
-    Returns:
-        str, timestamped path
-    """
-    ts = datetime.utcnow().strftime("%Y%m%d-%H%M%S.%f")
-    return os.path.join(path_to_file, f"{file_name}-{ts}.{file_ext}")
-
-
-def get_driver(browser: str, pytestconfig, request) -> WebDriver:
+def get_driver(browser: str, pytestconfig, _app_config: AppConfig) -> WebDriver:
     """
     Get a driver for passed browser settings
+    A local browser is started (headless if is_headless is set), no Selenium Grid is needed
     """
-    _app_config = request.getfixturevalue("app_config")
     if browser in ("chrome", "chromium"):
         window_size = pytestconfig.getoption("--window-size", f"{_app_config.width},{_app_config.height}")
         headless = _app_config.is_headless
@@ -111,25 +104,51 @@ def get_driver(browser: str, pytestconfig, request) -> WebDriver:
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument(f"--window-size={window_size}")
+        # normal - wait for all resources, eager - DOMContentLoaded only, none - return right after navigation starts
+        options.page_load_strategy = _app_config.page_load_strategy
 
         _driver = webdriver.Chrome(options=options)
         _driver.set_page_load_timeout(60)
+        network = NetworkControl(_driver).enable()
+        if _app_config.disable_browser_cache:
+            network.set_cache_disabled(True)
         return _driver
     raise ValueError(f"'{browser}' value is not currently supported")
 
 
 @pytest.fixture(scope="session")
-def driver(pytestconfig, request):
+def driver_pool(pytestconfig, request):
     """
-    Browser driver
+    Pool of warm browsers; with pytest-xdist every worker is a separate session, so it gets its own pool
     """
     _app_config = request.getfixturevalue("app_config")
-    _driver = get_driver(_app_config.browser, pytestconfig, request)
-    yield _driver
-    _driver.quit()
+    worker_id = os.getenv("PYTEST_XDIST_WORKER", "master")
+    log.info(f"Starting driver pool of {_app_config.driver_pool_size} for the '{worker_id}' worker")
+    pool = DriverPool(partial(get_driver, _app_config.browser, pytestconfig, _app_config),
+                      _app_config.driver_pool_size)
+    pool.start()
+    yield pool
+    pool.close()
 
 
 # pylint: disable=redefined-outer-name
+@pytest.fixture(scope="function")
+def driver(driver_pool, request):
+    """
+    Browser driver leased from the pool for one test; its state is reset when it's returned
+    Requests matching blocked_url_groups/blocked_url_patterns from the ini config are blocked through CDP,
+    a test can block more with @pytest.mark.block_urls("*.mp4*", groups=["media"])
+    """
+    _app_config = request.getfixturevalue("app_config")
+    patterns = resolve_url_patterns(_app_config.blocked_url_groups, _app_config.blocked_url_patterns)
+    marker = request.node.get_closest_marker("block_urls")
+    if marker is not None:
+        patterns = resolve_url_patterns(marker.kwargs.get("groups"), [*patterns, *marker.args])
+    with driver_pool.leased() as _driver:
+        NetworkControl(_driver).block_urls(patterns)
+        yield _driver
+
+
 @pytest.fixture(autouse=True, scope="function")
 def setup_for_testing(request, driver):
     """
@@ -141,10 +160,27 @@ def setup_for_testing(request, driver):
     request.cls.search_page = SearchPage(driver)
     request.cls.streamer_page = StreamerPage(driver)
 
+    state_cache = request.getfixturevalue("session_state_cache") if _app_config.session_state_cache else None
+    is_state_injected = state_cache is not None and state_cache.inject(driver)
+
     # 1. Open home
     request.cls.home_page.open(_app_config.base_url)
+    if is_state_injected:
+        # Cookies/localStorage of the first warm-up (including the consent) are already in place
+        return
     # Getting rid off the cookies overlay
     request.cls.home_page.confirm_cookies_overlay_if_shown()
+    if state_cache is not None:
+        state_cache.capture(driver)
+
+
+@pytest.fixture(scope="session")
+def session_state_cache() -> SessionStateCache:
+    """
+    Session state (cookies, localStorage, consent) captured by the first test and injected into drivers
+    of the next ones before navigation
+    """
+    return SessionStateCache()
 
 
 @pytest.fixture(scope="session")
@@ -16,3 +16,13 @@ class AppConfig:  # pylint: disable=too-many-instance-attributes
     browser: str
     width: int
     height: int
+    driver_pool_size: int
+    page_load_strategy: str
+    blocked_url_groups: list
+    blocked_url_patterns: list
+    disable_browser_cache: bool
+    session_state_cache: bool
+    log_queue_mode: bool
+    log_queue_size: int
+    log_queue_policy: str
+    metrics_export: bool
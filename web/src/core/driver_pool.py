@@ -0,0 +1,145 @@
+"""
+Pool of warm browser instances leased one per test
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tools.logger.logger import Logger
+from web.src.core.network_control import NetworkControl
+
+
+log = Logger(__name__)
+
+
+class DriverPool:
+    """
+    Keeps N warm drivers; a released driver is reset in the background (cookies, storage, blank page),
+    so the next lease doesn't wait for the reset. Under pytest-xdist every worker has its own pool.
+    """
+    RESET_URL = "about:blank"
+
+    def __init__(self, factory, size: int = 1):
+        """
+        Args:
+            factory (callable): creates a new WebDriver, e.g. functools.partial(get_driver, ...)
+            size (int): number of warm drivers
+        """
+        self.factory = factory
+        self.size = max(1, size)
+        self._idle = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._reset_executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="driver-reset")
+        self._closed = False
+
+    def start(self):
+        """
+        Starting all drivers concurrently
+        """
+        with ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="driver-start") as executor:
+            for _driver in executor.map(lambda _: self.factory(), range(self.size)):
+                self._add(_driver)
+        log.info(f"Driver pool started with {self.size} driver(s)")
+        return self
+
+    def _add(self, _driver: WebDriver):
+        with self._lock:
+            self._all.append(_driver)
+        self._idle.put(_driver)
+
+    def lease(self, timeout: float = 300) -> WebDriver:
+        """
+        Args:
+            timeout (float): seconds to wait for a free driver
+
+        Returns:
+            WebDriver
+        """
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty as ex:
+            raise TimeoutError(f"No free driver in the pool after {timeout} seconds") from ex
+
+    def release(self, _driver: WebDriver):
+        """
+        Resetting the driver in the background and returning it to the pool
+        """
+        if self._closed:
+            self._quit(_driver)
+            return
+        self._reset_executor.submit(self._reset_and_return, _driver)
+
+    @contextmanager
+    def leased(self, timeout: float = 300):
+        """
+        Context manager: with pool.leased() as driver: ...
+        """
+        _driver = self.lease(timeout)
+        try:
+            yield _driver
+        finally:
+            self.release(_driver)
+
+    def _reset_and_return(self, _driver: WebDriver):
+        try:
+            self.reset(_driver)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            # A broken browser is replaced, so the pool keeps its size
+            log.warning(f"Failed to reset the driver, replacing it: {ex}")
+            self._discard(_driver)
+            try:
+                _driver = self.factory()
+                with self._lock:
+                    self._all.append(_driver)
+            except Exception as factory_ex:  # pylint: disable=broad-exception-caught
+                log.error(f"Failed to create a replacement driver: {factory_ex}")
+                return
+        self._idle.put(_driver)
+
+    def reset(self, _driver: WebDriver):
+        """
+        Clearing the state left by the previous test: storage of the current origin, cookies, extra windows,
+        blocked URLs
+        """
+        handles = _driver.window_handles
+        for handle in handles[1:]:
+            _driver.switch_to.window(handle)
+            _driver.close()
+        _driver.switch_to.window(handles[0])
+        try:
+            _driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        finally:
+            _driver.delete_all_cookies()
+            if hasattr(_driver, "execute_cdp_cmd"):
+                NetworkControl(_driver).block_urls([])
+            _driver.get(self.RESET_URL)
+
+    def _discard(self, _driver: WebDriver):
+        with self._lock:
+            if _driver in self._all:
+                self._all.remove(_driver)
+        self._quit(_driver)
+
+    @staticmethod
+    def _quit(_driver: WebDriver):
+        try:
+            _driver.quit()
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            log.warning(f"Failed to quit the driver: {ex}")
+
+    def close(self):
+        """
+        Waiting for pending resets and quitting all drivers
+        """
+        self._closed = True
+        self._reset_executor.shutdown(wait=True)
+        with self._lock:
+            drivers, self._all = self._all, []
+        for _driver in drivers:
+            self._quit(_driver)
+        log.info("Driver pool closed")
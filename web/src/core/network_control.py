@@ -0,0 +1,108 @@
+"""
+Chrome DevTools Protocol network control: URL blocking, extra request headers, cache
+"""
+
+import weakref
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tools.logger.logger import Logger
+
+
+log = Logger(__name__)
+
+
+# Groups of URL patterns (CDP wildcard syntax, * matches any chars) that can be blocked by name in the ini config
+BLOCKED_URL_GROUPS = {
+    "ads": ["*doubleclick.net*", "*googlesyndication.com*", "*adservice.google.*", "*amazon-adsystem.com*",
+            "*imasdk.googleapis.com*", "*adsrvr.org*", "*criteo.*"],
+    "analytics": ["*google-analytics.com*", "*googletagmanager.com*", "*scorecardresearch.com*",
+                  "*comscore.com*", "*branch.io*", "*sentry.io*", "*spade.twitch.tv*", "*countess.twitch.tv*"],
+    "media": ["*.ts", "*.ts?*", "*.m3u8*", "*.mp4*", "*.webm*", "*video-edge*", "*usher.ttvnw.net*"],
+    "images": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*static-cdn.jtvnw.net*"],
+    "fonts": ["*.woff*", "*.ttf*", "*.otf*"],
+}
+
+# Patterns blocked in each driver; a NetworkControl is created per lease, the state lives with the driver
+_BLOCKED_PATTERNS = weakref.WeakKeyDictionary()
+
+
+def resolve_url_patterns(groups: list = None, patterns: list = None) -> list:
+    """
+    Args:
+        groups (list): names from BLOCKED_URL_GROUPS, e.g. ["ads", "analytics"]
+        patterns (list): extra URL patterns
+
+    Returns:
+        list, unique patterns, in the order they were passed
+
+    Raises:
+        ValueError, if a group is unknown
+    """
+    result = []
+    for group in groups or []:
+        if group not in BLOCKED_URL_GROUPS:
+            raise ValueError(f"Unknown blocked URL group '{group}', use one of {sorted(BLOCKED_URL_GROUPS)}")
+        result.extend(BLOCKED_URL_GROUPS[group])
+    result.extend(patterns or [])
+    return list(dict.fromkeys(result))
+
+
+class NetworkControl:
+    """
+    Network layer of a Chromium driver controlled through CDP; all commands apply to the whole browser tab
+    and stay until changed, so a leased driver is reconfigured for every test
+    """
+
+    def __init__(self, driver: WebDriver):
+        """
+        Args:
+            driver (WebDriver): Chrome/Chromium driver (execute_cdp_cmd is required)
+        """
+        if not hasattr(driver, "execute_cdp_cmd"):
+            raise ValueError(f"CDP is not supported by {type(driver).__name__}")
+        self.driver = driver
+
+    @property
+    def blocked_patterns(self) -> list:
+        """
+        Patterns blocked in the driver, empty list - nothing is blocked
+        """
+        return list(_BLOCKED_PATTERNS.get(self.driver, []))
+
+    def enable(self):
+        """
+        Enabling the Network domain, it's required by the other commands
+        """
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        return self
+
+    def block_urls(self, patterns: list):
+        """
+        Blocking requests matching the patterns (the previous patterns are replaced), e.g. ["*.mp4*"]
+
+        Args:
+            patterns (list): CDP URL patterns, empty list - nothing is blocked
+        """
+        patterns = list(patterns)
+        if patterns == self.blocked_patterns:
+            return
+        self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        _BLOCKED_PATTERNS[self.driver] = patterns
+        log.debug(f"Blocked URL patterns: {patterns}")
+
+    def set_extra_headers(self, headers: dict):
+        """
+        Adding headers to every request of the tab, e.g. to mark automation traffic for a stub site
+
+        Args:
+            headers (dict): headers, empty dict - no extra headers
+        """
+        self.driver.execute_cdp_cmd("Network.setExtraHTTPHeaders", {"headers": dict(headers)})
+
+    def set_cache_disabled(self, disabled: bool):
+        """
+        Args:
+            disabled (bool): True - the browser cache is bypassed
+        """
+        self.driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": disabled})
@@ -0,0 +1,135 @@
+"""
+Browser session state (cookies, localStorage, consent) captured once and injected into drivers before navigation
+"""
+
+import json
+import threading
+import weakref
+from dataclasses import dataclass
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tools.logger.logger import Logger
+
+
+log = Logger(__name__)
+
+
+CAPTURE_STATE_JS = """
+const storage = {};
+for (let i = 0; i < window.localStorage.length; i++) {
+  const key = window.localStorage.key(i);
+  storage[key] = window.localStorage.getItem(key);
+}
+return {origin: window.location.origin, localStorage: storage};
+"""
+
+# Runs before any page script of a new document: the captured localStorage is restored on the captured origin
+RESTORE_STORAGE_JS_TEMPLATE = """
+(() => {
+  if (window.location.origin !== %(origin)s) return;
+  const items = %(items)s;
+  try {
+    for (const [key, value] of Object.entries(items)) {
+      if (window.localStorage.getItem(key) === null) window.localStorage.setItem(key, value);
+    }
+  } catch (e) {}
+})();
+"""
+
+
+@dataclass(slots=True)
+class SessionState:
+    """
+    Captured state of a warmed-up page
+    """
+    origin: str
+    cookies: list
+    local_storage: dict
+
+
+class SessionStateCache:
+    """
+    Holds the state captured after the first warm-up (e.g. the consent flow) and injects it into new or reused
+    drivers before navigation: cookies through CDP Network.setCookies, localStorage through
+    Page.addScriptToEvaluateOnNewDocument, so the first page load already has them
+    """
+
+    def __init__(self):
+        self.state = None
+        self._lock = threading.Lock()
+        self._storage_scripts = weakref.WeakKeyDictionary()  # driver -> CDP script identifier
+
+    @property
+    def has_state(self) -> bool:
+        """
+        True if the state was captured
+        """
+        return self.state is not None
+
+    def capture(self, driver: WebDriver) -> SessionState:
+        """
+        Capturing cookies and localStorage of the current page
+
+        Returns:
+            SessionState
+        """
+        page_state = driver.execute_script(CAPTURE_STATE_JS)
+        state = SessionState(origin=page_state["origin"],
+                             cookies=driver.get_cookies(),
+                             local_storage=page_state["localStorage"])
+        with self._lock:
+            self.state = state
+        log.info(f"Captured session state of {state.origin}: {len(state.cookies)} cookie(s), "
+                 f"{len(state.local_storage)} localStorage item(s)")
+        return state
+
+    def inject(self, driver: WebDriver) -> bool:
+        """
+        Injecting the captured state; must be called before navigating to the origin
+
+        Returns:
+            bool, True if the state was injected
+        """
+        state = self.state
+        if state is None:
+            return False
+        if hasattr(driver, "execute_cdp_cmd"):
+            try:
+                self._inject_with_cdp(driver, state)
+                return True
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                log.warning(f"Failed to inject the session state through CDP, navigating to the origin: {ex}")
+        self._inject_on_origin(driver, state)
+        return True
+
+    def _inject_with_cdp(self, driver: WebDriver, state: SessionState):
+        cookies = []
+        for cookie in state.cookies:
+            cdp_cookie = {"name": cookie["name"], "value": cookie["value"], "url": state.origin,
+                          "path": cookie.get("path", "/"), "secure": cookie.get("secure", False),
+                          "httpOnly": cookie.get("httpOnly", False)}
+            if cookie.get("domain"):
+                cdp_cookie["domain"] = cookie["domain"]
+            if cookie.get("expiry"):
+                cdp_cookie["expires"] = cookie["expiry"]
+            if cookie.get("sameSite"):
+                cdp_cookie["sameSite"] = cookie["sameSite"]
+            cookies.append(cdp_cookie)
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        if driver not in self._storage_scripts:
+            source = RESTORE_STORAGE_JS_TEMPLATE % {"origin": json.dumps(state.origin),
+                                                    "items": json.dumps(state.local_storage)}
+            result = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+            self._storage_scripts[driver] = result.get("identifier")
+
+    @staticmethod
+    def _inject_on_origin(driver: WebDriver, state: SessionState):
+        """
+        Fallback without CDP: cookies and localStorage can only be set on a page of the origin
+        """
+        driver.get(state.origin + "/")
+        for cookie in state.cookies:
+            driver.add_cookie({key: value for key, value in cookie.items() if key != "sameSite"})
+        driver.execute_script("for (const [k, v] of Object.entries(arguments[0])) window.localStorage.setItem(k, v);",
+                              state.local_storage)
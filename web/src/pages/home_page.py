@@ -6,6 +6,7 @@ from selenium.webdriver.common.by import By
 
 from tools.logger.logger import Logger
 from web.src.pages.base_page import BasePage
+from web.src.pages.search_page import SearchPage
 
 
 log = Logger(__name__)
@@ -26,12 +27,18 @@ class HomePage(BasePage):
     CLOSE_OVERLAY = (By.XPATH,
         "//div[@class='ScReactModalBase-sc-26ijes-0 foAhuv tw-modal-layer']//button[@class='InjectLayout-sc-1i43xsx-0 ccdBQN']"
     )
+    # Search input of the page opened by the search icon
+    SEARCH_PAGE_INPUT = SearchPage.SEARCH_INPUT
 
-    def open(self, base_url: str):
+    def open(self, base_url: str, force: bool = False):
         """
-        Opening URL
+        Opening URL; no navigation if the page is already opened, unless force is set
         """
-        self.driver.get(base_url + "/")
+        url = base_url.rstrip("/") + "/"
+        if not force and self.driver.current_url.split("?")[0].split("#")[0] == url:
+            log.info(f"'{url}' is already opened")
+            return
+        self.driver.get(url)
         # self.confirm_cookies_overlay_if_shown()  # sometimes, accept cookies overlay is shown at this point
 
     def open_search(self):
@@ -58,7 +65,9 @@ class HomePage(BasePage):
         Clicking the Accept button on the "Cookies and Advertising Choices" overlay, if it's shown
         """
         try:
-            if self.wait_visible(self.TRANSITION_TO_APP_OVERLAY, 2):
+            # The search page is the alternative state: no need to wait for the overlay once it's shown
+            locator = self.first_of([self.TRANSITION_TO_APP_OVERLAY, self.SEARCH_PAGE_INPUT], 2)[0]
+            if locator == self.TRANSITION_TO_APP_OVERLAY:
                 self.js_click(self.CLOSE_OVERLAY)
         except Exception:
             # This method is not supposed to check if switch to app overlay should be shown, so we're ok if it's not shown
@@ -0,0 +1,76 @@
+"""
+Translating locators for execution in the browser
+"""
+
+import re
+
+from selenium.webdriver.common.by import By
+
+
+# jQuery-only pseudo-classes, browsers reject them in querySelectorAll
+_UNSUPPORTED_PSEUDO_RE = re.compile(
+    r":(eq|gt|lt|first|last|even|odd|visible|hidden|header|input|button|checkbox|text|contains)(?![\w-])")
+_CONTAINS_RE = re.compile(r"""^\s*(?P<tag>[\w-]+|\*)?\s*:contains\((?P<quote>['"])(?P<text>.*?)(?P=quote)\)\s*$""")
+
+
+def _split_selector_group(selector: str) -> list:
+    """
+    Splitting a CSS selector group by the top-level commas (not inside quotes or brackets)
+    """
+    parts, depth, quote, current = [], 0, None, ""
+    for char in selector:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "'\"":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        current += char
+    parts.append(current.strip())
+    return [part for part in parts if part]
+
+
+def compile_locators(locators: list) -> list:
+    """
+    Translating locators for execution in the browser: CSS parts with jQuery :contains('text') become XPath
+    (//tag[contains(normalize-space(.), 'text')]), other selectors that are not valid CSS are rejected
+
+    Args:
+        locators (list): [(By.CSS_SELECTOR, "..."), (By.XPATH, "..."), ...]
+
+    Returns:
+        list, [(By.CSS_SELECTOR or By.XPATH, value), ...]
+
+    Raises:
+        ValueError, if a selector can't be translated
+    """
+    compiled = []
+    for by, value in locators:
+        if by == By.XPATH:
+            compiled.append((by, value))
+            continue
+        if by != By.CSS_SELECTOR:
+            raise ValueError(f"Only CSS_SELECTOR and XPATH locators are supported: {(by, value)}")
+        css_parts, xpath_parts = [], []
+        for part in _split_selector_group(value):
+            match = _CONTAINS_RE.match(part)
+            if match:
+                text = match.group("text")
+                if "'" in text:
+                    raise ValueError(f"Quotes in :contains() text are not supported: {part}")
+                xpath_parts.append(f"//{match.group('tag') or '*'}[contains(normalize-space(.), '{text}')]")
+            elif _UNSUPPORTED_PSEUDO_RE.search(part):
+                raise ValueError(f"Selector is not valid CSS and can't be translated: {part}")
+            else:
+                css_parts.append(part)
+        if css_parts:
+            compiled.append((By.CSS_SELECTOR, ", ".join(css_parts)))
+        if xpath_parts:
+            compiled.append((By.XPATH, " | ".join(xpath_parts)))
+    return compiled
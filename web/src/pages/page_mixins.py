@@ -0,0 +1,386 @@
+"""
+Mixins of BasePage: wait scripts, the locator race, overlay dismissal and the viewport helper
+"""
+
+import time
+import weakref
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from tools.logger.logger import Logger
+from web.src.pages.locators import compile_locators
+
+
+log = Logger(__name__)
+
+
+# Async scripts below resolve with true when the condition is met and with false on timeout;
+# polling starts at the animation frame rate and backs off while nothing changes
+WAIT_SCROLL_STABLE_JS = """
+const stableFrames = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const started = performance.now();
+let lastX = window.scrollX, lastY = window.scrollY, lastH = document.documentElement.scrollHeight, stable = 0;
+function tick() {
+  const x = window.scrollX, y = window.scrollY, h = document.documentElement.scrollHeight;
+  stable = (x === lastX && y === lastY && h === lastH) ? stable + 1 : 0;
+  lastX = x; lastY = y; lastH = h;
+  if (stable >= stableFrames) return done(true);
+  if (performance.now() - started > timeoutMs) return done(false);
+  requestAnimationFrame(tick);
+}
+requestAnimationFrame(tick);
+"""
+
+WAIT_NETWORK_IDLE_JS = """
+const idleMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const started = performance.now();
+let lastCount = performance.getEntriesByType('resource').length, lastChange = started, delay = 25;
+function poll() {
+  const now = performance.now(), count = performance.getEntriesByType('resource').length;
+  if (count !== lastCount) { lastCount = count; lastChange = now; delay = 25; }
+  else { delay = Math.min(delay * 2, 250); }
+  if (document.readyState === 'complete' && now - lastChange >= idleMs) return done(true);
+  if (now - started > timeoutMs) return done(false);
+  setTimeout(poll, Math.min(delay, Math.max(1, idleMs - (now - lastChange))));
+}
+setTimeout(poll, 0);
+"""
+
+WAIT_DOM_QUIESCENT_JS = """
+const quietMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const started = performance.now();
+let lastMutation = started, finished = false;
+const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+function finish(result) { if (finished) return; finished = true; observer.disconnect(); done(result); }
+function check() {
+  const now = performance.now();
+  if (now - lastMutation >= quietMs) return finish(true);
+  if (now - started > timeoutMs) return finish(false);
+  setTimeout(check, Math.max(10, quietMs - (now - lastMutation)));
+}
+setTimeout(check, quietMs);
+"""
+
+# Finds the first visible and enabled element of every locator in one roundtrip;
+# returns [[locator index, element], ...] for the present ones only
+FIND_DISMISSIBLE_JS = """
+const locators = arguments[0];
+function clickable(el) {
+  if (el.disabled) return false;
+  const r = el.getBoundingClientRect();
+  if (r.width === 0 || r.height === 0) return false;
+  const styles = window.getComputedStyle(el);
+  return styles.display !== 'none' && styles.visibility !== 'hidden' && styles.pointerEvents !== 'none'
+    && parseFloat(styles.opacity) !== 0;
+}
+function candidates(by, value) {
+  if (by === 'css selector') return Array.from(document.querySelectorAll(value));
+  const snap = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  const els = [];
+  for (let i = 0; i < snap.snapshotLength; i++) els.push(snap.snapshotItem(i));
+  return els;
+}
+const found = [];
+locators.forEach(([by, value], index) => {
+  const el = candidates(by, value).find(clickable);
+  if (el) found.push([index, el]);
+});
+return found;
+"""
+
+# Returns [locator index, element] of the first locator that has a visible element, or null
+FIND_FIRST_VISIBLE_OF_JS = """
+const locators = arguments[0];
+function visible(el) {
+  const r = el.getBoundingClientRect();
+  if (r.width === 0 || r.height === 0) return false;
+  const styles = window.getComputedStyle(el);
+  return styles.display !== 'none' && styles.visibility !== 'hidden' && parseFloat(styles.opacity) !== 0;
+}
+function candidates(by, value) {
+  if (by === 'css selector') return Array.from(document.querySelectorAll(value));
+  const snap = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  const els = [];
+  for (let i = 0; i < snap.snapshotLength; i++) els.push(snap.snapshotItem(i));
+  return els;
+}
+for (let index = 0; index < locators.length; index++) {
+  const el = candidates(locators[index][0], locators[index][1]).find(visible);
+  if (el) return [index, el];
+}
+return null;
+"""
+
+# Defines window.__automationFirstVisible(by, value, ratio, topMargin, bottomMargin) -> Promise<Element|null>.
+# IntersectionObserver filters the candidates without forcing layout on every matched element;
+# styles and the hit test (elementFromPoint) are checked only for the ones visible enough.
+VIEWPORT_HELPER_JS = """
+window.__automationFirstVisible = function (by, value, ratio, topM, bottomM) {
+  let els;
+  if (by === 'css selector') {
+    els = Array.from(document.querySelectorAll(value));
+  } else {
+    const snap = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    els = [];
+    for (let i = 0; i < snap.snapshotLength; i++) els.push(snap.snapshotItem(i));
+  }
+  if (!els.length) return Promise.resolve(null);
+  return new Promise((resolve) => {
+    const entriesByEl = new Map();
+    let finished = false;
+    function covered(el, rect) {
+      const x = Math.floor(rect.left + rect.width / 2);
+      const y = Math.floor(rect.top + rect.height / 2);
+      const hit = document.elementFromPoint(x, y);
+      return !(hit && (el === hit || el.contains(hit)));
+    }
+    function finish() {
+      if (finished) return;
+      finished = true;
+      observer.disconnect();
+      for (const el of els) {
+        const entry = entriesByEl.get(el);
+        if (!entry || !entry.isIntersecting) continue;
+        const height = Math.max(1, entry.boundingClientRect.height);
+        if (entry.intersectionRect.height / height < ratio) continue;
+        const styles = window.getComputedStyle(el);
+        if (styles.display === 'none' || styles.visibility === 'hidden' || parseFloat(styles.opacity) === 0) continue;
+        if (!covered(el, entry.intersectionRect)) return resolve(el);
+      }
+      resolve(null);
+    }
+    const observer = new IntersectionObserver((entries) => {
+      entries.forEach((entry) => entriesByEl.set(entry.target, entry));
+      if (entriesByEl.size >= els.length) finish();
+    }, {root: null, rootMargin: `-${topM}px 0px -${bottomM}px 0px`, threshold: [0, ratio]});
+    els.forEach((el) => observer.observe(el));
+    setTimeout(finish, 500);  // the initial entries normally arrive within a frame
+  });
+};
+"""
+
+CALL_VIEWPORT_HELPER_JS = """
+const done = arguments[arguments.length - 1];
+if (typeof window.__automationFirstVisible !== 'function') { done({missing: true}); return; }
+window.__automationFirstVisible(arguments[0], arguments[1], arguments[2], arguments[3], arguments[4])
+  .then(done, () => done(null));
+"""
+
+# Drivers that have the viewport helper registered for new documents via CDP
+_VIEWPORT_HELPER_REGISTERED = weakref.WeakSet()
+
+
+class WaitMixin:
+    """
+    Waiting for the page to settle with async scripts instead of fixed pauses
+    """
+    def _wait_async_script(self, script: str, timeout: float, *args) -> bool:
+        """
+        Running a wait script from above; the script itself gives up after timeout, so the driver timeout
+        is set a bit longer for the call and restored afterwards
+
+        Returns:
+            bool, True if the condition was met before the timeout
+        """
+        previous_timeout = self.driver.timeouts.script
+        self.driver.set_script_timeout(timeout + 2)
+        try:
+            return bool(self.driver.execute_async_script(script, *args, int(timeout * 1000)))
+        except Exception as ex:
+            log.warning(f"Wait script failed: {ex}")
+            return False
+        finally:
+            self.driver.set_script_timeout(previous_timeout)
+
+    def wait_scroll_stable(self, timeout: float = 2, stable_frames: int = 3) -> bool:
+        """
+        Waiting until the scroll position and the document height don't change for several animation frames
+
+        Returns:
+            bool, True if the page settled before the timeout
+        """
+        return self._wait_async_script(WAIT_SCROLL_STABLE_JS, timeout, int(stable_frames))
+
+    def wait_network_idle(self, idle_ms: int = 500, timeout: float = 10) -> bool:
+        """
+        Waiting until the document is loaded and no resource was fetched for idle_ms
+
+        Returns:
+            bool, True if the network got idle before the timeout
+        """
+        return self._wait_async_script(WAIT_NETWORK_IDLE_JS, timeout, int(idle_ms))
+
+    def wait_dom_quiescent(self, quiet_ms: int = 300, timeout: float = 10) -> bool:
+        """
+        Waiting until there are no DOM mutations for quiet_ms
+
+        Returns:
+            bool, True if the DOM got quiet before the timeout
+        """
+        return self._wait_async_script(WAIT_DOM_QUIESCENT_JS, timeout, int(quiet_ms))
+
+
+class LocatorRaceMixin:
+    """
+    Waiting for the first of several alternative page states
+    """
+    def first_of(self, locators: list, timeout: float = 5, poll_frequency: float = 0.05):
+        """
+        Race-style wait: all locators are checked in one roundtrip per tick, the first one that has
+        a visible element wins, so alternative page states don't add up their timeouts.
+        Polling starts at poll_frequency and backs off up to 0.5 seconds.
+
+        Args:
+            locators (list): CSS_SELECTOR/XPATH locators (translated by compile_locators),
+                             earlier ones win if several are visible at once
+            timeout (float): seconds to wait
+
+        Returns:
+            tuple, (locator, WebElement) of the met condition, the locator is the passed one
+
+        Raises:
+            ValueError, if a locator is not CSS_SELECTOR/XPATH or can't be translated
+            TimeoutException, if no locator got visible
+        """
+        # one passed locator may compile to a CSS and an XPath locator, both are mapped back to it
+        script_locators, passed_indexes = [], []
+        for passed_index, locator in enumerate(locators):
+            for compiled in compile_locators([locator]):
+                script_locators.append(list(compiled))
+                passed_indexes.append(passed_index)
+        deadline = time.monotonic() + timeout
+        delay = poll_frequency
+        while True:
+            found = self.driver.execute_script(FIND_FIRST_VISIBLE_OF_JS, script_locators)
+            if found:
+                index, web_element = found
+                return locators[passed_indexes[index]], web_element
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(f"None of the locators got visible in {timeout} seconds: {locators}")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+
+    def any_of(self, locators: list, timeout: float = 5):
+        """
+        Same as first_of, but returns None instead of raising on timeout
+
+        Returns:
+            tuple, (locator, WebElement) or None
+
+        Raises:
+            ValueError, if a locator is not CSS_SELECTOR/XPATH or can't be translated
+        """
+        try:
+            return self.first_of(locators, timeout)
+        except TimeoutException:
+            return None
+
+
+class OverlayMixin:  # pylint: disable=too-few-public-methods
+    """
+    Dismissing popups/overlays of the page
+    """
+    # Popups/overlays a page may show; compiled once per page class, see __init_subclass__
+    DISMISS_SELECTORS = []
+    _dismiss_locators = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "DISMISS_SELECTORS" in cls.__dict__:
+            cls._dismiss_locators = compile_locators(cls.DISMISS_SELECTORS)
+
+    def dismiss_overlays(self, locators: list = None) -> list:
+        """
+        Dismissing popups in one roundtrip: all locators are evaluated by a single script,
+        only the present and clickable elements are clicked, absent popups cost nothing
+
+        Args:
+            locators (list): compiled locators (see compile_locators), defaults to the page DISMISS_SELECTORS
+
+        Returns:
+            list, locators that were present and clicked
+        """
+        if locators is None:
+            locators = self._dismiss_locators
+        if not locators:
+            return []
+        try:
+            found = self.driver.execute_script(FIND_DISMISSIBLE_JS, [list(locator) for locator in locators])
+        except Exception as ex:
+            log.warning(f"Failed to look for overlays: {ex}")
+            return []
+        dismissed = []
+        for index, web_element in found:
+            try:
+                web_element.click()
+            except Exception:
+                # e.g. the element is covered by the overlay being closed by the previous click
+                try:
+                    self.driver.execute_script("arguments[0].click();", web_element)
+                except Exception as ex:
+                    log.debug(f"Failed to dismiss overlay {locators[index]}: {ex}")
+                    continue
+            dismissed.append(locators[index])
+        if dismissed:
+            log.info(f"Dismissed overlays: {dismissed}")
+        return dismissed
+
+
+class ViewportMixin:
+    """
+    Finding elements visible in the viewport with a helper script installed into the page
+    """
+    def focus_first_visible(self, locator):
+        """
+        Returns:
+            WebElement, focused element
+        """
+        try:
+            web_element = self.find_first_visible_in_viewport(locator)
+            # set focus
+            self.driver.execute_script("arguments[0].focus();", web_element)
+            return web_element
+        except Exception as ex:
+            log.error(f"Failed to focus visible element: {ex}")
+        return None
+
+    def find_first_visible_in_viewport(self,
+                                       locator,
+                                       min_ratio: float = 0.5,
+                                       top_margin: int = 90,
+                                       bottom_margin: int = 0):
+        """
+        Get the 1st visible element which is visible at list by min_ratio in view port and not covered by other elements.
+        The helper script is installed into the page once (and registered for new documents via CDP when supported),
+        then it's called by name.
+
+        Returns:
+            WebElement
+        """
+        by, value = locator
+        if by not in (By.CSS_SELECTOR, By.XPATH):
+            raise ValueError("Use CSS_SELECTOR or XPATH for this helper.")
+        args = (by, value, float(min_ratio), int(top_margin), int(bottom_margin))
+        result = self.driver.execute_async_script(CALL_VIEWPORT_HELPER_JS, *args)
+        if isinstance(result, dict) and result.get("missing"):
+            # A new document without the helper: installing it and calling again
+            self.install_viewport_helper()
+            result = self.driver.execute_async_script(CALL_VIEWPORT_HELPER_JS, *args)
+        return result
+
+    def install_viewport_helper(self):
+        """
+        Installing the viewport helper into the current document; with Chromium it's also registered
+        with Page.addScriptToEvaluateOnNewDocument once per driver, so next page loads have it already
+        """
+        self.driver.execute_script(VIEWPORT_HELPER_JS)
+        if self.driver in _VIEWPORT_HELPER_REGISTERED or not hasattr(self.driver, "execute_cdp_cmd"):
+            return
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": VIEWPORT_HELPER_JS})
+            _VIEWPORT_HELPER_REGISTERED.add(self.driver)
+        except Exception as ex:
+            log.debug(f"CDP is not available, the viewport helper is installed per page: {ex}")
@@ -15,7 +15,8 @@ class StreamerPage(BasePage):
     """
     Streamer page
     """
-    # Possible popups (consent, mature content, cookie, login prompts, etc.)
+    # Possible popups (consent, mature content, cookie, login prompts, etc.);
+    # :contains() is translated to XPath when the class is loaded
     DISMISS_SELECTORS = [
         (By.CSS_SELECTOR, "button[aria-label='Close'], button[aria-label='Dismiss']"),
         (By.CSS_SELECTOR, "button:has(svg[aria-label='Close'])"),
@@ -30,11 +31,7 @@ class StreamerPage(BasePage):
         """
         Make sure the video/player is visible
         """
-        # Try to close any modal/popups if they appear
-        for loc in self.DISMISS_SELECTORS:
-            self.maybe_click(loc)
-        # Wait for either a video/player container or channel header to be visible
-        try:
-            return self.wait_visible(self.VIDEO_PLAYER)
-        except Exception:
-            return self.wait_visible(self.CHANNEL_HEADER)
+        # Try to close any modal/popups if they appear, all of them are checked in one roundtrip
+        self.dismiss_overlays()
+        # Wait for either a video/player container or channel header to be visible, whichever comes first
+        return self.first_of([self.VIDEO_PLAYER, self.CHANNEL_HEADER], timeout=10)[1]
@@ -5,7 +5,7 @@ Twitch mobile tests
 import pytest
 
 from tools.logger.logger import Logger
-from web.conftest import timestamped_path
+from tools.pytest_plugin import timestamped_path
 
 
 log = Logger(__name__)
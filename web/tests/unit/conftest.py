@@ -0,0 +1,12 @@
+"""
+Unit tests of the framework code; they don't need a browser
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="function")
+def setup_for_testing():
+    """
+    Overriding the page setup of the browser tests, no driver is leased
+    """
@@ -0,0 +1,54 @@
+"""
+Locator translation tests
+"""
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from web.src.pages.locators import _split_selector_group, compile_locators
+
+
+@pytest.mark.parametrize('selector,expected', [
+    ("button", ["button"]),
+    ("button, a.close", ["button", "a.close"]),
+    ("[aria-label='Close, dismiss'], .x", ["[aria-label='Close, dismiss']", ".x"]),
+    ("div:not(.a, .b), span", ["div:not(.a, .b)", "span"]),
+    ("button:contains('Accept, all'), ,", ["button:contains('Accept, all')"]),
+])
+def test_split_selector_group(selector, expected):
+    """
+    Check if a selector group is split by the top-level commas only
+    """
+    assert _split_selector_group(selector) == expected
+
+
+def test_compile_locators_keeps_css_and_xpath():
+    """
+    Check if valid CSS and XPath locators are passed as is
+    """
+    locators = [(By.CSS_SELECTOR, "button.close, [data-a-target='x']"), (By.XPATH, "//button")]
+    assert compile_locators(locators) == locators
+
+
+def test_compile_locators_translates_contains():
+    """
+    Check if :contains() parts of a CSS group become XPath and the rest stays CSS
+    """
+    compiled = compile_locators([(By.CSS_SELECTOR, "button:contains('Accept'), .consent, :contains(\"Close\")")])
+    assert compiled == [(By.CSS_SELECTOR, ".consent"),
+                        (By.XPATH, "//button[contains(normalize-space(.), 'Accept')] | "
+                                   "//*[contains(normalize-space(.), 'Close')]")]
+
+
+@pytest.mark.parametrize('locator', [
+    (By.CSS_SELECTOR, "li:first"),
+    (By.CSS_SELECTOR, "button:contains(\"Don't\")"),
+    (By.CSS_SELECTOR, "div > button:contains('Accept')"),
+    (By.ID, "close"),
+])
+def test_compile_locators_rejects_invalid(locator):
+    """
+    Check if jQuery-only selectors that can't be translated and unsupported locator types are rejected
+    """
+    with pytest.raises(ValueError):
+        compile_locators([locator])
@@ -0,0 +1,80 @@
+"""
+URL blocking tests, the CDP commands are recorded by a stub driver
+"""
+
+from web.src.core.driver_pool import DriverPool
+from web.src.core.network_control import NetworkControl, resolve_url_patterns
+
+
+class CdpRecorder:
+    """
+    Stands in for a Chromium driver: records the CDP commands, the rest of the calls do nothing
+    """
+
+    def __init__(self):
+        self.commands = []
+        self.window_handles = ["main"]
+        self.switch_to = self
+
+    def execute_cdp_cmd(self, cmd: str, params: dict):
+        """
+        Recording the command
+        """
+        self.commands.append((cmd, params))
+        return {}
+
+    def blocked_urls_commands(self) -> list:
+        """
+        Returns:
+            list, URL lists of the Network.setBlockedURLs commands
+        """
+        return [params["urls"] for cmd, params in self.commands if cmd == "Network.setBlockedURLs"]
+
+    def window(self, handle):
+        """
+        WebDriver.switch_to.window()
+        """
+
+    def execute_script(self, script, *args):
+        """
+        WebDriver.execute_script()
+        """
+
+    def delete_all_cookies(self):
+        """
+        WebDriver.delete_all_cookies()
+        """
+
+    def get(self, url):
+        """
+        WebDriver.get()
+        """
+
+
+def test_block_and_unblock_urls():
+    """
+    Check if patterns are blocked and unblocked, and if the same patterns are not sent again
+    while the driver keeps them across NetworkControl instances
+    """
+    driver = CdpRecorder()
+    patterns = resolve_url_patterns(["fonts"], ["*.mp4*"])
+    NetworkControl(driver).block_urls(patterns)
+    NetworkControl(driver).block_urls(patterns)
+    assert NetworkControl(driver).blocked_patterns == patterns
+    NetworkControl(driver).block_urls([])
+    assert driver.blocked_urls_commands() == [patterns, []]
+    assert not NetworkControl(driver).blocked_patterns
+
+
+def test_reset_clears_blocked_urls():
+    """
+    Check if a driver returned to the pool has no blocked patterns of the previous test, so a next test
+    without patterns doesn't inherit them
+    """
+    driver = CdpRecorder()
+    pool = DriverPool(lambda: driver)
+    NetworkControl(driver).block_urls(["*.mp4*"])
+    pool.reset(driver)
+    NetworkControl(driver).block_urls([])
+    assert driver.blocked_urls_commands() == [["*.mp4*"], []]
+    assert not NetworkControl(driver).blocked_patterns
@@ -0,0 +1,128 @@
+"""
+URL blocking tests in headless Chrome against a local stub page; skipped if Chrome is not installed
+"""
+
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+from web.src.core.network_control import NetworkControl, resolve_url_patterns
+
+
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+STUB_PAGE = b"""<!doctype html>
+<html>
+<head><link rel="stylesheet" href="/style.css"></head>
+<body>
+<img id="blocked" src="/pixel.png">
+<script src="/app.js"></script>
+</body>
+</html>
+"""
+
+# 1x1 transparent PNG
+PIXEL_PNG = bytes.fromhex("89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+                          "0000000b49444154789c6360000200000500017a5eab3f0000000049454e44ae426082")
+
+STUB_RESOURCES = {"/": ("text/html", STUB_PAGE),
+                  "/style.css": ("text/css", b"body { margin: 0; }"),
+                  "/pixel.png": ("image/png", PIXEL_PNG),
+                  "/app.js": ("application/javascript", b"window.appLoaded = true;")}
+
+
+class StubPageServer(ThreadingHTTPServer):
+    """
+    Local server of the stub page, it records the requested paths
+    """
+
+    def __init__(self):
+        self.requested_paths = []
+        super().__init__(("127.0.0.1", 0), StubPageHandler)
+
+    @property
+    def base_url(self) -> str:
+        """
+        URL of the stub page
+        """
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+class StubPageHandler(BaseHTTPRequestHandler):
+    """
+    Answers with STUB_RESOURCES, 404 for other paths
+    """
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        GET request
+        """
+        self.server.requested_paths.append(self.path)
+        content_type, body = STUB_RESOURCES.get(self.path, ("text/plain", b"not found"))
+        self.send_response(200 if self.path in STUB_RESOURCES else 404)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """
+        Requests aren't logged
+        """
+
+
+@pytest.fixture(name="headless_chrome")
+def headless_chrome_fixture():
+    """
+    Headless Chrome with the Network domain enabled; the test is skipped if Chrome is not available
+    """
+    if not any(shutil.which(binary) for binary in CHROME_BINARIES):
+        pytest.skip("Chrome is not installed")
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    try:
+        driver = webdriver.Chrome(options=options)
+    except WebDriverException as ex:
+        pytest.skip(f"Chrome can't be started: {ex.msg}")
+    driver.set_page_load_timeout(30)
+    NetworkControl(driver).enable()
+    yield driver
+    driver.quit()
+
+
+def test_blocked_resources_never_load(headless_chrome):
+    """
+    Check if resources matching the blocked patterns are never requested from the server, the other ones
+    are loaded, and if unblocking lets them load again
+    """
+    network = NetworkControl(headless_chrome)
+    with StubPageServer() as server:
+        network.block_urls(resolve_url_patterns(["images"], ["*.css*"]))
+        headless_chrome.get(server.base_url)
+        assert headless_chrome.execute_script("return window.appLoaded === true;")
+        assert headless_chrome.execute_script("return document.getElementById('blocked').naturalWidth;") == 0
+        assert "/app.js" in server.requested_paths
+        assert "/pixel.png" not in server.requested_paths
+        assert "/style.css" not in server.requested_paths
+
+        network.block_urls([])
+        server.requested_paths.clear()
+        headless_chrome.get(server.base_url)
+        assert headless_chrome.execute_script("return document.getElementById('blocked').naturalWidth;") == 1
+        assert "/pixel.png" in server.requested_paths
@@ -0,0 +1,88 @@
+"""
+BasePage mixin tests, the scripts are answered by a stub driver
+"""
+
+import pytest
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.timeouts import Timeouts
+
+from web.src.pages.base_page import BasePage
+
+
+class ScriptDriver:
+    """
+    Stands in for a WebDriver: records the executed scripts and answers them with the passed results
+    """
+
+    def __init__(self, results: list = None, error: Exception = None):
+        self.results = list(results or [])
+        self.error = error
+        self.scripts = []
+        self.timeouts = Timeouts(script=30)
+
+    def set_script_timeout(self, time_to_wait: float):
+        """
+        WebDriver.set_script_timeout()
+        """
+        self.timeouts = Timeouts(script=time_to_wait)
+
+    def execute_script(self, script, *args):
+        """
+        WebDriver.execute_script()
+        """
+        self.scripts.append((script, args))
+        return self.results.pop(0) if self.results else None
+
+    def execute_async_script(self, script, *args):
+        """
+        WebDriver.execute_async_script(), the script timeout it ran with is recorded too
+        """
+        self.scripts.append((script, args, self.timeouts.script))
+        if self.error is not None:
+            raise self.error
+        return self.results.pop(0) if self.results else None
+
+
+def test_wait_script_restores_script_timeout():
+    """
+    Check if the wait scripts run with a longer script timeout and the previous one is restored,
+    also when the script fails
+    """
+    driver = ScriptDriver(results=[True])
+    assert BasePage(driver).wait_dom_quiescent(timeout=10)
+    assert driver.scripts[0][2] == 12
+    assert driver.timeouts.script == 30
+
+    driver = ScriptDriver(error=RuntimeError("script timeout"))
+    assert not BasePage(driver).wait_network_idle(timeout=5)
+    assert driver.scripts[0][2] == 7
+    assert driver.timeouts.script == 30
+
+
+def test_first_of_compiles_mixed_locators():
+    """
+    Check if CSS, jQuery :contains() and XPath locators are sent as CSS/XPath, and the matched script locator
+    is mapped back to the passed one
+    """
+    contains = (By.CSS_SELECTOR, ".dialog, button:contains('Accept')")
+    xpath = (By.XPATH, "//video")
+    element = object()
+    driver = ScriptDriver(results=[[1, element]])
+    assert BasePage(driver).first_of([contains, xpath], timeout=1) == (contains, element)
+    assert driver.scripts[0][1] == ([[By.CSS_SELECTOR, ".dialog"],
+                                     [By.XPATH, "//button[contains(normalize-space(.), 'Accept')]"],
+                                     [By.XPATH, "//video"]],)
+
+
+@pytest.mark.parametrize('locator', [
+    (By.ID, "player"),
+    (By.CSS_SELECTOR, "li:first"),
+])
+def test_first_of_rejects_locators_up_front(locator):
+    """
+    Check if a locator the script can't evaluate is rejected before any script runs
+    """
+    driver = ScriptDriver()
+    with pytest.raises(ValueError):
+        BasePage(driver).any_of([(By.CSS_SELECTOR, ".dialog"), locator], timeout=1)
+    assert not driver.scripts